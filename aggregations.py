@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from build_trace import TRACER
+from schema import widen
+
+# Memoized group-by aggregations shared by the chart builders.
+# A request is (frame, keys, measures). The engine keeps an LRU of "cubes":
+# per-group sufficient statistics (sum, count, min, max of each measure column
+# plus the group size). A request is answered from the smallest cached cube on
+# the same dataset whose keys are a superset of the requested keys, by
+# re-aggregating that cube; only when none exists is the raw frame scanned.
+#
+# Frames are identified by the attrs that datasets.load_dataset sets
+# ('dataset' and 'version'), together with their length and columns. Frames
+# without those attrs are aggregated directly and never cached, so a derived
+# frame whose values change at the same length should have its attrs cleared.
+
+STATISTICS = ['sum', 'count', 'min', 'max']
+SIZE_COLUMN = '__size__'
+
+
+def frame_token(df):
+    dataset = df.attrs.get('dataset')
+    version = df.attrs.get('version')
+    if dataset is None or version is None:
+        return None
+    return (dataset, version, len(df), tuple(df.columns))
+
+
+class AggregationEngine:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.cubes = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.derived = 0
+        self.scans = 0
+        # Set to a list to record every request as (dataset, keys, measures, size)
+        self.requests = None
+
+    def _build_cube(self, df, keys, columns):
+        self.scans += 1
+        # Compact float32 columns (schema.py) are summed at full width
+        narrow = [col for col in columns if df[col].dtype == np.float32]
+        if narrow:
+            df = df.assign(**{col: widen(df[col]) for col in narrow})
+        grouped = df.groupby(list(keys), sort=True, observed=True, dropna=False) if keys else None
+        parts = {}
+        for col in columns:
+            series = grouped[col] if grouped is not None else df[col]
+            for stat in STATISTICS:
+                parts[(col, stat)] = series.agg(stat)
+        parts[(SIZE_COLUMN, 'count')] = grouped.size() if grouped is not None else len(df)
+        if grouped is None:
+            return pd.DataFrame({name: [value] for name, value in parts.items()})
+        return pd.DataFrame(parts)
+
+    def _derive(self, cube, cube_keys, keys):
+        self.derived += 1
+        rollup = {}
+        for col, stat in cube.columns:
+            rollup[(col, stat)] = 'sum' if stat in ('sum', 'count') else stat
+        if not keys:
+            return pd.DataFrame({column: [cube[column].agg(how)] for column, how in rollup.items()})
+        # Level positions keep the requested key order
+        levels = [cube_keys.index(key) for key in keys] if len(cube_keys) > 1 else 0
+        return cube.groupby(level=levels, sort=True, dropna=False).agg(rollup)
+
+    def _cube(self, df, keys, columns):
+        token = frame_token(df)
+        if token is None:
+            return self._build_cube(df, keys, columns)
+
+        keys = tuple(keys)
+        columns = set(columns)
+        with self.lock:
+            exact = self.cubes.get((token, keys))
+            if exact is not None and columns <= exact[1]:
+                self.cubes.move_to_end((token, keys))
+                self.hits += 1
+                return exact[0]
+
+            # Smallest cached cube with finer keys that already holds these measures
+            best = None
+            for (cached_token, cached_keys), (cube, cached_columns) in self.cubes.items():
+                if (cached_token == token and set(keys) <= set(cached_keys)
+                        and columns <= cached_columns):
+                    if best is None or len(cube) < len(best[0]):
+                        best = (cube, cached_keys)
+
+        if best is not None:
+            cube = self._derive(best[0], list(best[1]), list(keys))
+            cube = cube[[c for c in cube.columns if c[0] in columns or c[0] == SIZE_COLUMN]]
+        else:
+            cube = self._build_cube(df, keys, sorted(columns))
+
+        with self.lock:
+            self.cubes[(token, keys)] = (cube, columns)
+            self.cubes.move_to_end((token, keys))
+            while len(self.cubes) > self.max_entries:
+                self.cubes.popitem(last=False)
+        return cube
+
+    def aggregate(self, df, keys, measures=None, size=None):
+        # Equivalent to df.groupby(keys).agg(measures).reset_index() (plus a row
+        # count column named `size` if given); keys=[] gives a one-row total.
+        measures = dict(measures or {})
+        keys = list(keys)
+        if self.requests is not None:
+            self.requests.append((df.attrs.get('dataset'), tuple(keys), tuple(measures.items()), size))
+        with TRACER.span(f"aggregate:{df.attrs.get('dataset', '?')}[{','.join(keys)}]", 'aggregate',
+                         rows=len(df)) as span:
+            before = (self.hits, self.derived, self.scans)
+            cube = self._cube(df, keys, measures.keys())
+            span['source'] = ('hit' if self.hits > before[0] else
+                              'derived' if self.derived > before[1] else 'scan')
+            span['groups'] = len(cube)
+
+        result = pd.DataFrame(index=cube.index)
+        for col, how in measures.items():
+            if how == 'mean':
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    result[col] = cube[(col, 'sum')] / cube[(col, 'count')].where(cube[(col, 'count')] > 0)
+            else:
+                result[col] = cube[(col, how)]
+        if size is not None:
+            result[size] = cube[(SIZE_COLUMN, 'count')]
+
+        if not keys:
+            return result.reset_index(drop=True)
+        result = result.reset_index()
+        result.columns = keys + list(result.columns[len(keys):])
+        # groupby() drops missing keys by default; cubes keep them so they can be rolled up
+        return result.dropna(subset=keys).reset_index(drop=True)
+
+    def clear(self):
+        with self.lock:
+            self.cubes.clear()
+
+
+# Process-wide engine used by the dashboard builders
+ENGINE = AggregationEngine()
+
+
+def aggregate(df, keys, measures=None, size=None):
+    return ENGINE.aggregate(df, keys, measures, size)
@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import json
+import os
+
+from build_trace import TRACER
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Publishing stage for static hosting.
+# Every asset (stylesheet, page script, chart payloads, shared templates,
+# vendored plotly.js) is written once under assets/ with the first
+# HASH_LENGTH hex digits of its sha256 in the file name, so it can be served
+# with a year-long immutable cache lifetime; a rebuild that changes one chart
+# changes only that chart's file name, and clients re-download nothing else.
+# Entry pages keep their plain names and are revalidated on every load.
+# Each text file gets pre-compressed .gz (and .br when the brotli package is
+# installed) siblings for hosts that serve them directly (nginx gzip_static /
+# brotli_static, most CDNs).
+#
+# The output directory also gets:
+#   asset-manifest.json  asset path -> {name, sha256, bytes, gzip, br}, each entry
+#                        page with the asset paths it references, and the
+#                        retired assets still on disk
+#   _headers             Cache-Control rules in the Netlify / Cloudflare Pages format
+# Assets the previous build used and this one does not are listed as 'retired'
+# in the manifest and removed by the build after, so pages still open in a
+# browser keep working across one rebuild. Only files a previous manifest
+# retired are ever deleted: anything else under assets/ is left alone, and
+# with no previous manifest nothing is removed.
+
+ASSET_DIR = 'assets'
+MANIFEST_NAME = 'asset-manifest.json'
+HEADERS_NAME = '_headers'
+HASH_LENGTH = 12
+MIN_COMPRESS_BYTES = 256
+EXTENSIONS = {'gzip': '.gz', 'br': '.br'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+def _compressed(data):
+    # encoding -> bytes, only where compression actually helps. gzip with a
+    # fixed mtime so identical input gives identical files.
+    if len(data) < MIN_COMPRESS_BYTES:
+        return {}
+    encodings = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings['br'] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in encodings.items() if len(body) < len(data)}
+
+
+class AssetPublisher:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.files = {}
+        self.entries = {}
+        self.written = 0
+        self.reused = 0
+        try:
+            with open(os.path.join(output_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (OSError, ValueError):
+            self.previous = {}
+
+    def _write(self, relative_path, data):
+        # The file and its compressed siblings, each replaced atomically
+        entry = {'sha256': hashlib.sha256(data).hexdigest(), 'bytes': len(data)}
+        path = os.path.join(self.output_dir, relative_path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        for encoding, body in [(None, data)] + list(_compressed(data).items()):
+            target = path + EXTENSIONS.get(encoding, '')
+            temp_path = f'{target}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, target)
+            if encoding:
+                entry[encoding] = len(body)
+        return entry
+
+    def add(self, name, data, extension):
+        # Publish `data` (str or bytes) as a fingerprinted asset; returns its
+        # path relative to the output directory. `name` may contain '/'.
+        # Identical content under the same name is stored once, however many
+        # pages reference it.
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        relative_path = f'{ASSET_DIR}/{name}.{digest[:HASH_LENGTH]}{extension}'
+        if relative_path in self.files:
+            return relative_path
+        previous = self.previous.get('files', {}).get(relative_path)
+        if previous and previous['sha256'] == digest and os.path.exists(
+                os.path.join(self.output_dir, relative_path)):
+            # Published by an earlier build: nothing to compress or write again
+            self.files[relative_path] = previous
+            self.reused += 1
+        else:
+            self.files[relative_path] = dict(self._write(relative_path, data), name=name)
+            self.written += 1
+        return relative_path
+
+    def add_entry(self, name, html, assets=()):
+        # An entry page under its own name (not fingerprinted); `assets` are the
+        # asset paths it references, kept for as long as the page is
+        self.entries[name] = dict(self._write(name, html.encode('utf-8')), assets=sorted(set(assets)))
+        return name
+
+    def _referenced(self, manifest):
+        paths = set()
+        for path, entry in manifest.get('files', {}).items():
+            paths.add(path)
+            paths.update(path + EXTENSIONS[encoding] for encoding in EXTENSIONS if encoding in entry)
+        return paths
+
+    def _prune(self, retired):
+        # Delete what the previous manifest retired, unless this build brought it
+        # back. Only files a manifest listed are ever removed: anything else under
+        # assets/ was put there by someone else and is left alone.
+        stale = (self._referenced({'files': self.previous.get('retired', {})})
+                 - self._referenced({'files': self.files}) - self._referenced({'files': retired}))
+        removed = 0
+        for relative_path in sorted(stale):
+            path = os.path.join(self.output_dir, relative_path)
+            if relative_path.startswith(f'{ASSET_DIR}/') and os.path.isfile(path):
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def finish(self):
+        # Write the manifest and cache headers, drop stale assets. Returns the manifest.
+        with TRACER.span('publish:finish', 'publish', assets=len(self.files)) as span:
+            manifest = {'entries': dict(self.entries)}
+            # Pages from an earlier build that were not rebuilt this time (e.g.
+            # batch_builder.py --only) stay listed, and so do their assets
+            previous_files = self.previous.get('files', {})
+            for name, entry in self.previous.get('entries', {}).items():
+                if name not in manifest['entries'] and os.path.exists(os.path.join(self.output_dir, name)):
+                    manifest['entries'][name] = entry
+                    for asset in entry.get('assets', []):
+                        if asset not in self.files and asset in previous_files:
+                            self.files[asset] = previous_files[asset]
+            manifest['entries'] = dict(sorted(manifest['entries'].items()))
+            manifest['files'] = dict(sorted(self.files.items()))
+            # Assets the previous build published and this one does not use stay
+            # on disk until the next build, for pages still open in a browser
+            retired = {path: entry for path, entry in previous_files.items() if path not in self.files}
+            manifest['retired'] = dict(sorted(retired.items()))
+            span['removed'] = self._prune(retired)
+            with open(os.path.join(self.output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=1)
+            with open(os.path.join(self.output_dir, HEADERS_NAME), 'w', encoding='utf-8') as f:
+                f.write(f'/{ASSET_DIR}/*\n  Cache-Control: {IMMUTABLE}\n'
+                        f'/*.html\n  Cache-Control: {REVALIDATE}\n'
+                        f'/{MANIFEST_NAME}\n  Cache-Control: {REVALIDATE}\n')
+        return manifest
+
+    def report(self):
+        # (bytes, gzip bytes) over everything published by this build
+        entries = list(self.files.values()) + list(self.entries.values())
+        return (sum(entry['bytes'] for entry in entries),
+                sum(entry.get('gzip', entry['bytes']) for entry in entries))
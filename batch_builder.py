@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import re
+import shutil
+from collections import defaultdict
+
+import dashboard_generator
+from asset_publisher import AssetPublisher
+from build_cache import CACHE_DIR
+from build_trace import TRACER
+from chart_payloads import plotly_script_tag
+from chart_registry import CHARTS, SUMMARIES, render_all
+from dashboard_server import apply_filters, normalize_filters
+from datasets import load_datasets, report_load
+from district_join import set_keys_path
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Batch dashboard builder.
+# A declarative spec (JSON, or YAML when PyYAML is installed) lists dashboard
+# variants; all of them are built in one process from a single load of each
+# dataset. Example (see dashboards.json):
+#
+#   {"output_dir": "dashboards", "output_mode": "compact",
+#    "dashboards": [
+#      {"name": "national", "output": "index.html"},
+#      {"name": "{state}", "for_each": "state", "output": "state-{slug}.html",
+#       "title": "{state} Health Dashboard",
+#       "sections": ["Disability Analysis", "Health Awareness"]}]}
+#
+# Per dashboard: charts / sections / exclude choose the registered charts,
+# chart_titles overrides container titles, filters slices the data exactly like
+# the live server (state, channel, start, end), and for_each: "state" expands
+# one entry per State_Name value (or per entry of "values"), substituting
+# {state} and {slug} in name, output, title and subtitle.
+#
+# Datasets a variant's filters don't touch keep the loaded frame, so their
+# charts are rendered once and reused by every variant, and sliced frames
+# carry their own version so aggregations are cached per slice. The columnar
+# and district-key caches live under --cache-dir, as for dashboard_generator.py.
+#
+# With "publish": true (compact output only) the output directory is written
+# through asset_publisher.py instead: the pages share one set of fingerprinted,
+# pre-compressed stylesheet, script and chart files, so a chart that is the
+# same in every variant is stored - and downloaded - once.
+
+DEFAULT_OUTPUT_DIR = 'dashboards'
+
+
+def load_spec(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise SystemExit('PyYAML is required for YAML specs (pip install pyyaml) - or use JSON')
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def slugify(value):
+    return re.sub(r'[^a-z0-9]+', '-', str(value).lower()).strip('-')
+
+
+def select_charts(entry):
+    by_key = {spec.key: spec for spec in CHARTS}
+    unknown = [key for key in entry.get('charts', []) + entry.get('exclude', []) if key not in by_key]
+    if unknown:
+        raise ValueError(f"unknown chart ids: {', '.join(unknown)}")
+    if entry.get('charts'):
+        charts = [by_key[key] for key in entry['charts']]
+    elif entry.get('sections'):
+        charts = [spec for spec in CHARTS if spec.section in entry['sections']]
+    else:
+        charts = list(CHARTS)
+    charts = [spec for spec in charts if spec.key not in entry.get('exclude', [])]
+    titles = entry.get('chart_titles', {})
+    return [spec._replace(title=titles[spec.key]) if spec.key in titles else spec for spec in charts]
+
+
+def all_states(data):
+    states = set()
+    for df in data.values():
+        if 'State_Name' in df.columns:
+            states.update(df['State_Name'].dropna().astype(str).unique())
+    return sorted(states)
+
+
+def expand(entries, data):
+    # One variant per entry, or per state for for_each entries
+    variants = []
+    for entry in entries:
+        if entry.get('for_each') is None:
+            variants.append(dict(entry))
+            continue
+        if entry['for_each'] != 'state':
+            raise ValueError(f"for_each only supports 'state', got {entry['for_each']!r}")
+        for state in entry.get('values') or all_states(data):
+            names = {'state': state, 'slug': slugify(state)}
+            variant = {key: value.format(**names) if isinstance(value, str) else value
+                       for key, value in entry.items() if key not in ('for_each', 'values')}
+            variant['filters'] = dict(entry.get('filters', {}), state=[state])
+            variants.append(variant)
+    return variants
+
+
+class BatchBuilder:
+    def __init__(self, spec, workers=1, executor='process', cache_dir=CACHE_DIR):
+        self.spec = spec
+        self.workers = workers
+        self.executor = executor
+        # Root of the columnar and district-key caches, laid out as in
+        # dashboard_generator.py; None reads every source and writes nothing
+        self.cache_dir = cache_dir
+        self.output_mode = spec.get('output_mode', 'compact')
+        self.output_dir = spec.get('output_dir', DEFAULT_OUTPUT_DIR)
+        self.data = {}
+        # (chart key, output mode, versions of its input frames) -> rendered fragment
+        self.fragments = {}
+        self.reused = 0
+        self.load_errors = {}
+        self.publisher = None
+        if spec.get('publish'):
+            if self.output_mode != 'compact':
+                raise ValueError('"publish" needs "output_mode": "compact"')
+            self.publisher = AssetPublisher(self.output_dir)
+
+    def cache_path(self, *parts):
+        return os.path.join(self.cache_dir, *parts) if self.cache_dir else None
+
+    def load(self):
+        print("Loading datasets...")
+        names = sorted({name for spec in CHARTS + SUMMARIES for name in spec.datasets})
+        self.data, self.load_errors, seconds = load_datasets(names, cache_dir=self.cache_path('columnar'))
+        set_keys_path(self.cache_path('district_keys.json'))
+        report_load(self.data, self.load_errors, seconds)
+
+    def _fragment_key(self, spec, frames):
+        versions = tuple((df.attrs.get('dataset'), df.attrs.get('version')) for df in frames)
+        if any(version is None for _, version in versions):
+            return None
+        return (spec.key, self.output_mode if spec in CHARTS else None, versions)
+
+    def loaded(self, spec):
+        return not self.load_errors.keys() & set(spec.datasets)
+
+    def render(self, specs, filters):
+        filter_key = json.dumps(filters, sort_keys=True)
+        frames = {name: apply_filters(df, filters, filter_key) for name, df in self.data.items()}
+        results, todo = {}, []
+        for spec in specs:
+            key = self._fragment_key(spec, [frames[name] for name in spec.datasets])
+            if key in self.fragments:
+                results[spec.key] = self.fragments[key]
+                self.reused += 1
+            else:
+                todo.append((spec, key))
+        rendered = render_all([spec for spec, _ in todo], frames, workers=self.workers,
+                              executor=self.executor, output_mode=self.output_mode)
+        for spec, key in todo:
+            results[spec.key] = rendered[spec.key]
+            if key is not None:
+                self.fragments[key] = rendered[spec.key]
+        return results
+
+    def build_variant(self, variant):
+        # Charts and cards built from a dataset that failed to load are left out ('n/a' cards)
+        charts = [spec for spec in select_charts(variant) if self.loaded(spec)]
+        summaries = [spec for spec in SUMMARIES if self.loaded(spec)]
+        filters = normalize_filters(variant.get('filters', {}))
+        registered = {spec.key: spec for spec in CHARTS}
+        # Render with the registered specs so title overrides don't split the fragment cache
+        results = self.render([registered[spec.key] for spec in charts] + summaries, filters)
+
+        summary_stats = defaultdict(lambda: 'n/a')
+        for spec in summaries:
+            summary_stats.update(results[spec.key])
+        output = os.path.join(self.output_dir, variant.get('output', f"{slugify(variant['name'])}.html"))
+        options = {'title': variant.get('title', dashboard_generator.DASHBOARD_TITLE),
+                   'subtitle': variant.get('subtitle', dashboard_generator.DASHBOARD_SUBTITLE)}
+        if self.publisher is not None:
+            payloads = {spec.key: results[spec.key] for spec in charts}
+            return os.path.join(self.output_dir, dashboard_generator.publish_dashboard(
+                self.publisher, os.path.relpath(output, self.output_dir).replace(os.sep, '/'), payloads,
+                summary_stats, charts=charts, plotly_js=self.spec.get('plotly_js', 'cdn'),
+                purge_hidden=self.spec.get('purge_hidden', False), **options))
+        if self.output_mode == 'compact':
+            payloads = {spec.key: results[spec.key] for spec in charts}
+            charts_html = {chart_id: f'<div class="plotly-graph-div" id="plot-{chart_id}"></div>'
+                           for chart_id in payloads}
+            html_content = dashboard_generator.render_dashboard(
+                charts_html, summary_stats, charts=charts,
+                plotly_script=plotly_script_tag(self.spec.get('plotly_js', 'cdn'), self.output_dir),
+                chart_scripts=dashboard_generator.compact_chart_scripts(payloads, self.spec.get('purge_hidden', False)),
+                **options)
+        else:
+            html_content = dashboard_generator.render_dashboard(
+                {spec.key: results[spec.key] for spec in charts}, summary_stats, charts=charts, **options)
+
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        return output
+
+    def build(self, only=None):
+        self.load()
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.publisher is None:
+            self.copy_stylesheet()
+        variants = expand(self.spec.get('dashboards', []), self.data)
+        if only:
+            variants = [variant for variant in variants if variant['name'] in only]
+
+        outputs, failures = [], []
+        for variant in variants:
+            try:
+                with TRACER.span(f"dashboard:{variant['name']}", 'dashboard'):
+                    outputs.append(self.build_variant(variant))
+                print(f"   ✅ {variant['name']}: {outputs[-1]}")
+            except Exception as e:
+                # One bad slice (e.g. a state with too little data for a chart) must not stop the batch
+                failures.append((variant['name'], e))
+                print(f"   ❌ {variant['name']}: {e}")
+        if self.publisher is not None:
+            self.publisher.finish()
+        return outputs, failures
+
+    def copy_stylesheet(self):
+        # The pages link dashboard_styles.css relative to themselves
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_styles.css')
+        target = os.path.join(self.output_dir, 'dashboard_styles.css')
+        if os.path.abspath(source) != os.path.abspath(target):
+            shutil.copyfile(source, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build several dashboards from one load of the datasets')
+    parser.add_argument('spec', nargs='?', default='dashboards.json', help='dashboard spec (JSON or YAML)')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='build only these dashboards (expanded names)')
+    parser.add_argument('--workers', type=int, default=1, help='number of parallel chart builders')
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help='pool type used when --workers is above 1')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='root directory for the columnar data and district key caches')
+    parser.add_argument('--no-cache', action='store_true', help='read every source and write no cache files')
+    parser.add_argument('--trace', metavar='PATH', help='write per-stage timings as a Chrome trace')
+    args = parser.parse_args()
+
+    if args.trace:
+        TRACER.configure(enabled=True)
+
+    builder = BatchBuilder(load_spec(args.spec), workers=args.workers, executor=args.executor,
+                           cache_dir=None if args.no_cache else args.cache_dir)
+    outputs, failures = builder.build(args.only)
+    print(f"📊 {len(outputs)} dashboards written to {builder.output_dir}/ "
+          f"({builder.reused} chart renders reused across variants)")
+    if args.trace:
+        TRACER.write(args.trace)
+        print(f"⏱️  Build trace: {args.trace}")
+    if builder.load_errors:
+        print(f"❌ Charts skipped, datasets failed to load: {', '.join(sorted(builder.load_errors))}")
+    if failures or builder.load_errors:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
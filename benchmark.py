@@ -0,0 +1,281 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly
+
+import dashboard_generator  # registers the charts
+from aggregations import ENGINE, aggregate
+from build_trace import peak_rss_mb
+from chart_payloads import figure_payload
+from chart_registry import CHARTS, SUMMARIES, fragment_inputs
+from datasets import DATASET_FILES, load_dataset, read_source
+
+# Build benchmark with synthetic data.
+# For every requested size a fresh working directory is filled with synthetic
+# versions of the shipped CSVs (same file names and columns, values sampled
+# from the real data's distributions, district names made unique), and a child
+# process times each stage of the pipeline:
+#   load             CSV parse + column normalization (datasets.read_source)
+#   load_columnar    first load_dataset (builds the columnar cache) ...
+#   load_cached      ... and a second one served from the columnar cache
+#   clean            DATACLEANING.PY run as a subprocess
+#   aggregate        the group-bys the charts ask for, on a cold engine
+#   figures          every registered chart builder
+#   serialize_html   fig.to_html for every chart (fragments mode)
+#   serialize_json   compact payloads for every chart (compact mode)
+# Each size runs in its own process so peak RSS is per size. --trace-memory adds
+# per-stage tracemalloc peaks at the cost of slower stages; the report records
+# the flag so traced and untraced timings are not compared. The report is JSON
+# so runs can be diffed across versions.
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Columns whose values get a row suffix so cardinality grows with the data
+UNIQUE_COLUMNS = {
+    'disability_district': ['State_District_Name'],
+    'awareness': ['State_District_Name'],
+    'hospitals': ['District'],
+}
+
+# ============= SYNTHETIC DATA =============
+
+def _date_format(values):
+    sample = values.dropna().astype(str)
+    if sample.empty:
+        return None
+    if sample.str.fullmatch(r'\d{4}-\d{2}-\d{2}').all():
+        return '%Y-%m-%d'
+    if sample.str.fullmatch(r'\d{1,2}/\d{1,2}/\d{4}').all():
+        return '%m/%d/%Y'
+    return None
+
+
+def synthesize(source, rows, rng, unique_columns=()):
+    columns = {}
+    for col in source.columns:
+        values = source[col]
+        if pd.api.types.is_numeric_dtype(values):
+            clean = values.dropna()
+            sampled = rng.normal(clean.mean(), clean.std() if len(clean) > 1 else 0, rows)
+            sampled = np.clip(sampled, clean.min(), clean.max())
+            if pd.api.types.is_integer_dtype(values):
+                sampled = np.round(sampled).astype(np.int64)
+            else:
+                sampled = np.round(sampled, 2)
+            columns[col] = sampled
+            continue
+
+        date_format = _date_format(values)
+        if date_format:
+            dates = pd.to_datetime(values, format=date_format)
+            start, end = dates.min().value, dates.max().value
+            sampled = pd.to_datetime(rng.integers(start, end + 1, rows)).normalize()
+            columns[col] = sampled.strftime(date_format)
+            continue
+
+        choices = values.dropna().unique()
+        sampled = rng.choice(choices, rows)
+        if col.strip() in unique_columns:
+            sampled = pd.Series(sampled).astype(str) + ' ' + pd.Series(np.arange(rows)).astype(str)
+        columns[col] = sampled
+    return pd.DataFrame(columns)
+
+
+def write_synthetic(workdir, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name, path in DATASET_FILES.items():
+        source = pd.read_csv(os.path.join(here, path))
+        synthesize(source, rows, rng, UNIQUE_COLUMNS.get(name, ())).to_csv(
+            os.path.join(workdir, path), index=False)
+
+
+# ============= STAGE TIMING =============
+
+def timed(results, stage, func, rows=None, trace_memory=False):
+    # tracemalloc hooks every allocation and slows pandas/numpy noticeably, so
+    # it only runs under --trace-memory and those runs are marked in the report
+    if trace_memory:
+        tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    value = func()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    results[stage] = {'wall_s': round(wall, 4), 'cpu_s': round(cpu, 4)}
+    if trace_memory:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[stage]['peak_traced_mb'] = round(traced_peak / 2**20, 2)
+    rss = peak_rss_mb()
+    results[stage]['peak_rss_mb'] = None if rss is None else round(rss, 2)
+    if rows is not None:
+        results[stage]['rows'] = rows
+    print(f"   {stage:<16} {wall:8.3f}s", file=sys.stderr)
+    return value
+
+
+# ru_maxrss of a forked child starts at the parent's RSS, so the cleaning run
+# reports its own high-water mark (VmHWM resets on exec) from inside
+CLEAN_WRAPPER = """
+import os, runpy, sys
+script, report = sys.argv[1], sys.argv[2]
+sys.argv = [script]
+sys.path.insert(0, os.path.dirname(script))
+try:
+    runpy.run_path(script, run_name='__main__')
+finally:
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as status, open(report, 'w') as out:
+            out.write(next(line.split()[1] for line in status if line.startswith('VmHWM')))
+"""
+
+
+def run_clean(workdir):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'DATACLEANING.PY')
+    report = os.path.join(workdir, 'clean_rss_kb')
+    # os.times covers waited-for children everywhere resource does (zero on Windows)
+    wall, cpu = time.perf_counter(), os.times()
+    process = subprocess.run([sys.executable, '-c', CLEAN_WRAPPER, script, report], cwd=workdir,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    usage = os.times()
+    stats = {
+        'wall_s': round(time.perf_counter() - wall, 4),
+        'cpu_s': round(usage.children_user + usage.children_system
+                       - cpu.children_user - cpu.children_system, 4),
+        'exit_code': process.returncode,
+    }
+    try:
+        with open(report) as f:
+            stats['peak_rss_mb'] = round(int(f.read()) / 1024, 2)
+    except (OSError, ValueError):
+        pass  # no /proc (non-Linux)
+    if process.returncode:
+        stats['error'] = process.stderr.decode('utf-8', 'replace')[-500:]
+    print(f"   {'clean':<16} {stats['wall_s']:8.3f}s", file=sys.stderr)
+    return stats
+
+
+def aggregate_requests(data):
+    # The aggregations the registered charts and summary cards request, found by
+    # running every builder once with the engine recording: [(dataset, keys,
+    # measures, size)] in first-seen order
+    ENGINE.requests = []
+    try:
+        for spec in CHARTS + SUMMARIES:
+            spec.builder(*fragment_inputs(spec, [data[name] for name in spec.datasets]))
+        return [request for request in dict.fromkeys(ENGINE.requests) if request[0] in data]
+    finally:
+        ENGINE.requests = None
+
+
+def run_stages(workdir, skip_clean=False, trace_memory=False):
+    os.chdir(workdir)
+    results = {}
+    stage = functools.partial(timed, results, trace_memory=trace_memory)
+    total_rows = sum(len(pd.read_csv(path, usecols=[0])) for path in DATASET_FILES.values())
+
+    stage('load', lambda: {name: read_source(path) for name, path in DATASET_FILES.items()}, rows=total_rows)
+    stage('load_columnar', lambda: {name: load_dataset(name) for name in DATASET_FILES})
+    data = stage('load_cached', lambda: {name: load_dataset(name) for name in DATASET_FILES})
+
+    if not skip_clean:
+        results['clean'] = run_clean(workdir)
+
+    requests = aggregate_requests(data)
+    ENGINE.clear()
+    stage('aggregate', lambda: [aggregate(data[name], list(keys), dict(measures), size)
+                                for name, keys, measures, size in requests])
+    figures = stage('figures', lambda: [spec.builder(*fragment_inputs(spec, [data[n] for n in spec.datasets]))
+                                        for spec in CHARTS])
+    stage('serialize_html', lambda: [fig.to_html(full_html=False, include_plotlyjs='cdn') for fig in figures])
+    stage('serialize_json', lambda: [figure_payload(fig) for fig in figures])
+    return results
+
+
+# ============= DRIVER =============
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_child(rows, skip_clean, trace_memory=False):
+    with tempfile.TemporaryDirectory(prefix=f'dashboard-bench-{rows}-') as workdir:
+        command = [sys.executable, os.path.abspath(__file__), '--child', str(rows), '--workdir', workdir]
+        if skip_clean:
+            command.append('--skip-clean')
+        if trace_memory:
+            command.append('--trace-memory')
+        output = subprocess.run(command, stdout=subprocess.PIPE, check=True).stdout
+        return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def print_table(report):
+    stages = []
+    for run in report['runs']:
+        stages += [stage for stage in run['stages'] if stage not in stages]
+    print(f"\n{'rows':>10} " + ' '.join(f'{stage:>15}' for stage in stages) + f" {'peak RSS MB':>12}")
+    for run in report['runs']:
+        cells = [f"{run['stages'][stage]['wall_s']:>14.3f}s" if stage in run['stages'] else f"{'-':>15}"
+                 for stage in stages]
+        print(f"{run['rows']:>10} " + ' '.join(cells) + (f" {run['peak_rss_mb']:>12.1f}" if run['peak_rss_mb'] is not None else f" {'-':>12}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard pipeline on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='rows per synthetic dataset (e.g. 1000 10000 ... 10000000)')
+    parser.add_argument('--report', default='benchmark_report.json', help='JSON report output')
+    parser.add_argument('--skip-clean', action='store_true', help='do not time DATACLEANING.PY')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also record per-stage tracemalloc peaks (slows the timed stages)')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        # One size in a fresh process: generate, run the stages, print JSON as the last line
+        write_synthetic(args.workdir, args.child, args.seed)
+        stages = run_stages(args.workdir, args.skip_clean, args.trace_memory)
+        rss = peak_rss_mb()
+        print(json.dumps({'rows': args.child, 'stages': stages,
+                          'peak_rss_mb': None if rss is None else round(rss, 2)}))
+        return
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plotly': plotly.__version__,
+        'charts': len(CHARTS),
+        'trace_memory': args.trace_memory,
+        'runs': [],
+    }
+    for rows in args.sizes:
+        print(f"⏱️  Benchmarking {rows:,} rows per dataset...", file=sys.stderr)
+        report['runs'].append(run_child(rows, args.skip_clean, args.trace_memory))
+        # Write as we go so a long national-scale run still leaves partial results
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    print_table(report)
+    print(f"\n📁 Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+
+# Build cache for dashboard_generator.py
+# Each input dataset is fingerprinted (size + mtime, confirmed with a sha256 of the
+# contents) and every cached chart fragment / summary card remembers the hashes of
+# the datasets it was built from. Anything whose sources are unchanged is spliced
+# back in from the cache instead of being recomputed.
+
+# Default root for every on-disk cache (fragments here, plus columnar frames,
+# district keys, summary / feed stores and rendered images in subpaths);
+# dashboard_generator.py --cache-dir moves all of them together
+CACHE_DIR = '.dashboard_cache'
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    # Skip re-hashing when size and mtime are exactly what we saw last time
+    if (previous and previous.get('size') == stat.st_size
+            and previous.get('mtime_ns') == stat.st_mtime_ns):
+        fingerprint['sha256'] = previous['sha256']
+    else:
+        fingerprint['sha256'] = file_sha256(path)
+    return fingerprint
+
+
+class BuildCache:
+    def __init__(self, cache_dir, code_version, enabled=True):
+        self.cache_dir = cache_dir
+        self.code_version = code_version
+        self.enabled = enabled
+        self.sources = {}
+        self.changed = []
+        self.manifest = {'code_version': code_version, 'sources': {}, 'entries': {}}
+
+        if enabled:
+            self._load_manifest()
+
+    def path(self, *parts):
+        # Location for another cache kept under the same root (columnar frames,
+        # district keys, ...); None when caching is disabled, which callers
+        # take as "read from source, write nothing"
+        return os.path.join(self.cache_dir, *parts) if self.enabled else None
+
+    def _manifest_path(self):
+        return os.path.join(self.cache_dir, MANIFEST_NAME)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Cached fragments are only valid for the code that produced them
+        if manifest.get('code_version') == self.code_version:
+            self.manifest = manifest
+        else:
+            self.manifest['sources'] = manifest.get('sources', {})
+
+    def fingerprint_sources(self, dataset_files):
+        previous = self.manifest['sources']
+        for name, path in dataset_files.items():
+            try:
+                fingerprint = file_fingerprint(path, previous.get(name))
+            except OSError:
+                # Missing or unreadable: everything built from it is stale (and fails to load)
+                self.changed.append(name)
+                self.sources[name] = None
+                continue
+            if previous.get(name, {}).get('sha256') != fingerprint['sha256']:
+                self.changed.append(name)
+            previous[name] = fingerprint
+            self.sources[name] = fingerprint['sha256']
+        return self.sources
+
+    def is_stale(self, key, datasets):
+        if not self.enabled:
+            return True
+        entry = self.manifest['entries'].get(key)
+        if entry is None or not os.path.exists(self._entry_path(key)):
+            return True
+        recorded = entry['sources']
+        return any(recorded.get(name) != self.sources.get(name) for name in datasets)
+
+    def get(self, key):
+        with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key, datasets, value):
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._entry_path(key), 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        self.manifest['entries'][key] = {
+            'sources': {name: self.sources[name] for name in datasets}
+        }
+
+    def save(self):
+        if not self.enabled:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Build instrumentation shared by the generator and the cleaning script.
+# Code wraps a unit of work in TRACER.span(name, category, **args); each span
+# records wall time, CPU time (of the calling thread), resident memory and,
+# with memory=True, the peak of Python/numpy allocations made inside it
+# (tracemalloc; slower, so off by default). Extra args such as row counts can
+# be passed up front or set on the yielded dict before the span closes.
+#
+# Spans are kept as Chrome trace events ("X" complete events, microseconds),
+# so write() output opens directly in chrome://tracing or Perfetto. Spans
+# recorded in pool worker processes are shipped back with drain() and keep
+# their own pid. The tracer is disabled unless a script turns it on, in which
+# case span() costs a single attribute check.
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_mb():
+    # None where neither /proc nor getrusage is available (Windows)
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / 2**20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # None without the resource module (Windows)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, KiB on Linux and the BSDs
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _megabytes(value):
+    return None if value is None else round(value, 2)
+
+
+class Tracer:
+    def __init__(self, enabled=False, memory=False):
+        self.events = []
+        self.local = threading.local()
+        self.enabled = False
+        self.memory = False
+        self.configure(enabled, memory)
+
+    def configure(self, enabled=True, memory=False):
+        self.enabled = enabled
+        self.memory = enabled and memory
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def span(self, name, category, **args):
+        if not self.enabled:
+            yield args
+            return
+
+        stack = self.local.__dict__.setdefault('stack', [])
+        frame = {'peak': 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start'] = current
+        stack.append(frame)
+
+        start_ns = time.monotonic_ns()
+        start_cpu = time.thread_time()
+        try:
+            yield args
+        finally:
+            wall_us = (time.monotonic_ns() - start_ns) / 1000
+            args['cpu_ms'] = round((time.thread_time() - start_cpu) * 1000, 3)
+            args['rss_mb'] = _megabytes(current_rss_mb())
+            stack.pop()
+            if self.memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                args['peak_alloc_mb'] = round((peak - frame['start']) / 2**20, 3)
+                # Nested spans reset the peak, so hand ours up to the enclosing span
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            self.events.append({
+                'name': name, 'cat': category, 'ph': 'X',
+                'ts': start_ns / 1000, 'dur': wall_us,
+                'pid': os.getpid(), 'tid': threading.get_ident(),
+                'args': args,
+            })
+
+    def drain(self, mark=0):
+        # Remove and return the events recorded since `mark` (used by pool workers)
+        events = self.events[mark:]
+        del self.events[mark:]
+        return events
+
+    def extend(self, events):
+        self.events.extend(events)
+
+    def write(self, path):
+        trace = {
+            'traceEvents': sorted(self.events, key=lambda event: event['ts']),
+            'displayTimeUnit': 'ms',
+            'otherData': {'peak_rss_mb': _megabytes(peak_rss_mb())},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, default=str)
+
+    def totals(self):
+        # Wall seconds per span name and per category. Category totals only count
+        # spans not nested in another span of the same category, so they add up.
+        by_name, by_category = {}, {}
+        for event in self.events:
+            seconds = event['dur'] / 1e6
+            by_name[event['name']] = by_name.get(event['name'], 0.0) + seconds
+            end = event['ts'] + event['dur']
+            nested = any(other is not event and other['cat'] == event['cat']
+                         and other['pid'] == event['pid'] and other['tid'] == event['tid']
+                         and other['ts'] <= event['ts'] and other['ts'] + other['dur'] >= end
+                         and other['dur'] > event['dur']
+                         for other in self.events)
+            if not nested:
+                by_category[event['cat']] = by_category.get(event['cat'], 0.0) + seconds
+        return by_name, by_category
+
+    def check_budgets(self, budgets):
+        # budgets: {span name or category: seconds}; returns one message per overrun
+        by_name, by_category = self.totals()
+        failures = []
+        for key, limit in budgets.items():
+            spent = by_name.get(key, by_category.get(key))
+            if spent is not None and spent > limit:
+                failures.append(f"{key}: {spent:.3f}s exceeds budget of {limit:.3f}s")
+        return failures
+
+    def summary_table(self, limit=None):
+        events = sorted(self.events, key=lambda event: event['dur'], reverse=True)[:limit]
+        lines = [f"{'span':<44} {'category':<10} {'wall ms':>10} {'cpu ms':>10} {'rows':>10} {'peak MB':>9}"]
+        for event in events:
+            args = event['args']
+            peak = args.get('peak_alloc_mb')
+            lines.append(f"{event['name'][:44]:<44} {event['cat']:<10} {event['dur'] / 1000:>10.1f} "
+                         f"{args['cpu_ms']:>10.1f} {args.get('rows', ''):>10} "
+                         f"{'' if peak is None else f'{peak:.1f}':>9}")
+        _, by_category = self.totals()
+        lines.append('')
+        lines.extend(f"{category:<55} {seconds * 1000:>10.1f}" for category, seconds in sorted(by_category.items()))
+        return '\n'.join(lines)
+
+
+def parse_budget(value):
+    # argparse type= for --budget: 'load:awareness=0.5' -> ('load:awareness', 0.5)
+    key, _, seconds = value.rpartition('=')
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        seconds = None
+    if not key or seconds is None or seconds < 0:
+        raise argparse.ArgumentTypeError(f"budget must look like NAME=SECONDS: {value!r}")
+    return key, seconds
+
+
+def parse_budgets(values):
+    # --budget values (pairs from parse_budget, or NAME=SECONDS strings) -> {name: seconds}
+    return dict(parse_budget(value) if isinstance(value, str) else value for value in values or [])
+
+
+# Process-wide tracer; scripts enable it from their command line
+TRACER = Tracer()
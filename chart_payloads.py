@@ -0,0 +1,133 @@
+import base64
+import hashlib
+import json
+import os
+import numpy as np
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+# Compact chart payloads for the 'compact' output mode of dashboard_generator.py
+# Instead of one to_html() blob per chart (each carrying its own copy of the
+# layout template and a plotly.js <script> tag) every figure becomes a small
+# JSON spec:
+#   - numeric arrays are plotly.js typed arrays ({dtype, bdata}), downcast to
+#     the smallest integer type (float64 for integers beyond 32 bits) or, for
+#     fractional values, to float32 after rounding to `precision` significant
+#     digits
+#   - the layout template is pulled out and shared between charts by hash
+# plotly.js itself is loaded once by the page, from the CDN or vendored.
+
+DEFAULT_PRECISION = 6
+VENDORED_PLOTLY_NAME = 'plotly.min.js'
+
+INTEGER_DTYPES = ['i1', 'u1', 'i2', 'u2', 'i4', 'u4']
+
+
+def _typed_array(values, shape=None):
+    typed = {'dtype': values.dtype.str[1:], 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+    if shape is not None:
+        typed['shape'] = shape
+    return typed
+
+
+def round_significant(values, precision):
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.floor(np.log10(np.abs(values)))
+        scale = np.power(10.0, precision - 1 - np.where(np.isfinite(magnitude), magnitude, 0))
+        rounded = np.round(values * scale) / scale
+    return np.where(np.isfinite(rounded), rounded, values)
+
+
+def compact_array(values, precision=DEFAULT_PRECISION, shape=None):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) and np.all(np.isfinite(values)) and np.all(values == np.round(values)):
+        low, high = values.min(), values.max()
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if low >= info.min and high <= info.max:
+                return _typed_array(values.astype(dtype), shape)
+        # Beyond 32 bits: plotly.js has no 64-bit integer arrays, and float64
+        # holds integers exactly up to 2**53 where float32 would round them
+        return _typed_array(values, shape)
+    rounded = round_significant(values, precision)
+    # float32 holds ~7 significant digits, enough once values are rounded to 6
+    dtype = np.float32 if precision <= 7 else np.float64
+    return _typed_array(rounded.astype(dtype), shape)
+
+
+def _compact(value, precision):
+    if isinstance(value, dict):
+        if 'bdata' in value and 'dtype' in value:
+            values = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            if values.dtype.kind in 'iuf':
+                return compact_array(values, precision, value.get('shape'))
+            return value
+        return {key: _compact(item, precision) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_compact(item, precision) for item in value]
+    if isinstance(value, np.ndarray) and value.dtype.kind in 'iuf' and value.ndim == 1:
+        return compact_array(value, precision)
+    if isinstance(value, float):
+        return float(round_significant(value, precision))
+    return value
+
+
+def template_key(template):
+    return hashlib.sha1(to_json_plotly(template).encode('utf-8')).hexdigest()[:12]
+
+
+def figure_payload(fig, precision=DEFAULT_PRECISION):
+    figure = fig.to_plotly_json()
+    layout = dict(figure.get('layout', {}))
+    template = layout.pop('template', None)
+    payload = {
+        'data': _compact(figure.get('data', []), precision),
+        'layout': _compact(layout, precision),
+    }
+    if template is not None:
+        # Templates are not rounded; the page carries one copy per distinct template
+        payload['template'] = template
+    # Plain JSON types only (label arrays, dates), so payloads can be cached and bundled
+    return json.loads(to_json_plotly(payload))
+
+
+def payload_figure(payload):
+    # A payload back as a plotly figure dict (typed arrays stay typed arrays)
+    layout = dict(payload['layout'])
+    if 'template' in payload:
+        layout['template'] = payload['template']
+    return {'data': payload['data'], 'layout': layout}
+
+
+def bundle_payloads(payloads):
+    # chart id -> payload  =>  one page-level object with shared templates
+    templates = {}
+    charts = {}
+    for chart_id, payload in payloads.items():
+        chart = {'data': payload['data'], 'layout': payload['layout']}
+        if 'template' in payload:
+            key = template_key(payload['template'])
+            templates.setdefault(key, payload['template'])
+            chart['template'] = key
+        charts[chart_id] = chart
+    return {'templates': templates, 'charts': charts}
+
+
+def payload_script(bundle, element_id='dashboard-data'):
+    text = to_json_plotly(bundle).replace('</', '<\\/')
+    return f'<script type="application/json" id="{element_id}">{text}</script>'
+
+
+def plotly_script_tag(source='cdn', output_dir='.'):
+    if source == 'local':
+        # Vendor plotly.js next to the dashboard for offline / air-gapped viewing
+        path = os.path.join(output_dir, VENDORED_PLOTLY_NAME)
+        plotly_js = get_plotlyjs().encode('utf-8')
+        if not os.path.exists(path) or os.path.getsize(path) != len(plotly_js):
+            with open(path, 'wb') as f:
+                f.write(plotly_js)
+        src = VENDORED_PLOTLY_NAME
+    else:
+        src = f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'
+    return f'<script src="{src}" charset="utf-8"></script>'
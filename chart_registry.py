@@ -0,0 +1,103 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from build_trace import TRACER
+from chart_payloads import figure_payload
+from downsample import budget, use_webgl
+from event_feed import FeedCounts
+from summary_store import DatasetStats
+
+# Registry of dashboard fragments. Every chart (and every summary-card group)
+# is a builder function that declares the datasets it reads; the generator
+# schedules the builders and assembles their output in registration order.
+
+# A fragment with `stats` ({dataset: [columns]}) is given summary_store.DatasetStats
+# and one with `counts` ({dataset: [counters]}) event_feed.FeedCounts for those
+# datasets instead of frames, so it can be served from the persistent stores
+ChartSpec = namedtuple('ChartSpec', ['key', 'builder', 'datasets', 'section', 'label', 'title', 'counts'],
+                       defaults=(None,))
+SummarySpec = namedtuple('SummarySpec', ['key', 'builder', 'datasets', 'stats', 'counts'], defaults=(None, None))
+
+CHARTS = []
+SUMMARIES = []
+
+
+def register_chart(chart_id, datasets, section, label, title, counts=None):
+    def decorator(builder):
+        CHARTS.append(ChartSpec(chart_id, builder, list(datasets), section, label, title, counts))
+        return builder
+    return decorator
+
+
+def register_summary(key, datasets, stats=None, counts=None):
+    def decorator(builder):
+        SUMMARIES.append(SummarySpec(key, builder, list(datasets), stats, counts))
+        return builder
+    return decorator
+
+
+def fragment_inputs(spec, frames):
+    # What a builder is called with: frames, reduced to DatasetStats / FeedCounts
+    # where the spec asks for them (inputs already reduced pass through)
+    stats = getattr(spec, 'stats', None)
+    inputs = []
+    for name, frame in zip(spec.datasets, frames):
+        if isinstance(frame, pd.DataFrame):
+            if spec.counts is not None and name in spec.counts:
+                frame = FeedCounts.from_frame(frame, spec.counts[name])
+            elif stats is not None:
+                frame = DatasetStats.from_frame(frame, stats.get(name, []))
+        inputs.append(frame)
+    return inputs
+
+
+def render_fragment(spec, frames, output_mode='fragments'):
+    # 'fragments' -> standalone to_html() div, 'compact' -> JSON payload dict
+    category = 'summary' if isinstance(spec, SummarySpec) else 'render'
+    with TRACER.span(f'{category}:{spec.key}', category, rows=sum(len(frame) for frame in frames)):
+        frames = fragment_inputs(spec, frames)
+        with TRACER.span(f'figure:{spec.key}', 'figure') as span:
+            result = spec.builder(*frames)
+            if not isinstance(spec, SummarySpec):
+                result, span['webgl_traces'] = use_webgl(result)
+                span['webgl_threshold'] = budget('webgl')
+        if isinstance(spec, SummarySpec):
+            return result
+        with TRACER.span(f'serialize:{spec.key}', 'serialize', output_mode=output_mode):
+            if output_mode == 'compact':
+                return figure_payload(result)
+            return result.to_html(full_html=False, include_plotlyjs='cdn')
+
+
+def _render_in_worker(spec, frames, output_mode, trace_options):
+    # Pool processes have their own tracer: record there and send the spans back
+    TRACER.configure(**trace_options)
+    mark = len(TRACER.events)
+    result = render_fragment(spec, frames, output_mode)
+    return result, TRACER.drain(mark)
+
+
+def render_all(specs, data, workers=1, executor='process', output_mode='fragments'):
+    # Run the builders, in a pool when workers > 1. Results are keyed by spec
+    # so the caller can assemble them in a fixed order whatever finishes first.
+    jobs = [(spec, [data[name] for name in spec.datasets]) for spec in specs]
+    if workers <= 1 or len(jobs) <= 1:
+        return {spec.key: render_fragment(spec, frames, output_mode) for spec, frames in jobs}
+
+    if executor != 'process':
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {spec.key: pool.submit(render_fragment, spec, frames, output_mode)
+                       for spec, frames in jobs}
+            return {key: future.result() for key, future in futures.items()}
+
+    trace_options = {'enabled': TRACER.enabled, 'memory': TRACER.memory}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {spec.key: pool.submit(_render_in_worker, spec, frames, output_mode, trace_options)
+                   for spec, frames in jobs}
+        results = {}
+        for key, future in futures.items():
+            results[key], events = future.result()
+            TRACER.extend(events)
+        return results
@@ -1,521 +1,937 @@
+import argparse
+import hashlib
+import os
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
 import json
+from collections import defaultdict
 
-# Read all datasets
-print("Loading datasets...")
-health_campaign = pd.read_csv('Health_Campaign_Dataset_50.csv')
-disability_district = pd.read_csv('HH_Disability_District.csv')
-disability_state = pd.read_csv('HH_Disability_State.csv')
-awareness = pd.read_csv('XX_Awareness_On_HIV_AIDS_RTI_STI_HAF_ORS_ORT_ZINC_And_ARI_Pneumonia_District.csv')
-events = pd.read_csv('events .csv')
-webinars = pd.read_csv('wedner data set .csv')
-hospitals = pd.read_csv('private hosipitals.csv')
-
-# Clean column names (remove leading/trailing spaces)
-health_campaign.columns = health_campaign.columns.str.strip()
-disability_district.columns = disability_district.columns.str.strip()
-disability_state.columns = disability_state.columns.str.strip()
-awareness.columns = awareness.columns.str.strip()
-events.columns = events.columns.str.strip()
-webinars.columns = webinars.columns.str.strip()
-hospitals.columns = hospitals.columns.str.strip()
-
-# Store all chart data
-charts_data = []
-
-print("Generating visualizations...")
+from aggregations import aggregate
+from asset_publisher import AssetPublisher
+from build_cache import CACHE_DIR, BuildCache, file_sha256
+from build_trace import TRACER, parse_budget, parse_budgets
+from datasets import DATASET_FILES, load_datasets, report_load
+from district_join import correlation, fact_table, set_keys_path
+from downsample import POINT_BUDGETS, bin_scatter, budget, lttb, set_budgets, top_n, top_n_other
+from chart_payloads import bundle_payloads, payload_script, plotly_script_tag
+from chart_registry import CHARTS, SUMMARIES, register_chart, register_summary, render_all
+from event_feed import FeedStore
+from gap_metrics import gap_metrics, indicator_columns, topic_summary
+from image_export import IMAGE_FORMATS, ImageExporter
+from rankings import top_k
+from schema import column_view
+from snapshot_store import SNAPSHOT_DIR, SnapshotStore
+from state_index import join_state
+from summary_store import SummaryStore
 
 # ============= HEALTH CAMPAIGN ANALYSIS =============
 
 # 1. Campaign Performance by Channel
-channel_performance = health_campaign.groupby('Channel').agg({
-    'Impressions': 'sum',
-    'Engagements': 'sum',
-    'Behavior Change (%)': 'mean',
-    'Feedback Score': 'mean'
-}).reset_index()
-
-fig1 = go.Figure()
-fig1.add_trace(go.Bar(
-    x=channel_performance['Channel'],
-    y=channel_performance['Impressions'],
-    name='Impressions',
-    marker_color='#3498db'
-))
-fig1.add_trace(go.Bar(
-    x=channel_performance['Channel'],
-    y=channel_performance['Engagements'],
-    name='Engagements',
-    marker_color='#e74c3c'
-))
-fig1.update_layout(
-    title='Campaign Performance by Channel',
-    xaxis_title='Channel',
-    yaxis_title='Count',
-    barmode='group',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('campaign_channel_performance', fig1.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('campaign_channel_performance', datasets=['health_campaign'], section='Health Campaigns',
+                label='Channel Performance', title='📢 Campaign Performance by Channel')
+def chart_campaign_channel_performance(health_campaign):
+    channel_performance = aggregate(health_campaign, ['Channel'], {
+        'Impressions': 'sum',
+        'Engagements': 'sum',
+        'Behavior Change (%)': 'mean',
+        'Feedback Score': 'mean'
+    })
+
+    fig1 = go.Figure()
+    fig1.add_trace(go.Bar(
+        x=channel_performance['Channel'],
+        y=channel_performance['Impressions'],
+        name='Impressions',
+        marker_color='#3498db'
+    ))
+    fig1.add_trace(go.Bar(
+        x=channel_performance['Channel'],
+        y=channel_performance['Engagements'],
+        name='Engagements',
+        marker_color='#e74c3c'
+    ))
+    fig1.update_layout(
+        title='Campaign Performance by Channel',
+        xaxis_title='Channel',
+        yaxis_title='Count',
+        barmode='group',
+        template='plotly_white',
+        height=400
+    )
+    return fig1
+
 
 # 2. Campaign Name Comparison
-campaign_stats = health_campaign.groupby('Campaign Name').agg({
-    'Impressions': 'sum',
-    'Engagements': 'sum',
-    'Behavior Change (%)': 'mean',
-    'Feedback Score': 'mean'
-}).reset_index()
-
-fig2 = go.Figure(data=[
-    go.Bar(name='Total Impressions', x=campaign_stats['Campaign Name'], y=campaign_stats['Impressions'], marker_color='#9b59b6'),
-    go.Bar(name='Total Engagements', x=campaign_stats['Campaign Name'], y=campaign_stats['Engagements'], marker_color='#1abc9c')
-])
-fig2.update_layout(
-    title='Campaign Performance Comparison',
-    xaxis_title='Campaign',
-    yaxis_title='Total Count',
-    barmode='group',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('campaign_comparison', fig2.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('campaign_comparison', datasets=['health_campaign'], section='Health Campaigns',
+                label='Campaign Comparison', title='📢 Campaign Comparison')
+def chart_campaign_comparison(health_campaign):
+    campaign_stats = aggregate(health_campaign, ['Campaign Name'], {
+        'Impressions': 'sum',
+        'Engagements': 'sum',
+        'Behavior Change (%)': 'mean',
+        'Feedback Score': 'mean'
+    })
+
+    fig2 = go.Figure(data=[
+        go.Bar(name='Total Impressions', x=campaign_stats['Campaign Name'], y=campaign_stats['Impressions'], marker_color='#9b59b6'),
+        go.Bar(name='Total Engagements', x=campaign_stats['Campaign Name'], y=campaign_stats['Engagements'], marker_color='#1abc9c')
+    ])
+    fig2.update_layout(
+        title='Campaign Performance Comparison',
+        xaxis_title='Campaign',
+        yaxis_title='Total Count',
+        barmode='group',
+        template='plotly_white',
+        height=400
+    )
+    return fig2
+
 
 # 3. Demographics Analysis
-demo_age = health_campaign.groupby(['Age Group', 'Gender']).size().reset_index(name='Count')
-fig3 = px.sunburst(demo_age, path=['Age Group', 'Gender'], values='Count',
-                   title='Demographics Distribution (Age Group & Gender)',
-                   color='Count',
-                   color_continuous_scale='RdYlBu',
-                   height=500)
-charts_data.append(('demographics_sunburst', fig3.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('demographics_sunburst', datasets=['health_campaign'], section='Health Campaigns',
+                label='Demographics', title='📢 Demographics Distribution')
+def chart_demographics_sunburst(health_campaign):
+    demo_age = aggregate(health_campaign, ['Age Group', 'Gender'], size='Count')
+    fig3 = px.sunburst(demo_age, path=['Age Group', 'Gender'], values='Count',
+                       title='Demographics Distribution (Age Group & Gender)',
+                       color='Count',
+                       color_continuous_scale='RdYlBu',
+                       height=500)
+    return fig3
+
 
 # 4. Location-wise Performance
-location_stats = health_campaign.groupby('Location').agg({
-    'Behavior Change (%)': 'mean',
-    'Feedback Score': 'mean',
-    'Impressions': 'sum'
-}).reset_index()
-
-fig4 = make_subplots(rows=1, cols=2, 
-                     subplot_titles=('Avg Behavior Change by Location', 'Avg Feedback Score by Location'))
-fig4.add_trace(
-    go.Bar(x=location_stats['Location'], y=location_stats['Behavior Change (%)'], 
-           marker_color='#f39c12', name='Behavior Change %'),
-    row=1, col=1
-)
-fig4.add_trace(
-    go.Bar(x=location_stats['Location'], y=location_stats['Feedback Score'], 
-           marker_color='#27ae60', name='Feedback Score'),
-    row=1, col=2
-)
-fig4.update_layout(title='Performance Metrics by Location', height=400, template='plotly_white', showlegend=False)
-charts_data.append(('location_performance', fig4.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('location_performance', datasets=['health_campaign'], section='Health Campaigns',
+                label='Location Performance', title='📢 Performance Metrics by Location')
+def chart_location_performance(health_campaign):
+    location_stats = aggregate(health_campaign, ['Location'], {
+        'Behavior Change (%)': 'mean',
+        'Feedback Score': 'mean',
+        'Impressions': 'sum'
+    })
+
+    fig4 = make_subplots(rows=1, cols=2,
+                         subplot_titles=('Avg Behavior Change by Location', 'Avg Feedback Score by Location'))
+    fig4.add_trace(
+        go.Bar(x=location_stats['Location'], y=location_stats['Behavior Change (%)'],
+               marker_color='#f39c12', name='Behavior Change %'),
+        row=1, col=1
+    )
+    fig4.add_trace(
+        go.Bar(x=location_stats['Location'], y=location_stats['Feedback Score'],
+               marker_color='#27ae60', name='Feedback Score'),
+        row=1, col=2
+    )
+    fig4.update_layout(title='Performance Metrics by Location', height=400, template='plotly_white', showlegend=False)
+    return fig4
+
 
 # 5. Time Series of Campaigns
-health_campaign['Date'] = pd.to_datetime(health_campaign['Date'])
-health_campaign = health_campaign.sort_values('Date')
-daily_stats = health_campaign.groupby('Date').agg({
-    'Impressions': 'sum',
-    'Engagements': 'sum'
-}).reset_index()
-
-fig5 = go.Figure()
-fig5.add_trace(go.Scatter(x=daily_stats['Date'], y=daily_stats['Impressions'],
-                          mode='lines+markers', name='Impressions',
-                          line=dict(color='#3498db', width=2)))
-fig5.add_trace(go.Scatter(x=daily_stats['Date'], y=daily_stats['Engagements'],
-                          mode='lines+markers', name='Engagements',
-                          line=dict(color='#e74c3c', width=2)))
-fig5.update_layout(
-    title='Campaign Activity Over Time',
-    xaxis_title='Date',
-    yaxis_title='Count',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('time_series', fig5.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('time_series', datasets=['health_campaign'], section='Health Campaigns',
+                label='Time Series', title='📢 Campaign Activity Over Time')
+def chart_time_series(health_campaign):
+    # Date is parsed at load time (datasets.DATE_COLUMNS) and groups come back sorted
+    daily_stats = aggregate(health_campaign, ['Date'], {
+        'Impressions': 'sum',
+        'Engagements': 'sum'
+    })
+
+    # Long ranges are reduced per series with LTTB (downsample.POINT_BUDGETS['line'])
+    impressions = lttb(daily_stats, 'Date', 'Impressions')
+    engagements = lttb(daily_stats, 'Date', 'Engagements')
+
+    fig5 = go.Figure()
+    fig5.add_trace(go.Scatter(x=impressions['Date'], y=impressions['Impressions'],
+                              mode='lines+markers', name='Impressions',
+                              line=dict(color='#3498db', width=2)))
+    fig5.add_trace(go.Scatter(x=engagements['Date'], y=engagements['Engagements'],
+                              mode='lines+markers', name='Engagements',
+                              line=dict(color='#e74c3c', width=2)))
+    fig5.update_layout(
+        title='Campaign Activity Over Time',
+        xaxis_title='Date',
+        yaxis_title='Count',
+        template='plotly_white',
+        height=400
+    )
+    return fig5
+
 
 # ============= DISABILITY ANALYSIS =============
 
 # 6. State-level Disability Prevalence
-fig6 = go.Figure()
-fig6.add_trace(go.Bar(
-    x=disability_state['State_Name'],
-    y=disability_state['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total'],
-    name='Total',
-    marker_color='#8e44ad'
-))
-fig6.add_trace(go.Bar(
-    x=disability_state['State_Name'],
-    y=disability_state['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Rural'],
-    name='Rural',
-    marker_color='#16a085'
-))
-fig6.add_trace(go.Bar(
-    x=disability_state['State_Name'],
-    y=disability_state['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Urban'],
-    name='Urban',
-    marker_color='#e67e22'
-))
-fig6.update_layout(
-    title='Disability Prevalence by State (Per 100,000 Population)',
-    xaxis_title='State',
-    yaxis_title='Prevalence Rate',
-    barmode='group',
-    template='plotly_white',
-    height=500,
-    xaxis={'tickangle': -45}
-)
-charts_data.append(('disability_state', fig6.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('disability_state', datasets=['disability_state'], section='Disability Analysis',
+                label='State Prevalence', title='♿ Disability Prevalence by State')
+def chart_disability_state(disability_state):
+    indicators = indicator_columns(disability_state.columns)
+    fig6 = go.Figure()
+    for area, color in [('Total', '#8e44ad'), ('Rural', '#16a085'), ('Urban', '#e67e22')]:
+        fig6.add_trace(go.Bar(
+            x=disability_state['State_Name'],
+            y=disability_state[indicators[('Any_Type_Of_Disability', 'Person', area)]],
+            name=area,
+            marker_color=color
+        ))
+    fig6.update_layout(
+        title='Disability Prevalence by State (Per 100,000 Population)',
+        xaxis_title='State',
+        yaxis_title='Prevalence Rate',
+        barmode='group',
+        template='plotly_white',
+        height=500,
+        xaxis={'tickangle': -45}
+    )
+    return fig6
+
 
 # 7. Gender-wise Disability Comparison
-gender_disability = disability_state[['State_Name', 
-                                       'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Male_Total',
-                                       'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Female_Total']].copy()
-gender_disability.columns = ['State', 'Male', 'Female']
-
-fig7 = go.Figure()
-fig7.add_trace(go.Scatter(x=gender_disability['State'], y=gender_disability['Male'],
-                          mode='markers+lines', name='Male',
-                          marker=dict(size=10, color='#3498db'),
-                          line=dict(color='#3498db', width=2)))
-fig7.add_trace(go.Scatter(x=gender_disability['State'], y=gender_disability['Female'],
-                          mode='markers+lines', name='Female',
-                          marker=dict(size=10, color='#e74c3c'),
-                          line=dict(color='#e74c3c', width=2)))
-fig7.update_layout(
-    title='Gender-wise Disability Prevalence Comparison',
-    xaxis_title='State',
-    yaxis_title='Prevalence per 100,000',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('gender_disability', fig7.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('gender_disability', datasets=['disability_state'], section='Disability Analysis',
+                label='Gender Comparison', title='♿ Gender-wise Disability Comparison')
+def chart_gender_disability(disability_state):
+    indicators = indicator_columns(disability_state.columns)
+    gender_disability = column_view(disability_state, {
+        'State_Name': 'State',
+        indicators[('Any_Type_Of_Disability', 'Male', 'Total')]: 'Male',
+        indicators[('Any_Type_Of_Disability', 'Female', 'Total')]: 'Female',
+    })
+
+    fig7 = go.Figure()
+    fig7.add_trace(go.Scatter(x=gender_disability['State'], y=gender_disability['Male'],
+                              mode='markers+lines', name='Male',
+                              marker=dict(size=10, color='#3498db'),
+                              line=dict(color='#3498db', width=2)))
+    fig7.add_trace(go.Scatter(x=gender_disability['State'], y=gender_disability['Female'],
+                              mode='markers+lines', name='Female',
+                              marker=dict(size=10, color='#e74c3c'),
+                              line=dict(color='#e74c3c', width=2)))
+    fig7.update_layout(
+        title='Gender-wise Disability Prevalence Comparison',
+        xaxis_title='State',
+        yaxis_title='Prevalence per 100,000',
+        template='plotly_white',
+        height=400
+    )
+    return fig7
+
 
 # 8. Top 10 Districts with Highest Disability Rates
-top_districts = disability_district.nlargest(10, 'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total')
-
-fig8 = go.Figure(go.Bar(
-    x=top_districts['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total'],
-    y=top_districts['State_District_Name'] + ', ' + top_districts['State_Name'],
-    orientation='h',
-    marker_color='#c0392b'
-))
-fig8.update_layout(
-    title='Top 10 Districts with Highest Disability Prevalence',
-    xaxis_title='Prevalence per 100,000',
-    yaxis_title='District',
-    template='plotly_white',
-    height=500
-)
-charts_data.append(('top_districts_disability', fig8.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('top_districts_disability', datasets=['disability_district', 'disability_state'],
+                section='Disability Analysis', label='Top 10 Districts',
+                title='♿ Top 10 Districts with Highest Disability')
+def chart_top_districts_disability(disability_district, disability_state):
+    prevalence = 'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total'
+    # Each district next to its state's rate; unmatched states show NaN
+    top_districts = join_state(top_k(disability_district, 10, prevalence), disability_state, [prevalence])
+
+    fig8 = go.Figure(go.Bar(
+        x=top_districts[prevalence],
+        y=top_districts['State_District_Name'].astype(str) + ', ' + top_districts['State_Name'].astype(str),
+        orientation='h',
+        marker_color='#c0392b',
+        customdata=top_districts[prevalence + '_state'],
+        hovertemplate='<b>%{y}</b><br>District: %{x:,.0f}<br>State: %{customdata:,.0f}<extra></extra>'
+    ))
+    fig8.update_layout(
+        title='Top 10 Districts with Highest Disability Prevalence',
+        xaxis_title='Prevalence per 100,000',
+        yaxis_title='District',
+        template='plotly_white',
+        height=500
+    )
+    return fig8
+
 
 # ============= HIV/AIDS AWARENESS ANALYSIS =============
 
 # 9. State-wise HIV/AIDS Awareness
-state_awareness = awareness.groupby('State_Name').agg({
-    'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total': 'mean',
-    'XX_Women_Who_Are_Aware_Of_Rti_Sti_Total': 'mean',
-    'XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total': 'mean',
-    'XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total': 'mean'
-}).reset_index()
-
-fig9 = go.Figure()
-fig9.add_trace(go.Bar(name='HIV/AIDS', x=state_awareness['State_Name'], 
-                      y=state_awareness['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total'],
-                      marker_color='#e74c3c'))
-fig9.add_trace(go.Bar(name='RTI/STI', x=state_awareness['State_Name'], 
-                      y=state_awareness['XX_Women_Who_Are_Aware_Of_Rti_Sti_Total'],
-                      marker_color='#3498db'))
-fig9.add_trace(go.Bar(name='HAF/ORS/ORT/ZINC', x=state_awareness['State_Name'], 
-                      y=state_awareness['XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total'],
-                      marker_color='#2ecc71'))
-fig9.add_trace(go.Bar(name='ARI/Pneumonia', x=state_awareness['State_Name'], 
-                      y=state_awareness['XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total'],
-                      marker_color='#f39c12'))
-fig9.update_layout(
-    title='Women\'s Health Awareness by State (%)',
-    xaxis_title='State',
-    yaxis_title='Awareness %',
-    barmode='group',
-    template='plotly_white',
-    height=500,
-    xaxis={'tickangle': -45}
-)
-charts_data.append(('state_awareness', fig9.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('state_awareness', datasets=['awareness'], section='Health Awareness',
+                label='State Awareness', title='🎗️ Women\'s Health Awareness by State')
+def chart_state_awareness(awareness):
+    state_awareness = aggregate(awareness, ['State_Name'], {
+        'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total': 'mean',
+        'XX_Women_Who_Are_Aware_Of_Rti_Sti_Total': 'mean',
+        'XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total': 'mean',
+        'XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total': 'mean'
+    })
+
+    fig9 = go.Figure()
+    fig9.add_trace(go.Bar(name='HIV/AIDS', x=state_awareness['State_Name'],
+                          y=state_awareness['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total'],
+                          marker_color='#e74c3c'))
+    fig9.add_trace(go.Bar(name='RTI/STI', x=state_awareness['State_Name'],
+                          y=state_awareness['XX_Women_Who_Are_Aware_Of_Rti_Sti_Total'],
+                          marker_color='#3498db'))
+    fig9.add_trace(go.Bar(name='HAF/ORS/ORT/ZINC', x=state_awareness['State_Name'],
+                          y=state_awareness['XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total'],
+                          marker_color='#2ecc71'))
+    fig9.add_trace(go.Bar(name='ARI/Pneumonia', x=state_awareness['State_Name'],
+                          y=state_awareness['XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total'],
+                          marker_color='#f39c12'))
+    fig9.update_layout(
+        title='Women\'s Health Awareness by State (%)',
+        xaxis_title='State',
+        yaxis_title='Awareness %',
+        barmode='group',
+        template='plotly_white',
+        height=500,
+        xaxis={'tickangle': -45}
+    )
+    return fig9
+
 
 # 10. Rural vs Urban Awareness Comparison
-rural_urban = awareness[['State_District_Name', 
-                         'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Rural',
-                         'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Urban']].dropna()
-rural_urban = rural_urban.head(20)  # Top 20 districts
-
-fig10 = go.Figure()
-fig10.add_trace(go.Scatter(
-    x=rural_urban['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Rural'],
-    y=rural_urban['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Urban'],
-    mode='markers',
-    marker=dict(size=12, color='#9b59b6', opacity=0.6),
-    text=rural_urban['State_District_Name'],
-    name='Districts'
-))
-fig10.add_trace(go.Scatter(
-    x=[0, 100], y=[0, 100],
-    mode='lines',
-    line=dict(color='red', dash='dash'),
-    name='Equal Awareness Line'
-))
-fig10.update_layout(
-    title='HIV/AIDS Awareness: Rural vs Urban (%)',
-    xaxis_title='Rural Awareness %',
-    yaxis_title='Urban Awareness %',
-    template='plotly_white',
-    height=500
-)
-charts_data.append(('rural_urban_awareness', fig10.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('rural_urban_awareness', datasets=['awareness'], section='Health Awareness',
+                label='Rural vs Urban', title='🎗️ HIV/AIDS Awareness: Rural vs Urban')
+def chart_rural_urban_awareness(awareness):
+    indicators = indicator_columns(awareness.columns)
+    rural, urban = (indicators[('Hiv_Aids', 'Female', area)] for area in ('Rural', 'Urban'))
+    rural_urban = column_view(awareness, ['State_District_Name', rural, urban]).dropna()
+    # Every district; past the scatter budget the cloud is binned and sized by count
+    rural_urban = bin_scatter(rural_urban, rural, urban)
+    binned = 'count' in rural_urban.columns
+
+    fig10 = go.Figure()
+    fig10.add_trace(go.Scatter(
+        x=rural_urban[rural],
+        y=rural_urban[urban],
+        mode='markers',
+        marker=dict(size=np.sqrt(rural_urban['count']) * 4 + 4 if binned else 12,
+                    color='#9b59b6', opacity=0.6),
+        text='Districts: ' + rural_urban['count'].astype(str) if binned else rural_urban['State_District_Name'],
+        name='Districts'
+    ))
+    fig10.add_trace(go.Scatter(
+        x=[0, 100], y=[0, 100],
+        mode='lines',
+        line=dict(color='red', dash='dash'),
+        name='Equal Awareness Line'
+    ))
+    fig10.update_layout(
+        title='HIV/AIDS Awareness: Rural vs Urban (%)',
+        xaxis_title='Rural Awareness %',
+        yaxis_title='Urban Awareness %',
+        template='plotly_white',
+        height=500
+    )
+    return fig10
+
 
 # 11. Comprehensive Awareness Heatmap
-awareness_sample = awareness[['State_District_Name',
-                              'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total',
-                              'XX_Women_Who_Are_Aware_Of_Rti_Sti_Total',
-                              'XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total',
-                              'XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total']].head(30)
-awareness_sample.columns = ['District', 'HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia']
-
-fig11 = go.Figure(data=go.Heatmap(
-    z=awareness_sample[['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia']].values.T,
-    x=awareness_sample['District'],
-    y=['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia'],
-    colorscale='Viridis',
-    text=awareness_sample[['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia']].values.T,
-    texttemplate='%{text:.1f}',
-    textfont={"size": 8}
-))
-fig11.update_layout(
-    title='Health Awareness Heatmap (Top 30 Districts)',
-    xaxis_title='District',
-    yaxis_title='Health Topic',
-    height=400,
-    xaxis={'tickangle': -90, 'tickfont': {'size': 8}}
-)
-charts_data.append(('awareness_heatmap', fig11.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('awareness_heatmap', datasets=['awareness'], section='Health Awareness',
+                label='Awareness Heatmap', title='🎗️ Health Awareness Heatmap')
+def chart_awareness_heatmap(awareness):
+    awareness_sample = column_view(awareness, {
+        'State_District_Name': 'District',
+        'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total': 'HIV/AIDS',
+        'XX_Women_Who_Are_Aware_Of_Rti_Sti_Total': 'RTI/STI',
+        'XX_Women_Who_Are_Aware_Of_Haf_Ors_Ort_Zinc_Total': 'HAF/ORS/ORT/ZINC',
+        'XX_Women_Who_Are_Aware_Of_Danger_Signs_Of_Ari_Pneumonia_Total': 'ARI/Pneumonia',
+    })
+    # The districts with the highest HIV/AIDS awareness, up to the heatmap column budget
+    awareness_sample = top_n(awareness_sample, 'HIV/AIDS', budget('heatmap'))
+
+    fig11 = go.Figure(data=go.Heatmap(
+        z=awareness_sample[['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia']].values.T,
+        x=awareness_sample['District'],
+        y=['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia'],
+        colorscale='Viridis',
+        text=awareness_sample[['HIV/AIDS', 'RTI/STI', 'HAF/ORS/ORT/ZINC', 'ARI/Pneumonia']].values.T,
+        texttemplate='%{text:.1f}',
+        textfont={"size": 8}
+    ))
+    fig11.update_layout(
+        title=f'Health Awareness Heatmap (Top {len(awareness_sample)} Districts)',
+        xaxis_title='District',
+        yaxis_title='Health Topic',
+        height=400,
+        xaxis={'tickangle': -90, 'tickfont': {'size': 8}}
+    )
+    return fig11
+
 
 # ============= EVENTS ANALYSIS =============
 
 # 12. Events Timeline by Category
-events_timeline = events.groupby(['Month', 'Category']).size().reset_index(name='Count')
-fig12 = px.line(events_timeline, x='Month', y='Count', color='Category',
-                markers=True, title='Health Events Timeline by Category')
-fig12.update_layout(
-    template='plotly_white',
-    height=400,
-    xaxis_title='Month',
-    yaxis_title='Number of Events'
-)
-charts_data.append(('events_timeline', fig12.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('events_timeline', datasets=['events'], section='Events & Programs',
+                label='Events Timeline', title='📅 Health Events Timeline by Category',
+                counts={'events': ['Month|Category']})
+def chart_events_timeline(events):
+    events_timeline = events.size(['Month', 'Category']).reset_index(name='Count')
+    fig12 = px.line(events_timeline, x='Month', y='Count', color='Category',
+                    markers=True, title='Health Events Timeline by Category')
+    fig12.update_layout(
+        template='plotly_white',
+        height=400,
+        xaxis_title='Month',
+        yaxis_title='Number of Events'
+    )
+    return fig12
+
 
 # 13. Events Sentiment Distribution
-sentiment_counts = events['Sentiment'].value_counts()
-fig13 = go.Figure(data=[go.Pie(
-    labels=sentiment_counts.index,
-    values=sentiment_counts.values,
-    hole=0.4,
-    marker=dict(colors=['#2ecc71', '#3498db', '#e74c3c'])
-)])
-fig13.update_layout(
-    title='Events Sentiment Distribution',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('events_sentiment', fig13.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('events_sentiment', datasets=['events'], section='Events & Programs',
+                label='Events Sentiment', title='📅 Events Sentiment Distribution',
+                counts={'events': ['Sentiment']})
+def chart_events_sentiment(events):
+    sentiment_counts = events.value_counts('Sentiment')
+    fig13 = go.Figure(data=[go.Pie(
+        labels=sentiment_counts.index,
+        values=sentiment_counts.values,
+        hole=0.4,
+        marker=dict(colors=['#2ecc71', '#3498db', '#e74c3c'])
+    )])
+    fig13.update_layout(
+        title='Events Sentiment Distribution',
+        template='plotly_white',
+        height=400
+    )
+    return fig13
+
 
 # 14. Events by Scheme
-scheme_counts = events['Scheme'].value_counts().head(10)
-fig14 = go.Figure(data=[go.Bar(
-    x=scheme_counts.values,
-    y=scheme_counts.index,
-    orientation='h',
-    marker_color='#9b59b6'
-)])
-fig14.update_layout(
-    title='Top 10 Health Schemes by Event Count',
-    xaxis_title='Number of Events',
-    yaxis_title='Scheme',
-    template='plotly_white',
-    height=450
-)
-charts_data.append(('events_by_scheme', fig14.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('events_by_scheme', datasets=['events'], section='Events & Programs',
+                label='Events by Scheme', title='📅 Top Health Schemes by Event Count',
+                counts={'events': ['Scheme']})
+def chart_events_by_scheme(events):
+    scheme_counts = events.value_counts('Scheme').head(10)
+    fig14 = go.Figure(data=[go.Bar(
+        x=scheme_counts.values,
+        y=scheme_counts.index,
+        orientation='h',
+        marker_color='#9b59b6'
+    )])
+    fig14.update_layout(
+        title='Top 10 Health Schemes by Event Count',
+        xaxis_title='Number of Events',
+        yaxis_title='Scheme',
+        template='plotly_white',
+        height=450
+    )
+    return fig14
+
 
 # ============= WEBINARS & TRAINING ANALYSIS =============
 
 # 15. Webinar/Training Event Types Distribution
-event_type_counts = webinars['Category'].value_counts()
-fig15 = go.Figure(data=[go.Pie(
-    labels=event_type_counts.index,
-    values=event_type_counts.values,
-    marker=dict(colors=['#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6'])
-)])
-fig15.update_layout(
-    title='Distribution of Training Events by Type',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('webinar_types', fig15.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('webinar_types', datasets=['webinars'], section='Webinars & Training',
+                label='Event Types', title='🎓 Training Event Types Distribution',
+                counts={'webinars': ['Category']})
+def chart_webinar_types(webinars):
+    event_type_counts = webinars.value_counts('Category')
+    fig15 = go.Figure(data=[go.Pie(
+        labels=event_type_counts.index,
+        values=event_type_counts.values,
+        marker=dict(colors=['#e74c3c', '#3498db', '#2ecc71', '#f39c12', '#9b59b6'])
+    )])
+    fig15.update_layout(
+        title='Distribution of Training Events by Type',
+        template='plotly_white',
+        height=400
+    )
+    return fig15
+
 
 # 16. Focus Area Analysis
-focus_area_counts = webinars['Focus Area'].value_counts()
-fig16 = go.Figure(data=[go.Bar(
-    x=focus_area_counts.index,
-    y=focus_area_counts.values,
-    marker_color='#16a085'
-)])
-fig16.update_layout(
-    title='Training Events by Focus Area',
-    xaxis_title='Focus Area',
-    yaxis_title='Number of Events',
-    template='plotly_white',
-    height=400,
-    xaxis={'tickangle': -45}
-)
-charts_data.append(('focus_area_distribution', fig16.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('focus_area_distribution', datasets=['webinars'], section='Webinars & Training',
+                label='Focus Areas', title='🎓 Training Events by Focus Area',
+                counts={'webinars': ['Focus Area']})
+def chart_focus_area_distribution(webinars):
+    focus_area_counts = webinars.value_counts('Focus Area')
+    fig16 = go.Figure(data=[go.Bar(
+        x=focus_area_counts.index,
+        y=focus_area_counts.values,
+        marker_color='#16a085'
+    )])
+    fig16.update_layout(
+        title='Training Events by Focus Area',
+        xaxis_title='Focus Area',
+        yaxis_title='Number of Events',
+        template='plotly_white',
+        height=400,
+        xaxis={'tickangle': -45}
+    )
+    return fig16
+
 
 # 17. Mode of Delivery Analysis
-mode_counts = webinars['Mode'].value_counts()
-fig17 = go.Figure(data=[go.Funnel(
-    y=mode_counts.index,
-    x=mode_counts.values,
-    textinfo="value+percent initial",
-    marker=dict(color=['#3498db', '#e74c3c', '#2ecc71'])
-)])
-fig17.update_layout(
-    title='Event Delivery Mode Distribution',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('delivery_mode', fig17.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('delivery_mode', datasets=['webinars'], section='Webinars & Training',
+                label='Delivery Mode', title='🎓 Event Delivery Mode Distribution',
+                counts={'webinars': ['Mode']})
+def chart_delivery_mode(webinars):
+    mode_counts = webinars.value_counts('Mode')
+    fig17 = go.Figure(data=[go.Funnel(
+        y=mode_counts.index,
+        x=mode_counts.values,
+        textinfo="value+percent initial",
+        marker=dict(color=['#3498db', '#e74c3c', '#2ecc71'])
+    )])
+    fig17.update_layout(
+        title='Event Delivery Mode Distribution',
+        template='plotly_white',
+        height=400
+    )
+    return fig17
+
 
 # ============= HOSPITAL ANALYSIS =============
 
 # 18. Public vs Private Hospital Comparison
-fig18 = go.Figure()
-fig18.add_trace(go.Bar(
-    x=hospitals['District'],
-    y=hospitals['Public Hospitals'],
-    name='Public Hospitals',
-    marker_color='#2ecc71'
-))
-fig18.add_trace(go.Bar(
-    x=hospitals['District'],
-    y=hospitals['Private Hospitals'],
-    name='Private Hospitals',
-    marker_color='#e74c3c'
-))
-fig18.update_layout(
-    title='Public vs Private Hospitals by District',
-    xaxis_title='District',
-    yaxis_title='Number of Hospitals',
-    barmode='group',
-    template='plotly_white',
-    height=450,
-    xaxis={'tickangle': -45}
-)
-charts_data.append(('hospital_comparison', fig18.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('hospital_comparison', datasets=['hospitals'], section='Hospital Infrastructure',
+                label='Public vs Private', title='🏥 Public vs Private Hospitals by District')
+def chart_hospital_comparison(hospitals):
+    # Largest districts by total hospitals, the rest grouped as "Other"
+    districts = top_n_other(hospitals, 'District', ['Total Hospitals', 'Public Hospitals', 'Private Hospitals'])
+
+    fig18 = go.Figure()
+    fig18.add_trace(go.Bar(
+        x=districts['District'],
+        y=districts['Public Hospitals'],
+        name='Public Hospitals',
+        marker_color='#2ecc71'
+    ))
+    fig18.add_trace(go.Bar(
+        x=districts['District'],
+        y=districts['Private Hospitals'],
+        name='Private Hospitals',
+        marker_color='#e74c3c'
+    ))
+    fig18.update_layout(
+        title='Public vs Private Hospitals by District',
+        xaxis_title='District',
+        yaxis_title='Number of Hospitals',
+        barmode='group',
+        template='plotly_white',
+        height=450,
+        xaxis={'tickangle': -45}
+    )
+    return fig18
+
 
 # 19. Performance Category Distribution
-performance_counts = hospitals['Performance Category'].value_counts()
-fig19 = go.Figure(data=[go.Bar(
-    x=performance_counts.index,
-    y=performance_counts.values,
-    marker=dict(
-        color=performance_counts.values,
-        colorscale='RdYlGn',
-        showscale=True
+@register_chart('performance_categories', datasets=['hospitals'], section='Hospital Infrastructure',
+                label='Performance Categories', title='🏥 Hospital Performance Categories')
+def chart_performance_categories(hospitals):
+    performance_counts = hospitals['Performance Category'].value_counts()
+    fig19 = go.Figure(data=[go.Bar(
+        x=performance_counts.index,
+        y=performance_counts.values,
+        marker=dict(
+            color=performance_counts.values,
+            colorscale='RdYlGn',
+            showscale=True
+        )
+    )])
+    fig19.update_layout(
+        title='Hospital Performance Categories',
+        xaxis_title='Performance Category',
+        yaxis_title='Number of Districts',
+        template='plotly_white',
+        height=400
     )
-)])
-fig19.update_layout(
-    title='Hospital Performance Categories',
-    xaxis_title='Performance Category',
-    yaxis_title='Number of Districts',
-    template='plotly_white',
-    height=400
-)
-charts_data.append(('performance_categories', fig19.to_html(full_html=False, include_plotlyjs='cdn')))
+    return fig19
+
 
 # 20. Public-Private Ratio Analysis
-fig20 = go.Figure(data=[go.Scatter(
-    x=hospitals['District'],
-    y=hospitals['Public-Private Ratio (%)'],
-    mode='markers+lines',
-    marker=dict(
-        size=hospitals['Total Hospitals'] / 2,
-        color=hospitals['Public-Private Ratio (%)'],
-        colorscale='Viridis',
-        showscale=True,
-        colorbar=dict(title="Ratio %")
-    ),
-    text=hospitals['District'],
-    hovertemplate='<b>%{text}</b><br>Ratio: %{y:.1f}%<br>Total: ' + 
-                  hospitals['Total Hospitals'].astype(str) + '<extra></extra>'
-)])
-fig20.update_layout(
-    title='Public-Private Hospital Ratio by District',
-    xaxis_title='District',
-    yaxis_title='Public-Private Ratio (%)',
-    template='plotly_white',
-    height=450,
-    xaxis={'tickangle': -45}
-)
-charts_data.append(('hospital_ratio', fig20.to_html(full_html=False, include_plotlyjs='cdn')))
+@register_chart('hospital_ratio', datasets=['hospitals'], section='Hospital Infrastructure',
+                label='Hospital Ratio', title='🏥 Public-Private Hospital Ratio Analysis')
+def chart_hospital_ratio(hospitals):
+    # A ratio can't be summed into "Other": keep the largest districts only
+    districts = top_n(hospitals, 'Total Hospitals', budget('bar'))
+    fig20 = go.Figure(data=[go.Scatter(
+        x=districts['District'],
+        y=districts['Public-Private Ratio (%)'],
+        mode='markers+lines',
+        marker=dict(
+            size=districts['Total Hospitals'] / 2,
+            color=districts['Public-Private Ratio (%)'],
+            colorscale='Viridis',
+            showscale=True,
+            colorbar=dict(title="Ratio %")
+        ),
+        text=districts['District'],
+        customdata=districts['Total Hospitals'],
+        hovertemplate='<b>%{text}</b><br>Ratio: %{y:.1f}%<br>Total: %{customdata}<extra></extra>'
+    )])
+    fig20.update_layout(
+        title='Public-Private Hospital Ratio by District',
+        xaxis_title='District',
+        yaxis_title='Public-Private Ratio (%)',
+        template='plotly_white',
+        height=450,
+        xaxis={'tickangle': -45}
+    )
+    return fig20
+
+
+# ============= CROSS-DATASET DISTRICT ANALYSIS =============
+
+# 21. Disability Prevalence vs Awareness (and hospital public share where districts match)
+@register_chart('district_correlation', datasets=['disability_district', 'awareness', 'hospitals'],
+                section='District Correlations', label='Disability vs Awareness',
+                title='🔗 District Correlations: Disability, Awareness & Hospitals')
+def chart_district_correlation(disability_district, awareness, hospitals):
+    fact = fact_table(disability_district=disability_district, awareness=awareness, hospitals=hospitals)
+    r, n = correlation(fact, 'hiv_awareness', 'disability_rate')
+    matched = bin_scatter(fact.dropna(subset=['hiv_awareness', 'disability_rate']),
+                          'hiv_awareness', 'disability_rate')
+    binned = 'count' in matched.columns
+
+    fig21 = go.Figure(go.Scatter(
+        x=matched['hiv_awareness'],
+        y=matched['disability_rate'],
+        mode='markers',
+        marker=dict(size=np.sqrt(matched['count']) * 3 + 5 if binned else 8, color='#16a085', opacity=0.6),
+        text=('Districts: ' + matched['count'].astype(str) if binned
+              else matched['district'] + ', ' + matched['state']),
+        hovertemplate='<b>%{text}</b><br>HIV/AIDS awareness: %{x:.1f}%<br>'
+                      'Disability: %{y:.0f} per 100k<extra></extra>',
+        name=f'Disability (r = {r:.2f}, {n} districts)'
+    ))
+    hospital_r, hospital_n = correlation(fact, 'hiv_awareness', 'public_share')
+    if hospital_n >= 2:
+        with_hospitals = fact.dropna(subset=['hiv_awareness', 'public_share'])
+        fig21.add_trace(go.Scatter(
+            x=with_hospitals['hiv_awareness'],
+            y=with_hospitals['public_share'],
+            mode='markers',
+            marker=dict(size=10, color='#e67e22'),
+            text=with_hospitals['district'],
+            yaxis='y2',
+            name=f'Public hospital share (r = {hospital_r:.2f}, {hospital_n} districts)'
+        ))
+    fig21.update_layout(
+        title=f'Disability Prevalence vs HIV/AIDS Awareness by District (r = {r:.2f})',
+        xaxis_title='Women aware of HIV/AIDS (%)',
+        yaxis_title='Disability prevalence per 100,000',
+        yaxis2=dict(title='Public hospital share (%)', overlaying='y', side='right', showgrid=False),
+        template='plotly_white',
+        height=500,
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig21
+
+
+# 22. Rural/Urban and Gender Gaps for every indicator topic (gap_metrics.py)
+@register_chart('indicator_gaps', datasets=['disability_district', 'awareness'],
+                section='District Correlations', label='Rural-Urban & Gender Gaps',
+                title='⚖️ Rural-Urban and Gender Gaps by Indicator')
+def chart_indicator_gaps(disability_district, awareness):
+    gaps = []
+    for df in (disability_district, awareness):
+        metrics = gap_metrics(df)
+        # Person where the topic has it, otherwise the one sex surveyed
+        area_ratio = topic_summary(metrics, 'urban_rural_ratio').drop_duplicates('topic')
+        if 'gender_ratio' in metrics.columns.get_level_values('metric'):
+            sex_ratio = topic_summary(metrics, 'gender_ratio')
+            area_ratio = area_ratio.merge(sex_ratio[sex_ratio['area'] == 'Total'][['topic', 'gender_ratio']],
+                                          on='topic', how='left')
+        gaps.append(area_ratio)
+    gaps = pd.concat(gaps, ignore_index=True).iloc[::-1]
+    labels = gaps['topic'].str.replace('_', ' ')
+
+    fig22 = go.Figure()
+    fig22.add_trace(go.Bar(y=labels, x=gaps['urban_rural_ratio'], orientation='h',
+                           name='Urban / Rural', marker_color='#e67e22'))
+    fig22.add_trace(go.Bar(y=labels, x=gaps['gender_ratio'], orientation='h',
+                           name='Female / Male', marker_color='#e74c3c'))
+    fig22.add_vline(x=1, line_dash='dash', line_color='gray')
+    fig22.update_layout(
+        title='Median District Ratio per Indicator (1 = no gap)',
+        xaxis_title='Ratio',
+        barmode='group',
+        template='plotly_white',
+        height=450,
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig22
+
 
 # ============= SUMMARY STATISTICS =============
 
-# Calculate key metrics
-total_impressions = health_campaign['Impressions'].sum()
-total_engagements = health_campaign['Engagements'].sum()
-avg_behavior_change = health_campaign['Behavior Change (%)'].mean()
-avg_feedback = health_campaign['Feedback Score'].mean()
-avg_disability_rate = disability_state['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total'].mean()
-avg_hiv_awareness = awareness['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total'].mean()
-total_events = len(events)
-total_webinars = len(webinars)
-total_hospitals = hospitals['Total Hospitals'].sum()
-avg_public_ratio = hospitals['Public-Private Ratio (%)'].mean()
-
-summary_stats = {
-    'total_impressions': f"{total_impressions:,}",
-    'total_engagements': f"{total_engagements:,}",
-    'avg_behavior_change': f"{avg_behavior_change:.1f}%",
-    'avg_feedback': f"{avg_feedback:.2f}",
-    'avg_disability_rate': f"{avg_disability_rate:.1f}",
-    'avg_hiv_awareness': f"{avg_hiv_awareness:.1f}%",
-    'total_events': f"{total_events}",
-    'total_webinars': f"{total_webinars}",
-    'total_hospitals': f"{total_hospitals}",
-    'avg_public_ratio': f"{avg_public_ratio:.1f}%",
-    'total_districts': len(disability_district),
-    'total_states': len(disability_state)
-}
-
-print("Generating HTML dashboard...")
-
-# Generate HTML with all charts
-html_content = f"""<!DOCTYPE html>
+# Summary cards read mergeable column statistics (summary_store.py), so appended
+# rows update them without rescanning the history
+
+MISSING_STAT = '–'
+
+
+def stat_text(value, spec, suffix=''):
+    # Card text for an average; an empty slice has none and shows MISSING_STAT
+    if value is None or value != value:
+        return MISSING_STAT
+    return f"{value:{spec}}{suffix}"
+
+@register_summary('summary_health_campaign', datasets=['health_campaign'], stats={
+    'health_campaign': ['Impressions', 'Engagements', 'Behavior Change (%)', 'Feedback Score']})
+def summary_health_campaign(health_campaign):
+    total_impressions = health_campaign['Impressions'].sum
+    total_engagements = health_campaign['Engagements'].sum
+    avg_behavior_change = health_campaign['Behavior Change (%)'].mean
+    avg_feedback = health_campaign['Feedback Score'].mean
+    return {
+        'total_impressions': f"{total_impressions:,}",
+        'total_engagements': f"{total_engagements:,}",
+        'avg_behavior_change': stat_text(avg_behavior_change, '.1f', '%'),
+        'avg_feedback': stat_text(avg_feedback, '.2f'),
+    }
+
+
+@register_summary('summary_disability_state', datasets=['disability_state'], stats={
+    'disability_state': ['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total']})
+def summary_disability_state(disability_state):
+    avg_disability_rate = disability_state['HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total'].mean
+    return {
+        'avg_disability_rate': stat_text(avg_disability_rate, '.1f'),
+        'total_states': len(disability_state),
+    }
+
+
+@register_summary('summary_disability_district', datasets=['disability_district'], stats={})
+def summary_disability_district(disability_district):
+    return {'total_districts': len(disability_district)}
+
+
+@register_summary('summary_awareness', datasets=['awareness'], stats={
+    'awareness': ['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total']})
+def summary_awareness(awareness):
+    avg_hiv_awareness = awareness['XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total'].mean
+    return {'avg_hiv_awareness': stat_text(avg_hiv_awareness, '.1f', '%')}
+
+
+# Upcoming counts are classified from the event dates against the build date
+# (event_feed.py), not read from the feeds' Upcoming/Past column
+
+@register_summary('summary_events', datasets=['events'], counts={'events': []})
+def summary_events(events):
+    return {'total_events': f"{len(events)}", 'upcoming_events': events.status()['Upcoming']}
+
+
+@register_summary('summary_webinars', datasets=['webinars'], counts={'webinars': []})
+def summary_webinars(webinars):
+    return {'total_webinars': f"{len(webinars)}", 'upcoming_webinars': webinars.status()['Upcoming']}
+
+
+@register_summary('summary_hospitals', datasets=['hospitals'], stats={
+    'hospitals': ['Total Hospitals', 'Public-Private Ratio (%)']})
+def summary_hospitals(hospitals):
+    total_hospitals = hospitals['Total Hospitals'].sum
+    avg_public_ratio = hospitals['Public-Private Ratio (%)'].mean
+    return {
+        'total_hospitals': f"{total_hospitals}",
+        'avg_public_ratio': stat_text(avg_public_ratio, '.1f', '%'),
+    }
+
+
+PLOTLY_SCRIPT = '<script src="https://cdn.plot.ly/plotly-latest.min.js"></script>'
+
+# Compact mode: one chart payload block. Charts are hydrated lazily with
+# Plotly.newPlot the first time their container is shown (nav button) or
+# scrolled into view ("All Charts"); with purgeHiddenCharts set, charts that
+# get hidden again are purged to free their memory.
+COMPACT_HYDRATE_JS = '''
+        const dashboardData = JSON.parse(document.getElementById('dashboard-data').textContent);
+        const renderedCharts = new Set();
+
+        function hydrateChart(chartId) {
+            const spec = dashboardData.charts[chartId];
+            if (!spec || renderedCharts.has(chartId)) {
+                return;
+            }
+            const layout = Object.assign({}, spec.layout);
+            if (spec.template) {
+                layout.template = dashboardData.templates[spec.template];
+            }
+            Plotly.newPlot('plot-' + chartId, spec.data, layout, {responsive: true});
+            renderedCharts.add(chartId);
+        }
+'''
+
+# Published mode (--publish): the same, but dashboardData only maps chart ids
+# and template keys to fingerprinted JSON files, fetched on first hydration
+PUBLISHED_HYDRATE_JS = '''
+        const dashboardData = JSON.parse(document.getElementById('dashboard-assets').textContent);
+        const renderedCharts = new Set();
+        const fetchedJson = {};
+
+        function fetchJson(url) {
+            if (!fetchedJson[url]) {
+                fetchedJson[url] = fetch(url).then(response => {
+                    if (!response.ok) {
+                        throw new Error(url + ': ' + response.status);
+                    }
+                    return response.json();
+                });
+            }
+            return fetchedJson[url];
+        }
+
+        function hydrateChart(chartId) {
+            const asset = dashboardData.charts[chartId];
+            if (!asset || renderedCharts.has(chartId)) {
+                return;
+            }
+            renderedCharts.add(chartId);
+            const template = asset.template ? fetchJson(dashboardData.templates[asset.template]) : null;
+            Promise.all([fetchJson(asset.url), template]).then(([spec, layoutTemplate]) => {
+                if (!renderedCharts.has(chartId)) {
+                    return;  // hidden and released while loading
+                }
+                const layout = Object.assign({}, spec.layout);
+                if (layoutTemplate) {
+                    layout.template = layoutTemplate;
+                }
+                Plotly.newPlot('plot-' + chartId, spec.data, layout, {responsive: true});
+            }).catch(error => {
+                renderedCharts.delete(chartId);
+                console.error(error);
+            });
+        }
+'''
+
+CHART_VISIBILITY_JS = '''
+        function releaseHiddenCharts() {
+            if (!purgeHiddenCharts) {
+                return;
+            }
+            renderedCharts.forEach(chartId => {
+                if (document.getElementById(chartId).style.display === 'none') {
+                    Plotly.purge('plot-' + chartId);
+                    renderedCharts.delete(chartId);
+                }
+            });
+        }
+
+        // Hidden containers never intersect, so this only fires for charts on screen
+        const chartObserver = 'IntersectionObserver' in window
+            ? new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        hydrateChart(entry.target.id);
+                    }
+                });
+            }, {rootMargin: '200px'})
+            : null;
+
+        document.querySelectorAll('.chart-item').forEach(el => {
+            if (chartObserver) {
+                chartObserver.observe(el);
+            } else if (el.style.display !== 'none') {
+                hydrateChart(el.id);
+            }
+        });
+
+        const showChartOnly = showChart;
+        showChart = function (chartId) {
+            showChartOnly(chartId);
+            releaseHiddenCharts();
+            hydrateChart(chartId);
+        };
+
+        const showSectionOnly = showSection;
+        showSection = function (section) {
+            showSectionOnly(section);
+            releaseHiddenCharts();
+            if (!chartObserver && section === 'all') {
+                Object.keys(dashboardData.charts).forEach(hydrateChart);
+            }
+        };
+'''
+
+COMPACT_CHART_SCRIPT = '\n    <script>' + COMPACT_HYDRATE_JS + CHART_VISIBILITY_JS + '    </script>'
+
+
+def purge_option_script(purge_hidden):
+    return f'\n    <script>const purgeHiddenCharts = {"true" if purge_hidden else "false"};</script>'
+
+
+def compact_chart_scripts(payloads, purge_hidden=False):
+    return payload_script(bundle_payloads(payloads)) + purge_option_script(purge_hidden) + COMPACT_CHART_SCRIPT
+
+
+def publish_dashboard(publisher, page, payloads, summary_stats, charts=None, plotly_js='cdn',
+                      purge_hidden=False, **options):
+    # Write one compact dashboard through an AssetPublisher (asset_publisher.py):
+    # stylesheet, page script, plotly.js (when vendored), every chart payload
+    # and shared template become fingerprinted, pre-compressed files; the page
+    # itself only carries the map from chart ids to their files
+    here = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(here, 'dashboard_styles.css'), 'rb') as f:
+        stylesheet = publisher.add('dashboard_styles', f.read(), '.css')
+    script = publisher.add('dashboard', PUBLISHED_HYDRATE_JS + CHART_VISIBILITY_JS, '.js')
+    assets = [stylesheet, script]
+    if plotly_js == 'local':
+        assets.append(publisher.add('plotly', get_plotlyjs(), '.min.js'))
+        plotly_script = f'<script src="{assets[-1]}" charset="utf-8"></script>'
+    else:
+        plotly_script = plotly_script_tag(plotly_js)
+
+    bundle = bundle_payloads(payloads)
+    templates = {key: publisher.add(f'templates/{key}', to_json_plotly(template), '.json')
+                 for key, template in bundle['templates'].items()}
+    chart_assets = {}
+    for chart_id, chart in bundle['charts'].items():
+        template = chart.pop('template', None)
+        chart_assets[chart_id] = {'url': publisher.add(f'charts/{chart_id}', to_json_plotly(chart), '.json'),
+                                  'template': template}
+    assets += list(templates.values()) + [asset['url'] for asset in chart_assets.values()]
+
+    charts_html = {chart_id: f'<div class="plotly-graph-div" id="plot-{chart_id}"></div>' for chart_id in payloads}
+    index = json.dumps({'charts': chart_assets, 'templates': templates}).replace('</', '<\\/')
+    chart_scripts = (f'<script type="application/json" id="dashboard-assets">{index}</script>'
+                     + purge_option_script(purge_hidden) + f'\n    <script src="{script}"></script>')
+    html_content = render_dashboard(charts_html, summary_stats, plotly_script=plotly_script,
+                                    chart_scripts=chart_scripts, charts=charts, stylesheet=stylesheet, **options)
+    return publisher.add_entry(page, html_content, assets)
+
+
+DASHBOARD_TITLE = 'Health Data Analytics Dashboard'
+DASHBOARD_SUBTITLE = 'Comprehensive Analysis of Health Campaigns, Disability Prevalence & Health Awareness'
+
+
+def render_dashboard(charts_html, summary_stats, plotly_script=PLOTLY_SCRIPT, chart_scripts='',
+                     charts=None, title=DASHBOARD_TITLE, subtitle=DASHBOARD_SUBTITLE,
+                     stylesheet='dashboard_styles.css'):
+    # Sidebar buttons and chart containers follow the order of `charts` (default: the registry)
+    charts = CHARTS if charts is None else charts
+    nav_buttons = []
+    section = None
+    for spec in charts:
+        if spec.section != section:
+            if section is not None:
+                nav_buttons.append('')
+            section = spec.section
+            nav_buttons.append(f'        <div class="nav-category">{section}</div>')
+        nav_buttons.append(f'        <button class="nav-btn" onclick="showChart(\'{spec.key}\')">{spec.label}</button>')
+
+    chart_containers = []
+    for spec in charts:
+        chart_containers.append(f'''        <div class="chart-container chart-item" id="{spec.key}" style="display: none;">
+            <h3 class="chart-title">{spec.title}</h3>
+            {charts_html[spec.key]}
+        </div>''')
+
+    nav_buttons = '\n'.join(nav_buttons)
+    chart_containers = '\n\n'.join(chart_containers)
+
+    # Generate HTML with all charts
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Health Data Analytics Dashboard</title>
-    <link rel="stylesheet" href="dashboard_styles.css">
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <title>{title}</title>
+    <link rel="stylesheet" href="{stylesheet}">
+    {plotly_script}
 </head>
 <body>
     <header>
         <div class="container">
-            <h1>🏥 Health Data Analytics Dashboard</h1>
-            <p class="subtitle">Comprehensive Analysis of Health Campaigns, Disability Prevalence & Health Awareness</p>
+            <h1>🏥 {title}</h1>
+            <p class="subtitle">{subtitle}</p>
         </div>
     </header>
 
@@ -531,37 +947,7 @@ html_content = f"""<!DOCTYPE html>
         <button class="nav-btn" onclick="showSection('all')">📈 All Charts</button>
         <button class="nav-btn" onclick="showSection('stats')">📊 Summary Stats</button>
         
-        <div class="nav-category">Health Campaigns</div>
-        <button class="nav-btn" onclick="showChart('campaign_channel_performance')">Channel Performance</button>
-        <button class="nav-btn" onclick="showChart('campaign_comparison')">Campaign Comparison</button>
-        <button class="nav-btn" onclick="showChart('demographics_sunburst')">Demographics</button>
-        <button class="nav-btn" onclick="showChart('location_performance')">Location Performance</button>
-        <button class="nav-btn" onclick="showChart('time_series')">Time Series</button>
-        
-        <div class="nav-category">Disability Analysis</div>
-        <button class="nav-btn" onclick="showChart('disability_state')">State Prevalence</button>
-        <button class="nav-btn" onclick="showChart('gender_disability')">Gender Comparison</button>
-        <button class="nav-btn" onclick="showChart('top_districts_disability')">Top 10 Districts</button>
-        
-        <div class="nav-category">Health Awareness</div>
-        <button class="nav-btn" onclick="showChart('state_awareness')">State Awareness</button>
-        <button class="nav-btn" onclick="showChart('rural_urban_awareness')">Rural vs Urban</button>
-        <button class="nav-btn" onclick="showChart('awareness_heatmap')">Awareness Heatmap</button>
-        
-        <div class="nav-category">Events & Programs</div>
-        <button class="nav-btn" onclick="showChart('events_timeline')">Events Timeline</button>
-        <button class="nav-btn" onclick="showChart('events_sentiment')">Events Sentiment</button>
-        <button class="nav-btn" onclick="showChart('events_by_scheme')">Events by Scheme</button>
-        
-        <div class="nav-category">Webinars & Training</div>
-        <button class="nav-btn" onclick="showChart('webinar_types')">Event Types</button>
-        <button class="nav-btn" onclick="showChart('focus_area_distribution')">Focus Areas</button>
-        <button class="nav-btn" onclick="showChart('delivery_mode')">Delivery Mode</button>
-        
-        <div class="nav-category">Hospital Infrastructure</div>
-        <button class="nav-btn" onclick="showChart('hospital_comparison')">Public vs Private</button>
-        <button class="nav-btn" onclick="showChart('performance_categories')">Performance Categories</button>
-        <button class="nav-btn" onclick="showChart('hospital_ratio')">Hospital Ratio</button>
+{nav_buttons}
     </div>
 
     <div class="main-content">
@@ -601,12 +987,12 @@ html_content = f"""<!DOCTYPE html>
             <div class="stat-card">
                 <div class="stat-icon">�</div>
                 <div class="stat-value">{summary_stats['total_events']}</div>
-                <div class="stat-label">Health Events</div>
+                <div class="stat-label">Health Events ({summary_stats['upcoming_events']} upcoming)</div>
             </div>
             <div class="stat-card">
                 <div class="stat-icon">🎓</div>
                 <div class="stat-value">{summary_stats['total_webinars']}</div>
-                <div class="stat-label">Training Programs</div>
+                <div class="stat-label">Training Programs ({summary_stats['upcoming_webinars']} upcoming)</div>
             </div>
             <div class="stat-card">
                 <div class="stat-icon">🏥</div>
@@ -631,105 +1017,7 @@ html_content = f"""<!DOCTYPE html>
         </div>
 
         <!-- Individual Chart Containers -->
-        <div class="chart-container chart-item" id="campaign_channel_performance" style="display: none;">
-            <h3 class="chart-title">📢 Campaign Performance by Channel</h3>
-            {charts_data[0][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="campaign_comparison" style="display: none;">
-            <h3 class="chart-title">📢 Campaign Comparison</h3>
-            {charts_data[1][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="demographics_sunburst" style="display: none;">
-            <h3 class="chart-title">📢 Demographics Distribution</h3>
-            {charts_data[2][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="location_performance" style="display: none;">
-            <h3 class="chart-title">📢 Performance Metrics by Location</h3>
-            {charts_data[3][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="time_series" style="display: none;">
-            <h3 class="chart-title">📢 Campaign Activity Over Time</h3>
-            {charts_data[4][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="disability_state" style="display: none;">
-            <h3 class="chart-title">♿ Disability Prevalence by State</h3>
-            {charts_data[5][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="gender_disability" style="display: none;">
-            <h3 class="chart-title">♿ Gender-wise Disability Comparison</h3>
-            {charts_data[6][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="top_districts_disability" style="display: none;">
-            <h3 class="chart-title">♿ Top 10 Districts with Highest Disability</h3>
-            {charts_data[7][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="state_awareness" style="display: none;">
-            <h3 class="chart-title">🎗️ Women's Health Awareness by State</h3>
-            {charts_data[8][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="rural_urban_awareness" style="display: none;">
-            <h3 class="chart-title">🎗️ HIV/AIDS Awareness: Rural vs Urban</h3>
-            {charts_data[9][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="awareness_heatmap" style="display: none;">
-            <h3 class="chart-title">🎗️ Health Awareness Heatmap</h3>
-            {charts_data[10][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="events_timeline" style="display: none;">
-            <h3 class="chart-title">📅 Health Events Timeline by Category</h3>
-            {charts_data[11][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="events_sentiment" style="display: none;">
-            <h3 class="chart-title">📅 Events Sentiment Distribution</h3>
-            {charts_data[12][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="events_by_scheme" style="display: none;">
-            <h3 class="chart-title">📅 Top Health Schemes by Event Count</h3>
-            {charts_data[13][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="webinar_types" style="display: none;">
-            <h3 class="chart-title">🎓 Training Event Types Distribution</h3>
-            {charts_data[14][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="focus_area_distribution" style="display: none;">
-            <h3 class="chart-title">🎓 Training Events by Focus Area</h3>
-            {charts_data[15][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="delivery_mode" style="display: none;">
-            <h3 class="chart-title">🎓 Event Delivery Mode Distribution</h3>
-            {charts_data[16][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="hospital_comparison" style="display: none;">
-            <h3 class="chart-title">🏥 Public vs Private Hospitals by District</h3>
-            {charts_data[17][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="performance_categories" style="display: none;">
-            <h3 class="chart-title">🏥 Hospital Performance Categories</h3>
-            {charts_data[18][1]}
-        </div>
-        
-        <div class="chart-container chart-item" id="hospital_ratio" style="display: none;">
-            <h3 class="chart-title">🏥 Public-Private Hospital Ratio Analysis</h3>
-            {charts_data[19][1]}
-        </div>
+{chart_containers}
 
         <!-- Insights Section -->
         <section class="section insights">
@@ -828,6 +1116,7 @@ html_content = f"""<!DOCTYPE html>
             window.scrollTo({{top: 0, behavior: 'smooth'}});
         }}
     </script>
+{chart_scripts}
 
     <footer>
         <div class="container">
@@ -838,11 +1127,214 @@ html_content = f"""<!DOCTYPE html>
 </body>
 </html>"""
 
-# Write HTML file
-with open('dashboard.html', 'w', encoding='utf-8') as f:
-    f.write(html_content)
 
-print("✅ Dashboard generated successfully!")
-print("📊 Total visualizations created: 11")
-print("📁 Output file: dashboard.html")
-print("🎨 CSS file needed: dashboard_styles.css")
+def build(cache, workers=1, executor='process', output_mode='fragments', snapshot=None):
+    # snapshot: (SnapshotStore, version) to build from a stored version instead of the current files
+    if snapshot is not None:
+        cache.sources = snapshot[0].sources(snapshot[1])
+    elif cache.enabled:
+        cache.fingerprint_sources(DATASET_FILES)
+        if cache.changed:
+            print(f"Changed datasets: {', '.join(cache.changed)}")
+
+    # Chart fragments and compact payloads are cached side by side
+    def cache_key(spec):
+        return spec.key if spec in SUMMARIES or output_mode == 'fragments' else f'{spec.key}.{output_mode}'
+
+    # Store-backed summaries are refreshed incrementally below instead of being rendered from frames.
+    # The stores follow the current files, so a snapshot build renders everything from its frames.
+    stored = [spec for spec in SUMMARIES if (spec.stats is not None or spec.counts is not None)
+              and snapshot is None]
+    specs = CHARTS + [spec for spec in SUMMARIES if spec not in stored]
+    stale = [spec for spec in specs if cache.is_stale(cache_key(spec), spec.datasets)]
+
+    # Read only the datasets that something stale actually depends on. Feeds
+    # whose every stale reader takes counts are read from the feed store: only
+    # rows appended since the last build are parsed.
+    print("Loading datasets...")
+    needed = sorted({name for spec in stale for name in spec.datasets
+                     if spec.counts is None or name not in spec.counts or snapshot is not None})
+    # Files are read concurrently; one that fails only takes out the fragments built from it
+    loader = (lambda name: snapshot[0].load(snapshot[1], name)) if snapshot is not None else None
+    data, errors, seconds = load_datasets(needed, cache_dir=cache.path('columnar'), loader=loader)
+    # Pool workers fork after this, so they pick the path up too
+    set_keys_path(cache.path('district_keys.json'))
+    report_load(data, errors, seconds)
+    feeds = FeedStore(cache.path('feed_store.json'), enabled=cache.enabled)
+    counters = {}
+    for spec in stale + stored:
+        for name, columns in (spec.counts or {}).items():
+            counters.setdefault(name, set()).update(columns)
+    for name in sorted(set(counters) - set(needed)):
+        try:
+            data[name] = feeds.counts(name, counters[name])
+        except Exception as e:
+            errors[name] = e
+            print(f"   ❌ {name}: {type(e).__name__}: {e}")
+
+    print("Generating visualizations...")
+    print(f"Rebuilding {len(stale)} of {len(specs)} fragments ({len(specs) - len(stale)} from cache)")
+    renderable = [spec for spec in stale if not errors.keys() & set(spec.datasets)]
+    results = render_all(renderable, data, workers=workers, executor=executor, output_mode=output_mode)
+    for spec in specs:
+        if spec.key in results:
+            cache.put(cache_key(spec), spec.datasets, results[spec.key])
+        elif spec not in stale:
+            results[spec.key] = cache.get(cache_key(spec))
+    cache.save()
+
+    store = SummaryStore(cache.path('summary_store.json'), enabled=cache.enabled)
+    for spec in stored:
+        try:
+            inputs = [feeds.counts(name, counters[name]) if name in (spec.counts or {})
+                      else store.stats(name, (spec.stats or {}).get(name, [])) for name in spec.datasets]
+        except Exception as e:
+            errors.update({name: e for name in spec.datasets if name not in errors})
+            continue
+        results[spec.key] = spec.builder(*inputs)
+    store.save()
+    feeds.save()
+
+    charts = {spec.key: results[spec.key] for spec in CHARTS if spec.key in results}
+    # Cards whose data failed to load show 'n/a'
+    summary_stats = defaultdict(lambda: 'n/a')
+    for spec in SUMMARIES:
+        summary_stats.update(results.get(spec.key, {}))
+    return charts, summary_stats, errors
+
+
+def source_version():
+    # Cached fragments are tied to the code that rendered them: this script and its helper modules
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(here)):
+        if name.endswith('.py'):
+            digest.update(file_sha256(os.path.join(here, name)).encode('ascii'))
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the health data analytics dashboard')
+    parser.add_argument('--output', default='dashboard.html', help='output HTML file')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='root directory for every build cache (fragments, columnar data, stores, images)')
+    parser.add_argument('--no-cache', action='store_true', help='rebuild every chart and ignore the build cache')
+    parser.add_argument('--workers', type=int, default=1, help='number of parallel chart builders')
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help='pool type used when --workers is above 1')
+    parser.add_argument('--output-mode', choices=['fragments', 'compact'], default='fragments',
+                        help='fragments: one to_html() block per chart; '
+                             'compact: plotly.js loaded once plus compact JSON chart payloads')
+    parser.add_argument('--plotly-js', choices=['cdn', 'local'], default='cdn',
+                        help='compact mode: load plotly.js from the CDN or vendor it next to the output')
+    parser.add_argument('--purge-hidden', action='store_true',
+                        help='compact mode: free charts from memory when they are hidden again')
+    parser.add_argument('--point-budget', action='append', metavar='KIND=N',
+                        help='max points per chart before reduction (line, scatter, bar, heatmap); repeatable')
+    parser.add_argument('--as-of', metavar='VERSION',
+                        help='build from a stored dataset snapshot (see snapshot_store.py) instead of the current files')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, help='snapshot store used by --as-of')
+    parser.add_argument('--images', metavar='DIR',
+                        help='also export every chart as a static image into DIR (needs kaleido for new charts)')
+    parser.add_argument('--image-format', nargs='+', choices=IMAGE_FORMATS, default=['png'],
+                        help='image formats for --images')
+    parser.add_argument('--image-scale', type=float, help='pixel scale factor for --images')
+    parser.add_argument('--publish', metavar='DIR',
+                        help='also write a static-hosting build into DIR: fingerprinted, pre-compressed CSS, '
+                             'JS and per-chart JSON files plus a manifest (see asset_publisher.py)')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write per-stage timings as a Chrome trace (chrome://tracing, Perfetto)')
+    parser.add_argument('--trace-summary', action='store_true', help='print a table of the slowest stages')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also record peak allocations per stage (tracemalloc, slower)')
+    parser.add_argument('--budget', action='append', type=parse_budget, metavar='NAME=SECONDS',
+                        help='fail the build when a span or category (load, aggregate, render, ...) '
+                             'takes longer; repeatable')
+    args = parser.parse_args()
+
+    set_budgets(args.point_budget)
+    budgets = parse_budgets(args.budget)
+    if args.trace or args.trace_summary or budgets:
+        TRACER.configure(enabled=True, memory=args.trace_memory)
+
+    with TRACER.span('build', 'build', output_mode=args.output_mode):
+        # Point budgets change what the builders emit, so they are part of the cache version
+        code_version = f"{source_version()}:{json.dumps(POINT_BUDGETS, sort_keys=True)}"
+        cache = BuildCache(args.cache_dir, code_version=code_version, enabled=not args.no_cache)
+        snapshot = None
+        if args.as_of:
+            snapshot = (SnapshotStore(args.snapshot_dir), args.as_of)
+            try:
+                print(f"Building as of snapshot {args.as_of}")
+                snapshot[0].manifest(args.as_of)
+            except KeyError as e:
+                raise SystemExit(f"❌ {e.args[0]}")
+        charts, summary_stats, load_errors = build(cache, workers=args.workers, executor=args.executor,
+                                                   output_mode=args.output_mode, snapshot=snapshot)
+        rendered = [spec for spec in CHARTS if spec.key in charts]
+
+        print("Generating HTML dashboard...")
+        with TRACER.span('render_dashboard', 'html'):
+            if args.output_mode == 'compact':
+                charts_html = {chart_id: f'<div class="plotly-graph-div" id="plot-{chart_id}"></div>'
+                               for chart_id in charts}
+                output_dir = os.path.dirname(os.path.abspath(args.output))
+                html_content = render_dashboard(charts_html, summary_stats, charts=rendered,
+                                                plotly_script=plotly_script_tag(args.plotly_js, output_dir),
+                                                chart_scripts=compact_chart_scripts(charts, args.purge_hidden))
+            else:
+                html_content = render_dashboard(charts, summary_stats, charts=rendered)
+
+            # Write HTML file
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+
+        payloads = charts if args.output_mode == 'compact' else None
+        if payloads is None and (args.images or args.publish):
+            # Images and published assets come from the compact payloads (cached like the HTML fragments)
+            payloads, _, _ = build(cache, workers=args.workers, executor=args.executor,
+                                   output_mode='compact', snapshot=snapshot)
+
+        if args.images:
+            print("Exporting chart images...")
+            exporter = ImageExporter(args.images, formats=args.image_format, scale=args.image_scale,
+                                     cache_dir=cache.path('images'))
+            try:
+                with TRACER.span('export_images', 'images', formats=args.image_format):
+                    written, rendered_images, reused = exporter.export(payloads)
+            except RuntimeError as e:
+                raise SystemExit(f"❌ {e}")
+            print(f"🖼️  {len(written)} images updated in {args.images}/ ({rendered_images} rendered, {reused} from cache)")
+
+        if args.publish:
+            print("Publishing compressed assets...")
+            publisher = AssetPublisher(args.publish)
+            with TRACER.span('publish', 'publish'):
+                page = publish_dashboard(publisher, 'index.html', payloads, summary_stats, charts=rendered,
+                                         plotly_js=args.plotly_js, purge_hidden=args.purge_hidden)
+                publisher.finish()
+            size, gzipped = publisher.report()
+            print(f"🌐 Published {os.path.join(args.publish, page)}: {publisher.written} assets written, "
+                  f"{publisher.reused} unchanged ({size / 1024:.0f} KB, {gzipped / 1024:.0f} KB gzipped)")
+
+    print("✅ Dashboard generated successfully!")
+    print(f"📊 Total visualizations created: {len(charts)}")
+    print(f"📁 Output file: {args.output}")
+    print("🎨 CSS file needed: dashboard_styles.css")
+
+    if args.trace:
+        TRACER.write(args.trace)
+        print(f"⏱️  Build trace: {args.trace}")
+    if args.trace_summary:
+        print(TRACER.summary_table(limit=25))
+    failures = TRACER.check_budgets(budgets)
+    for failure in failures:
+        print(f"❌ Over budget: {failure}")
+    if load_errors:
+        print(f"❌ Charts skipped, datasets failed to load: {', '.join(sorted(load_errors))}")
+    if failures or load_errors:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
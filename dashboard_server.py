@@ -0,0 +1,262 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import dashboard_generator
+from build_cache import CACHE_DIR, file_fingerprint
+from chart_payloads import figure_payload, plotly_script_tag
+from chart_registry import CHARTS, SUMMARIES, fragment_inputs
+from datasets import DATASET_FILES, load_datasets, report_load
+from district_join import set_keys_path
+from downsample import use_webgl
+from state_index import state_slice
+
+# Live dashboard server.
+# Keeps every dataset loaded and serves the registered charts as JSON, sliced
+# by query parameters:
+#   GET /api/charts                      chart list (id, section, label, title)
+#   GET /api/charts/<chart_id>?filters   compact Plotly payload for one chart
+#   GET /api/summary?filters             summary-card values
+#   GET /?filters                        the full dashboard page for that slice
+# Filters: state (repeatable or comma separated, matches State_Name),
+# channel (Channel), start / end (inclusive dates, matched against Date).
+# Responses are cached on (path, filters, data version); the data version
+# changes whenever a source CSV does, so stale slices are never served.
+
+
+def parse_filters(query):
+    params = parse_qs(query)
+    filters = {name: [v for raw in params.get(name, []) for v in raw.split(',')] for name in ('state', 'channel')}
+    for name in ('start', 'end'):
+        if params.get(name):
+            filters[name] = params[name][-1]
+    return normalize_filters(filters)
+
+
+def normalize_filters(filters):
+    # Canonical form (sorted tuples, ISO dates) so equal slices share cache keys
+    normalized = {}
+    for name in ('state', 'channel'):
+        values = filters.get(name) or []
+        if isinstance(values, str):
+            values = [values]
+        values = [str(v).strip() for v in values if str(v).strip()]
+        if values:
+            normalized[name] = tuple(sorted(set(values)))
+    for name in ('start', 'end'):
+        if filters.get(name):
+            normalized[name] = str(pd.Timestamp(filters[name]).date())
+    return normalized
+
+
+def apply_filters(df, filters, filter_key):
+    sliced = df
+    if 'state' in filters and 'State_Name' in df.columns:
+        # Range lookup on state-partitioned datasets, a mask on the others
+        sliced = state_slice(df, filters['state'])
+    mask = pd.Series(True, index=sliced.index)
+    if 'channel' in filters and 'Channel' in sliced.columns:
+        mask &= sliced['Channel'].isin(filters['channel'])
+    if 'Date' in sliced.columns and pd.api.types.is_datetime64_any_dtype(sliced['Date']):
+        if 'start' in filters:
+            mask &= sliced['Date'] >= pd.Timestamp(filters['start'])
+        if 'end' in filters:
+            mask &= sliced['Date'] <= pd.Timestamp(filters['end'])
+    if not mask.all():
+        sliced = sliced[mask]
+    if len(sliced) == len(df):
+        return df
+    # A distinct version per slice keeps the aggregation cache from mixing them up
+    sliced.attrs = dict(df.attrs, version=f"{df.attrs.get('version')}|{filter_key}")
+    sliced.attrs.pop('partitions', None)
+    return sliced
+
+
+class DashboardData:
+    def __init__(self, reload_interval=5.0, cache_size=256, cache_dir=CACHE_DIR):
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        # Columnar cache for (re)loads; None reads the CSVs and writes nothing
+        self.columnar_dir = os.path.join(cache_dir, 'columnar') if cache_dir else None
+        self.frames = {}
+        self.fingerprints = {}
+        self.responses = OrderedDict()
+        self.lock = threading.Lock()
+        self.reloading = threading.Lock()
+        self.checked_at = 0.0
+        self.refresh(force=True)
+
+    @property
+    def version(self):
+        fingerprints = self.fingerprints
+        return tuple(fingerprints[name]['sha256'] for name in sorted(fingerprints))
+
+    def refresh(self, force=False):
+        # Re-stat the sources at most every reload_interval seconds; only changed files are reloaded.
+        # Files are read without holding the lock (requests keep serving the current frames)
+        # and the new frames are swapped in under it.
+        now = time.monotonic()
+        if not force and now - self.checked_at < self.reload_interval:
+            return
+        # One reload at a time: a request arriving during a reload doesn't start another
+        if not self.reloading.acquire(blocking=force):
+            return
+        try:
+            self.checked_at = now
+            known = self.fingerprints
+            changed = {}
+            for name, path in DATASET_FILES.items():
+                try:
+                    fingerprint = file_fingerprint(path, known.get(name))
+                except OSError as e:
+                    print(f"   ❌ {name}: {e} (serving the last good copy)")
+                    continue
+                if force or fingerprint['sha256'] != known.get(name, {}).get('sha256'):
+                    changed[name] = fingerprint
+            if not changed:
+                return
+            # Changed files are reloaded concurrently; a bad one keeps serving its last good frame
+            frames, errors, seconds = load_datasets(changed, cache_dir=self.columnar_dir)
+            report_load(frames, errors, seconds)
+            with self.lock:
+                self.frames = dict(self.frames, **frames)
+                self.fingerprints = dict(self.fingerprints, **{name: changed[name] for name in frames})
+        finally:
+            self.reloading.release()
+
+    def sliced(self, names, filters):
+        frames = self.frames
+        missing = [name for name in names if name not in frames]
+        if missing:
+            raise ValueError(f"datasets not loaded: {', '.join(missing)}")
+        filter_key = json.dumps(filters, sort_keys=True)
+        return [apply_filters(frames[name], filters, filter_key) for name in names]
+
+    def cached(self, key, compute):
+        key = (key, self.version)
+        with self.lock:
+            if key in self.responses:
+                self.responses.move_to_end(key)
+                return self.responses[key]
+        body = compute()
+        with self.lock:
+            self.responses[key] = body
+            while len(self.responses) > self.cache_size:
+                self.responses.popitem(last=False)
+        return body
+
+
+def chart_list():
+    return [{'id': spec.key, 'section': spec.section, 'label': spec.label, 'title': spec.title}
+            for spec in CHARTS]
+
+
+def chart_response(data, chart_id, filters):
+    spec = next(spec for spec in CHARTS if spec.key == chart_id)
+    fig, _ = use_webgl(spec.builder(*fragment_inputs(spec, data.sliced(spec.datasets, filters))))
+    return {'id': spec.key, 'title': spec.title, 'filters': filters, 'figure': figure_payload(fig)}
+
+
+def summary_response(data, filters):
+    summary = {}
+    for spec in SUMMARIES:
+        summary.update(spec.builder(*fragment_inputs(spec, data.sliced(spec.datasets, filters))))
+    return summary
+
+
+def page_response(data, filters):
+    payloads = {spec.key: chart_response(data, spec.key, filters)['figure'] for spec in CHARTS}
+    charts_html = {chart_id: f'<div class="plotly-graph-div" id="plot-{chart_id}"></div>'
+                   for chart_id in payloads}
+    return dashboard_generator.render_dashboard(
+        charts_html, summary_response(data, filters),
+        plotly_script=plotly_script_tag('cdn'),
+        chart_scripts=dashboard_generator.compact_chart_scripts(payloads))
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    data = None
+
+    def _send(self, status, body, content_type='application/json'):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, value):
+        self._send(status, json.dumps(value, default=str))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            filters = parse_filters(url.query)
+        except ValueError as e:
+            self._send_json(400, {'error': f'invalid filter: {e}'})
+            return
+
+        self.data.refresh()
+        cache_key = (url.path, json.dumps(filters, sort_keys=True))
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            if parts == ['api', 'charts']:
+                body = self.data.cached(cache_key, lambda: json.dumps(chart_list()))
+            elif len(parts) == 3 and parts[:2] == ['api', 'charts']:
+                if parts[2] not in {spec.key for spec in CHARTS}:
+                    self._send_json(404, {'error': f'unknown chart: {parts[2]}'})
+                    return
+                body = self.data.cached(cache_key, lambda: json.dumps(
+                    chart_response(self.data, parts[2], filters), default=str))
+            elif parts == ['api', 'summary']:
+                body = self.data.cached(cache_key, lambda: json.dumps(
+                    summary_response(self.data, filters), default=str))
+            elif not parts:
+                body = self.data.cached(cache_key, lambda: page_response(self.data, filters))
+                self._send(200, body, 'text/html')
+                return
+            else:
+                self._send_json(404, {'error': 'not found'})
+                return
+        except Exception as e:
+            # Typically a slice too small for the chart (e.g. no rows left)
+            self._send_json(422, {'error': str(e)})
+            return
+        self._send(200, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the health dashboard charts as filterable JSON')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--reload-interval', type=float, default=5.0,
+                        help='seconds between checks of the source CSVs for changes')
+    parser.add_argument('--cache-size', type=int, default=256, help='number of cached responses')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='root directory for the columnar data and district key caches')
+    args = parser.parse_args()
+
+    print("Loading datasets...")
+    set_keys_path(os.path.join(args.cache_dir, 'district_keys.json'))
+    DashboardHandler.data = DashboardData(args.reload_interval, args.cache_size, args.cache_dir)
+    server = ThreadingHTTPServer((args.host, args.port), DashboardHandler)
+    print(f"✅ Dashboard server running on http://{args.host}:{args.port}/")
+    print("📊 Chart endpoints: /api/charts, /api/charts/<chart_id>, /api/summary")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
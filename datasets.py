@@ -0,0 +1,196 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from build_cache import CACHE_DIR, file_fingerprint
+from build_trace import TRACER
+from schema import compact_dtypes, memory_bytes
+from state_index import build_partitions
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Shared ingestion layer for the dashboard, cleaning and simple-chart scripts.
+# Each CSV is parsed once (column names stripped, dates parsed, label columns
+# stored as categoricals, numbers narrowed by schema.compact_dtypes unless
+# compact=False) and written to a typed columnar file next to a
+# fingerprint of the source. Later reads reuse that file until the CSV changes.
+# Feather (memory-mapped) is used when pyarrow is installed, pickle otherwise.
+
+DATASET_FILES = {
+    'health_campaign': 'Health_Campaign_Dataset_50.csv',
+    'disability_district': 'HH_Disability_District.csv',
+    'disability_state': 'HH_Disability_State.csv',
+    'awareness': 'XX_Awareness_On_HIV_AIDS_RTI_STI_HAF_ORS_ORT_ZINC_And_ARI_Pneumonia_District.csv',
+    'events': 'events .csv',
+    'webinars': 'wedner data set .csv',
+    'hospitals': 'private hosipitals.csv',
+}
+
+CATEGORICAL_COLUMNS = ['State_Name', 'Channel', 'Category', 'Sentiment']
+DATE_COLUMNS = {
+    'health_campaign': ['Date'],
+    'events': ['Date'],
+    'webinars': ['Date'],
+}
+
+# District-level datasets are stored sorted by state with a state -> row range
+# index in the cache sidecar (see state_index.py)
+PARTITION_COLUMNS = {
+    'disability_district': 'State_Name',
+    'awareness': 'State_Name',
+}
+
+COLUMNAR_CACHE_DIR = os.path.join(CACHE_DIR, 'columnar')
+
+# Loading is mostly waiting on storage (the inputs live on network mounts), so
+# load_datasets() reads every file at once on a thread pool
+LOAD_WORKERS = 8
+
+
+def read_source(path, date_columns=(), compact=True):
+    df = pd.read_csv(path)
+    # Clean column names (remove leading/trailing spaces)
+    df.columns = df.columns.str.strip()
+    for col in date_columns:
+        df[col] = pd.to_datetime(df[col])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if compact:
+        parsed = memory_bytes(df)
+        df = compact_dtypes(df)
+        df.attrs['memory'] = {'parsed': parsed, 'compact': memory_bytes(df)}
+    return df
+
+
+def _columnar_paths(cache_dir, name):
+    extension = 'feather' if feather is not None else 'pkl'
+    return (os.path.join(cache_dir, f'{name}.{extension}'),
+            os.path.join(cache_dir, f'{name}.json'))
+
+
+def _read_columnar(path):
+    if feather is not None:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_pickle(path)
+
+
+def _write_columnar(df, path):
+    if feather is not None:
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_pickle(path)
+
+
+def load_csv(path, name=None, date_columns=(), cache_dir=COLUMNAR_CACHE_DIR, partition_column=None,
+             compact=True):
+    # cache_dir=None reads the CSV without touching the columnar cache
+    name = name or os.path.splitext(os.path.basename(path))[0].strip().replace(' ', '_')
+    # Full-width frames (compact=False) are cached next to the compact ones
+    data_path, meta_path = (_columnar_paths(cache_dir, name if compact else f'{name}.wide')
+                            if cache_dir is not None else (None, None))
+
+    previous = None
+    try:
+        if meta_path is not None:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    # The cached file is only valid for the same parse options
+    options = {'date_columns': list(date_columns), 'categorical_columns': CATEGORICAL_COLUMNS,
+               'partition_column': partition_column, 'compact': compact}
+    index = previous.pop('partitions', None) if previous else None
+    memory = previous.pop('memory', None) if previous else None
+    if previous and previous.pop('options', None) != options:
+        previous = None
+
+    with TRACER.span(f'load:{name}', 'load', dataset=name) as span:
+        fingerprint = file_fingerprint(path, previous)
+        df = None
+        span['cache'] = 'hit'
+        if (previous and previous.get('sha256') == fingerprint['sha256']
+                and os.path.exists(data_path)):
+            try:
+                df = _read_columnar(data_path)
+                # Keep the sidecar's size/mtime current so the next check stays cheap
+                if previous != fingerprint:
+                    with open(meta_path, 'w', encoding='utf-8') as f:
+                        json.dump(dict(fingerprint, options=options, partitions=index, memory=memory), f)
+            except Exception:
+                df = None  # unreadable cache file, rebuild it below
+
+        if df is None:
+            span['cache'] = 'miss'
+            df = read_source(path, date_columns, compact=compact)
+            memory = df.attrs.get('memory')
+            index = None
+            if partition_column:
+                df, index = build_partitions(df, partition_column)
+            if cache_dir is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                _write_columnar(df, data_path)
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(dict(fingerprint, options=options, partitions=index, memory=memory), f)
+            else:
+                span['cache'] = 'off'
+        span['rows'] = len(df)
+        if memory:
+            span['parsed_mb'] = round(memory['parsed'] / 2**20, 3)
+            span['compact_mb'] = round(memory['compact'] / 2**20, 3)
+
+    # Identifies this exact content to the aggregation cache
+    df.attrs['dataset'] = name
+    df.attrs['version'] = fingerprint['sha256']
+    if index:
+        df.attrs['partitions'] = index
+    # In-memory size as parsed and after compact_dtypes (see schema.py)
+    if memory:
+        df.attrs['memory'] = memory
+    return df
+
+
+def load_dataset(name, cache_dir=COLUMNAR_CACHE_DIR, compact=True):
+    return load_csv(DATASET_FILES[name], name=name, date_columns=DATE_COLUMNS.get(name, ()),
+                    cache_dir=cache_dir, partition_column=PARTITION_COLUMNS.get(name), compact=compact)
+
+
+def load_datasets(names, workers=LOAD_WORKERS, cache_dir=COLUMNAR_CACHE_DIR, loader=None):
+    # Returns (frames, errors, seconds). A file that fails to read or parse is
+    # reported in errors ({name: exception}) without stopping the others;
+    # seconds holds every file's load time. `loader(name)` replaces
+    # load_dataset, e.g. to read a snapshot.
+    loader = loader or (lambda name: load_dataset(name, cache_dir=cache_dir))
+
+    def timed_load(name):
+        start = time.perf_counter()
+        try:
+            return loader(name), None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    names = list(names)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names) or 1))) as pool:
+        results = dict(zip(names, pool.map(timed_load, names)))
+    frames = {name: df for name, (df, error, _) in results.items() if error is None}
+    errors = {name: error for name, (_, error, _) in results.items() if error is not None}
+    seconds = {name: elapsed for name, (_, _, elapsed) in results.items()}
+    return frames, errors, seconds
+
+
+def report_load(frames, errors, seconds):
+    # One line per file: load time, or the error for files that failed
+    for name in sorted(seconds):
+        if name in errors:
+            print(f"   ❌ {name}: {type(errors[name]).__name__}: {errors[name]} ({seconds[name]:.2f}s)")
+        else:
+            memory = frames[name].attrs.get('memory')
+            size = f", {memory['compact'] / 2**20:.2f} MB (parsed {memory['parsed'] / 2**20:.2f} MB)" if memory else ''
+            print(f"   {name}: {len(frames[name]):,} rows{size} in {seconds[name]:.2f}s")
@@ -0,0 +1,225 @@
+import difflib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from aggregations import frame_token
+from build_cache import CACHE_DIR
+from build_trace import TRACER
+
+# District-keyed joins across the disability, awareness and hospital data.
+# District (and, where the dataset has one, state) names are normalized and
+# mapped to small integer surrogate keys. A name that doesn't match exactly is
+# matched with difflib against a small block of known districts (same state
+# when the state is known, same first letter, same digits) and the decision - a match or a new key - is remembered in a
+# dictionary stored on disk, so fuzzy matching only ever runs once per new
+# spelling. Frames are then reduced to one row per key and hash-joined on the
+# integer keys into a compact district fact table (float32 measures).
+#
+# The first dataset passed to fact_table() defines the district universe;
+# districts only found in later datasets are added after it.
+
+KEYS_PATH = os.path.join(CACHE_DIR, 'district_keys.json')
+FUZZY_CUTOFF = 0.88
+
+# Dictionary used by fact_table(); set_keys_path() moves it under the build's
+# cache directory, or to None to keep it in memory only (--no-cache)
+_keys_path = KEYS_PATH
+
+# dataset -> (district column, state column or None, {source column: fact column})
+FACT_SOURCES = {
+    'disability_district': ('State_District_Name', 'State_Name', {
+        'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total': 'disability_rate',
+    }),
+    'awareness': ('State_District_Name', 'State_Name', {
+        'XX_Women_Who_Are_Aware_Of_Hiv_Aids_Total': 'hiv_awareness',
+        'XX_Women_Who_Are_Aware_Of_Rti_Sti_Total': 'rti_sti_awareness',
+    }),
+    'hospitals': ('District', None, {
+        'Total Hospitals': 'total_hospitals',
+        'Public-Private Ratio (%)': 'public_share',
+    }),
+}
+
+
+def normalize_name(value):
+    value = str(value).lower().replace('&', ' and ')
+    return re.sub(r'[^a-z0-9]+', ' ', value).strip()
+
+
+def _block(state, district):
+    # Fuzzy candidates share the state (any state when unknown), the first
+    # letter and the digits in the name, so 'ward 5' never matches 'ward 15'
+    return state, district[:1], ''.join(ch for ch in district if ch.isdigit())
+
+
+class DistrictKeys:
+    def __init__(self, path=KEYS_PATH, cutoff=FUZZY_CUTOFF):
+        self.path = path
+        self.cutoff = cutoff
+        self.lock = threading.Lock()
+        self.districts = []   # key -> [state, district, state label, district label]; state may be ''
+        self.aliases = {}     # 'state|district' as seen in a source -> key
+        self.dirty = False
+        self.by_name = None
+        self.blocks = None
+        self.indexed = 0
+        if path is None:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self.districts = saved['districts']
+            self.aliases = saved['aliases']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _index(self):
+        # district name -> keys, and blocks of {district: key} for fuzzy matching
+        if self.by_name is None or self.indexed != len(self.districts):
+            self.by_name, self.blocks = {}, {}
+            for key, (state, district, *_) in enumerate(self.districts):
+                self._add_to_index(key, state, district)
+        return self.by_name
+
+    def _add_to_index(self, key, state, district):
+        self.by_name.setdefault(district, []).append(key)
+        for block_state in {state, ''}:
+            self.blocks.setdefault(_block(block_state, district), {})[district] = key
+        self.indexed = key + 1
+
+    def _resolve(self, state, district, labels, create, fuzzy):
+        # Exact (state, district), then a unique district name, then fuzzy, then a new key
+        candidates = {key: self.districts[key][0] for key in self._index().get(district, [])
+                      if not state or not self.districts[key][0] or self.districts[key][0] == state}
+        if len(candidates) == 1:
+            return next(iter(candidates))
+        if len(candidates) > 1:
+            exact = [key for key, known_state in candidates.items() if known_state == state]
+            return exact[0] if exact else None
+
+        if fuzzy:
+            names = self.blocks.get(_block(state, district), {})
+            match = difflib.get_close_matches(district, list(names), n=1, cutoff=self.cutoff)
+            if match:
+                return names[match[0]]
+        if not create:
+            return None
+        self.districts.append([state, district, *labels])
+        self._add_to_index(len(self.districts) - 1, state, district)
+        return len(self.districts) - 1
+
+    def keys(self, districts, states=None, create=True, fuzzy=True):
+        # int32 surrogate key per row (-1 when unmatched and create is False).
+        # Only the distinct (state, district) pairs are looked up; fuzzy=False
+        # skips fuzzy matching (for the dataset that defines the districts).
+        pairs = pd.DataFrame({'state': '' if states is None else pd.Series(states).astype(str).to_numpy(),
+                              'district': pd.Series(districts).astype(str).to_numpy()})
+        codes, uniques = pd.MultiIndex.from_frame(pairs).factorize()
+        resolved = np.empty(len(uniques), dtype=np.int32)
+        with self.lock:
+            for i, (state, district) in enumerate(uniques):
+                alias = f'{normalize_name(state)}|{normalize_name(district)}'
+                key = self.aliases.get(alias)
+                if key is None:
+                    key = self._resolve(normalize_name(state), normalize_name(district),
+                                        (state, district), create, fuzzy)
+                    if key is None:
+                        resolved[i] = -1
+                        continue
+                    self.aliases[alias] = key
+                    self.dirty = True
+                resolved[i] = key
+        return resolved[codes]
+
+    def save(self):
+        with self.lock:
+            if not self.dirty or self.path is None:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Pool workers may save concurrently: write aside, then swap in
+            temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'districts': self.districts, 'aliases': self.aliases}, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+
+
+def _reduce(df, keys, columns):
+    # One row per key: the mean of duplicates, keyed and sorted by surrogate key
+    values = df[list(columns)].astype(np.float32)
+    values.columns = list(columns.values())
+    values['district_key'] = keys
+    return values[keys >= 0].groupby('district_key', sort=True).mean()
+
+
+def build_fact_table(frames, keys=None):
+    # frames: {dataset name: frame} for names in FACT_SOURCES. Returns a frame
+    # indexed by district_key with state / district labels and every measure.
+    keys = keys or DistrictKeys(_keys_path)
+    parts = []
+    for position, (name, df) in enumerate(frames.items()):
+        district_col, state_col, columns = FACT_SOURCES[name]
+        with TRACER.span(f'join:{name}', 'join', rows=len(df)) as span:
+            row_keys = keys.keys(df[district_col], df[state_col] if state_col else None, fuzzy=position > 0)
+            parts.append(_reduce(df, row_keys, columns))
+            span['districts'] = len(parts[-1])
+    keys.save()
+
+    universe = pd.Index(np.unique(np.concatenate([part.index.to_numpy() for part in parts])),
+                        name='district_key')
+    fact = pd.DataFrame(index=universe)
+    fact['state'] = [keys.districts[key][2] for key in universe]
+    fact['district'] = [keys.districts[key][3] for key in universe]
+    for part in parts:
+        # Hash join on the integer key: positions of the universe in this part
+        positions = part.index.get_indexer(universe)
+        for col in part.columns:
+            values = np.full(len(universe), np.nan, dtype=np.float32)
+            found = positions >= 0
+            values[found] = part[col].to_numpy()[positions[found]]
+            fact[col] = values
+    return fact
+
+
+_FACT_CACHE = OrderedDict()
+_FACT_LOCK = threading.Lock()
+
+
+def set_keys_path(path):
+    # path=None: match districts without reading or writing a dictionary
+    global _keys_path
+    with _FACT_LOCK:
+        _keys_path = path
+        _FACT_CACHE.clear()
+
+
+def fact_table(**frames):
+    # Memoized on the frames' dataset versions (see aggregations.frame_token)
+    tokens = tuple((name, frame_token(df)) for name, df in sorted(frames.items()))
+    cacheable = all(token is not None for _, token in tokens)
+    if cacheable:
+        with _FACT_LOCK:
+            if tokens in _FACT_CACHE:
+                _FACT_CACHE.move_to_end(tokens)
+                return _FACT_CACHE[tokens]
+    fact = build_fact_table(frames)
+    if cacheable:
+        with _FACT_LOCK:
+            _FACT_CACHE[tokens] = fact
+            while len(_FACT_CACHE) > 8:
+                _FACT_CACHE.popitem(last=False)
+    return fact
+
+
+def correlation(fact, x, y):
+    # Pearson r over districts that have both measures, and how many there are
+    both = fact[[x, y]].dropna()
+    if len(both) < 2:
+        return float('nan'), len(both)
+    return float(np.corrcoef(both[x], both[y])[0, 1]), len(both)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from build_trace import TRACER
+from rankings import top_k_positions
+
+# Data reduction for charts that would otherwise ship every row to the browser.
+#   lttb()         Largest-Triangle-Three-Buckets: keeps the visual shape of a
+#                  time series in `budget` points (first and last always kept)
+#   bin_scatter()  square-grid binning of an x/y cloud into at most `budget`
+#                  occupied cells with their point counts
+#   top_n_other()  the `budget` largest categories plus one "Other" row
+#   top_n()        the `budget` largest rows, no remainder (for ratios/rates)
+#   use_webgl()    swaps SVG scatter traces above the 'webgl' point count for
+#                  Scattergl with plain markers (applied to every chart by
+#                  chart_registry.render_fragment)
+# Each helper returns its input unchanged when it is already within budget, so
+# small datasets render exactly as before. Budgets live in POINT_BUDGETS and
+# can be changed from the generator's command line (--point-budget KIND=N).
+
+POINT_BUDGETS = {
+    'line': 2000,      # points per time-series trace
+    'scatter': 5000,   # markers per scatter trace before binning
+    'bar': 30,         # categories per bar chart (the rest becomes "Other")
+    'heatmap': 30,     # heatmap columns
+    'webgl': 1000,     # points per scatter trace above which WebGL is used
+}
+
+
+def budget(kind):
+    return POINT_BUDGETS[kind]
+
+
+def set_budgets(values):
+    # ['line=500', 'bar=20'] -> POINT_BUDGETS updated in place
+    for value in values or []:
+        kind, _, count = value.partition('=')
+        if kind not in POINT_BUDGETS:
+            raise ValueError(f"unknown point budget {kind!r} (expected one of {', '.join(POINT_BUDGETS)})")
+        POINT_BUDGETS[kind] = int(count)
+
+
+def _numeric(values):
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=np.float64)
+    return values.to_numpy(dtype=np.float64)
+
+
+def lttb_indices(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = _numeric(x)
+    y = _numeric(y)
+    # Interior points split into threshold - 2 buckets; one point is kept per bucket
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        if i + 2 < len(edges):
+            next_start, next_stop = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_stop = n - 1, n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        area = np.abs((x[previous] - avg_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (avg_y - y[previous]))
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        selected[i + 1] = previous
+    return selected
+
+
+def lttb(df, x, y, threshold=None):
+    # Rows of df (sorted by x) that best preserve the shape of y over x
+    threshold = budget('line') if threshold is None else threshold
+    if len(df) <= threshold:
+        return df
+    with TRACER.span(f'lttb:{y}', 'reduce', rows=len(df), points=threshold):
+        return df.iloc[lttb_indices(df[x], df[y], threshold)]
+
+
+def _edges(values, bins):
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        # All points share one value: a single unit-wide cell centred on it
+        lo, hi, bins = lo - 0.5, hi + 0.5, 1
+    return np.linspace(lo, hi, bins + 1)
+
+
+def bin_scatter(df, x, y, threshold=None):
+    # Within budget: df unchanged. Otherwise one row per occupied grid cell with
+    # the cell centre in x / y and the number of points in 'count'.
+    threshold = budget('scatter') if threshold is None else threshold
+    if len(df) <= threshold:
+        return df
+    with TRACER.span(f'bin:{x}/{y}', 'reduce', rows=len(df), points=threshold) as span:
+        points = df[[x, y]].dropna()
+        xs, ys = _numeric(points[x]), _numeric(points[y])
+        bins = max(int(np.sqrt(threshold)), 1)
+        x_edges, y_edges = _edges(xs, bins), _edges(ys, bins)
+        counts, _, _ = np.histogram2d(xs, ys, bins=[x_edges, y_edges])
+        ix, iy = np.nonzero(counts)
+        binned = pd.DataFrame({
+            x: (x_edges[ix] + x_edges[ix + 1]) / 2,
+            y: (y_edges[iy] + y_edges[iy + 1]) / 2,
+            'count': counts[ix, iy].astype(np.int64),
+        })
+        span['cells'] = len(binned)
+        return binned
+
+
+def top_n_other(df, label, values, n=None, other_label='Other'):
+    # The n categories with the largest values[0] total, in their original
+    # order, plus one row summing the rest
+    n = budget('bar') if n is None else n
+    if len(df) <= n:
+        return df
+    values = list(values)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[top_k_positions(df[values[0]], n)] = True
+    kept = df[keep]
+    rest = df.loc[~keep, values].sum()
+    other = pd.DataFrame({label: [f'{other_label} ({len(df) - n})'],
+                          **{col: [rest[col]] for col in values}})
+    return pd.concat([kept[[label] + values], other], ignore_index=True)
+
+
+def top_n(df, column, n):
+    # The n largest rows by column, in their original order
+    if len(df) <= n:
+        return df
+    return df.iloc[np.sort(top_k_positions(df[column], n))]
+
+
+def _trace_points(trace):
+    values = trace.x if trace.x is not None else trace.y
+    return 0 if values is None else len(values)
+
+
+def use_webgl(fig, threshold=None):
+    # Returns (figure, number of traces converted). Only go.Scatter traces are
+    # touched; properties Scattergl doesn't support are dropped.
+    threshold = budget('webgl') if threshold is None else threshold
+    converted = 0
+    traces = []
+    for trace in fig.data:
+        if trace.type == 'scatter' and _trace_points(trace) > threshold:
+            props = trace.to_plotly_json()
+            props.pop('type', None)
+            gl_trace = go.Scattergl(props, skip_invalid=True)
+            # Outlines are drawn per marker; without them WebGL batches everything
+            gl_trace.marker.line.width = 0
+            traces.append(gl_trace)
+            converted += 1
+        else:
+            traces.append(trace)
+    if not converted:
+        return fig, 0
+    return go.Figure(data=traces, layout=fig.layout), converted
@@ -0,0 +1,122 @@
+import datetime
+import os
+
+import pandas as pd
+
+from build_cache import CACHE_DIR
+from summary_store import SummaryStore
+
+# Append-only ingestion for the events and webinar feeds.
+# Both files are logs that only ever grow, and their charts only need counts:
+# per Category / Sentiment / Scheme / ..., and per (Month, Category). FeedStore
+# keeps those counters, plus the number of rows per Date, next to a high-water
+# mark (the byte offset of the last complete row read). Each build parses only
+# the rows after the mark and adds them to the counters; a rewritten file is
+# re-read from the top (the append detection is SummaryStore's).
+#
+# The files' 'Upcoming/Past' column is frozen at export time. FeedCounts.status()
+# classifies from the per-date counts against the build date instead.
+#
+# Charts and summaries opt in with counts={dataset: [counter, ...]}, where a
+# counter is a column name or 'Column|Column' for joint counts. Frames (sliced
+# ones in the live server, say) are reduced with FeedCounts.from_frame.
+
+FEED_STORE_PATH = os.path.join(CACHE_DIR, 'feed_store.json')
+DATE_COLUMN = 'Date'
+
+
+def _python(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+class FeedCounts:
+    def __init__(self, rows=0, counters=None, dates=None):
+        self.rows = rows
+        # 'Column' or 'Column|Column' -> {value tuple: count}, in first-seen order
+        self.counters = counters or {}
+        # ISO date -> rows on that date
+        self.dates = dates or {}
+
+    def __len__(self):
+        return self.rows
+
+    @classmethod
+    def from_frame(cls, df, counters):
+        counts = {}
+        for counter in counters:
+            columns = counter.split('|')
+            if not all(col in df.columns for col in columns):
+                continue
+            sizes = df.groupby(columns, observed=True, sort=False).size()
+            keys = sizes.index.tolist() if len(columns) > 1 else [(key,) for key in sizes.index.tolist()]
+            counts[counter] = {tuple(_python(value) for value in key): int(size)
+                               for key, size in zip(keys, sizes.to_numpy())}
+        dates = {}
+        if DATE_COLUMN in df.columns:
+            days = pd.to_datetime(df[DATE_COLUMN], errors='coerce').dropna().dt.strftime('%Y-%m-%d')
+            dates = {day: int(size) for day, size in days.value_counts(sort=False).items()}
+        return cls(len(df), counts, dates)
+
+    def merge(self, other):
+        counters = {}
+        for counter in list(self.counters) + [key for key in other.counters if key not in self.counters]:
+            merged = dict(self.counters.get(counter, {}))
+            for key, count in other.counters.get(counter, {}).items():
+                merged[key] = merged.get(key, 0) + count
+            counters[counter] = merged
+        dates = dict(self.dates)
+        for day, count in other.dates.items():
+            dates[day] = dates.get(day, 0) + count
+        return FeedCounts(self.rows + other.rows, counters, dates)
+
+    def value_counts(self, column):
+        # Like frame[column].value_counts() on the raw strings: largest first,
+        # ties in first-seen order. Categorical columns would break ties in
+        # category (alphabetical) order and swap the pies' positional colors.
+        counts = self.counters[column]
+        keys = sorted(counts, key=lambda key: -counts[key])
+        return pd.Series([counts[key] for key in keys], index=pd.Index([key[0] for key in keys], name=column),
+                         name='count', dtype='int64')
+
+    def size(self, columns):
+        # Like frame.groupby(columns).size()
+        counts = self.counters['|'.join(columns)]
+        keys = sorted(counts)
+        return pd.Series([counts[key] for key in keys], dtype='int64',
+                         index=pd.MultiIndex.from_tuples(keys, names=columns))
+
+    def status(self, as_of=None):
+        # {'Upcoming': n, 'Past': n} with dates after `as_of` (default: today) upcoming
+        as_of = (as_of or datetime.date.today()).isoformat()
+        upcoming = sum(count for day, count in self.dates.items() if day > as_of)
+        return {'Upcoming': upcoming, 'Past': sum(self.dates.values()) - upcoming}
+
+    @property
+    def latest(self):
+        return max(self.dates) if self.dates else None
+
+    def to_json(self):
+        return {'rows': self.rows,
+                'counters': {counter: [[*key, count] for key, count in counts.items()]
+                             for counter, counts in self.counters.items()},
+                'dates': self.dates}
+
+    @classmethod
+    def from_json(cls, value):
+        return cls(value['rows'],
+                   {counter: {tuple(entry[:-1]): entry[-1] for entry in counts}
+                    for counter, counts in value['counters'].items()},
+                   value['dates'])
+
+
+class FeedStore(SummaryStore):
+    # Counters only: appended batches are folded into the total, not kept
+    summary_class = FeedCounts
+    span_prefix = 'feed_store'
+    keep_partitions = False
+
+    def __init__(self, path=FEED_STORE_PATH, enabled=True):
+        super().__init__(path, enabled)
+
+    def counts(self, name, counters):
+        return self.stats(name, counters)
@@ -0,0 +1,160 @@
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from aggregations import frame_token
+from build_trace import TRACER
+from chart_payloads import round_significant
+from schema import FLOAT32_DIGITS
+
+# Rural/urban and gender gap metrics for the wide survey tables.
+# Indicator columns follow two naming schemes:
+#   HH_Prevalence_Of_<topic>_Per_100000_Population_<Person|Male|Female>_<Total|Rural|Urban>
+#   XX_Women_Who_Are_Aware_Of_<topic>_<Total|Rural|Urban>            (sex: Female)
+# parse_indicators() maps them to (topic, sex, area) labels (indicator_columns()
+# is the reverse lookup charts use to pick columns by meaning) and
+# indicator_cube() lays a frame's indicators out as one float64 array of shape
+# (rows, topics, sexes, areas), NaN where a combination is not surveyed.
+# gap_metrics() then computes every metric for every topic at once:
+#   value              the indicator itself
+#   rank               1 = highest value among the rows
+#   urban_rural_gap    Urban - Rural          (area 'Urban-Rural')
+#   urban_rural_ratio  Urban / Rural
+#   gender_gap         Female - Male          (sex 'Female-Male')
+#   gender_ratio       Female / Male
+#   *_gap_rank         1 = widest absolute gap among the rows
+# The result is indexed like the input frame with (metric, topic, sex, area)
+# columns; combinations with no data at all are dropped. Results are memoized
+# on the frame's dataset version, like aggregations and district_join.
+
+INDICATOR_PATTERNS = [
+    (re.compile(r'^HH_Prevalence_Of_(?P<topic>.+)_Per_100000_Population_(?P<sex>Person|Male|Female)_'
+                r'(?P<area>Total|Rural|Urban)$'), None),
+    (re.compile(r'^XX_Women_Who_Are_Aware_Of_(?P<topic>.+)_(?P<area>Total|Rural|Urban)$'), 'Female'),
+]
+SEXES = ['Person', 'Male', 'Female']
+AREAS = ['Total', 'Rural', 'Urban']
+LEVELS = ['topic', 'sex', 'area']
+METRIC_LEVELS = ['metric'] + LEVELS
+
+
+def parse_indicators(columns):
+    # {column: (topic, sex, area)} for the columns that follow a known scheme
+    parsed = {}
+    for col in columns:
+        for pattern, sex in INDICATOR_PATTERNS:
+            match = pattern.match(col)
+            if match:
+                parsed[col] = (match['topic'], sex or match['sex'], match['area'])
+                break
+    return parsed
+
+
+def indicator_columns(columns):
+    # (topic, sex, area) -> column name, for picking indicators by meaning
+    return {labels: col for col, labels in parse_indicators(columns).items()}
+
+
+def indicator_cube(df):
+    # (cube, topics): float64 values of shape (rows, topics, SEXES, AREAS)
+    parsed = parse_indicators(df.columns)
+    topics = list(dict.fromkeys(topic for topic, _, _ in parsed.values()))
+    cube = np.full((len(df), len(topics), len(SEXES), len(AREAS)), np.nan)
+    if not parsed:
+        return cube, topics
+    columns = list(parsed)
+    block = df[columns].to_numpy(dtype=np.float64, copy=True)
+    # Compact float32 columns (schema.py) go back to the values that were parsed
+    narrow = np.array([df[col].dtype == np.float32 for col in columns])
+    if narrow.any():
+        block[:, narrow] = round_significant(block[:, narrow], FLOAT32_DIGITS)
+    t, s, a = (np.array(positions) for positions in zip(*[
+        (topics.index(topic), SEXES.index(sex), AREAS.index(area)) for topic, sex, area in parsed.values()]))
+    cube[:, t, s, a] = block
+    return cube, topics
+
+
+def _flatten(metric, values, topics, sexes, areas):
+    # (rows, topics, sexes, areas) -> (rows, combinations) plus their column labels
+    labels = pd.MultiIndex.from_product([[metric], topics, sexes, areas], names=METRIC_LEVELS)
+    return values.reshape(len(values), -1), labels
+
+
+def _rank(values, by_magnitude=False):
+    # Column-wise rank over the rows, 1 = largest (NaN stays NaN)
+    frame = pd.DataFrame(np.abs(values) if by_magnitude else values)
+    return frame.rank(axis=0, ascending=False, method='min').to_numpy()
+
+
+def compute_gap_metrics(df):
+    with TRACER.span(f"gap_metrics:{df.attrs.get('dataset', '?')}", 'metrics', rows=len(df)) as span:
+        cube, topics = indicator_cube(df)
+        rural, urban = cube[..., AREAS.index('Rural')], cube[..., AREAS.index('Urban')]
+        male, female = cube[:, :, SEXES.index('Male'), :], cube[:, :, SEXES.index('Female'), :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            area_gap, area_ratio = urban - rural, urban / rural
+            sex_gap, sex_ratio = female - male, female / male
+
+        by_area = (topics, SEXES, ['Urban-Rural'])
+        by_sex = (topics, ['Female-Male'], AREAS)
+        parts = [
+            _flatten('value', cube, topics, SEXES, AREAS),
+            _flatten('urban_rural_gap', area_gap[..., None], *by_area),
+            _flatten('urban_rural_ratio', area_ratio[..., None], *by_area),
+            _flatten('gender_gap', sex_gap[:, :, None, :], *by_sex),
+            _flatten('gender_ratio', sex_ratio[:, :, None, :], *by_sex),
+        ]
+        values = np.concatenate([block for block, _ in parts], axis=1)
+        labels = pd.MultiIndex.from_tuples([label for _, names in parts for label in names], names=METRIC_LEVELS)
+        # Ranks for the values and gaps, all columns in one call each
+        metric = labels.get_level_values('metric')
+        ranked = [('rank', metric == 'value', False),
+                  ('urban_rural_gap_rank', metric == 'urban_rural_gap', True),
+                  ('gender_gap_rank', metric == 'gender_gap', True)]
+        values = np.concatenate([values] + [_rank(values[:, mask], by_magnitude)
+                                            for _, mask, by_magnitude in ranked], axis=1)
+        labels = labels.append([pd.MultiIndex.from_arrays(
+            [[name] * mask.sum()] + [labels[mask].get_level_values(level) for level in LEVELS],
+            names=METRIC_LEVELS) for name, mask, _ in ranked])
+
+        metrics = pd.DataFrame(values, index=df.index, columns=labels)
+        metrics = metrics.loc[:, metrics.notna().any(axis=0).to_numpy()]
+        span['topics'] = len(topics)
+        span['columns'] = metrics.shape[1]
+    return metrics
+
+
+_METRICS_CACHE = OrderedDict()
+_METRICS_LOCK = threading.Lock()
+
+
+def gap_metrics(df):
+    token = frame_token(df)
+    if token is not None:
+        with _METRICS_LOCK:
+            if token in _METRICS_CACHE:
+                _METRICS_CACHE.move_to_end(token)
+                return _METRICS_CACHE[token]
+    metrics = compute_gap_metrics(df)
+    if token is not None:
+        with _METRICS_LOCK:
+            _METRICS_CACHE[token] = metrics
+            while len(_METRICS_CACHE) > 8:
+                _METRICS_CACHE.popitem(last=False)
+    return metrics
+
+
+def metric(df, name, topic, sex='Person', area='Total'):
+    # One metric column as a Series indexed like df
+    return gap_metrics(df)[(name, topic, sex, area)]
+
+
+def topic_summary(metrics, name, how='median'):
+    # One row per (topic, sex, area) column of `name` with its median (or
+    # other reduction) over the rows, e.g. the typical district gap per topic
+    block = metrics[name]
+    summary = getattr(block, how)(axis=0)
+    return summary.rename(name).reset_index()
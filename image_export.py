@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
+
+from build_cache import CACHE_DIR
+from build_trace import TRACER
+from chart_payloads import payload_figure
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+# Static image export for the registered charts (email digests, PDF reports).
+# Figures come from the compact chart payloads, so an image export reuses the
+# build cache like the HTML does. Every image is content-addressed: its key
+# is a hash of the figure JSON, format, size and renderer versions, and
+# rendered images are kept under IMAGE_CACHE_DIR by key. Only figures with no
+# cached image are rendered, all of them in one plotly.io.write_images() call,
+# i.e. one Kaleido session and one headless Chrome for the whole batch. The
+# output directory gets <chart id>.<format> files plus images.json (chart file
+# -> key); files whose key did not change are left untouched. With
+# cache_dir=None (--no-cache) images are rendered into a scratch directory
+# and nothing is kept.
+#
+# Rendering needs Kaleido >= 1.0 (pip install kaleido) and a Chrome/Chromium;
+# exports served entirely from the cache need neither.
+
+IMAGE_CACHE_DIR = os.path.join(CACHE_DIR, 'images')
+IMAGE_FORMATS = ['png', 'svg', 'pdf']
+MANIFEST_NAME = 'images.json'
+
+
+def image_key(figure, image_format, width=None, height=None, scale=None):
+    renderer = {'plotly.js': get_plotlyjs_version(), 'kaleido': getattr(kaleido, '__version__', None)}
+    text = json.dumps({'figure': figure, 'format': image_format, 'width': width, 'height': height,
+                       'scale': scale, 'renderer': renderer}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ImageExporter:
+    def __init__(self, output_dir, formats=('png',), width=None, height=None, scale=None,
+                 cache_dir=IMAGE_CACHE_DIR):
+        self.output_dir = output_dir
+        self.formats = list(formats)
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.cache_dir = cache_dir
+
+    def _cached_path(self, cache_dir, key, image_format):
+        return os.path.join(cache_dir, key[:2], f'{key}.{image_format}')
+
+    def _render(self, jobs):
+        # jobs: [(figure dict, cache path, format)], rendered in one Kaleido session
+        if kaleido is None:
+            raise RuntimeError('image export needs Kaleido to render new charts (pip install kaleido)')
+        temp_paths = [f'{path}.{os.getpid()}.tmp.{image_format}' for _, path, image_format in jobs]
+        for path in temp_paths:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with TRACER.span('images:render', 'images', images=len(jobs)):
+            pio.write_images([figure for figure, _, _ in jobs], temp_paths,
+                             format=[image_format for _, _, image_format in jobs],
+                             width=self.width, height=self.height, scale=self.scale)
+        for temp_path, (_, path, _) in zip(temp_paths, jobs):
+            os.replace(temp_path, path)
+
+    def export(self, payloads):
+        # payloads: chart id -> compact payload. Returns (images written, rendered, from cache).
+        if self.cache_dir is None:
+            with tempfile.TemporaryDirectory() as scratch:
+                return self._export(payloads, scratch)
+        return self._export(payloads, self.cache_dir)
+
+    def _export(self, payloads, cache_dir):
+        manifest_path = os.path.join(self.output_dir, MANIFEST_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        targets, jobs = {}, {}
+        for chart_id, payload in payloads.items():
+            figure = payload_figure(payload)
+            for image_format in self.formats:
+                key = image_key(figure, image_format, self.width, self.height, self.scale)
+                cached = self._cached_path(cache_dir, key, image_format)
+                targets[f'{chart_id}.{image_format}'] = (key, cached)
+                if key not in jobs and not os.path.exists(cached):
+                    jobs[key] = (figure, cached, image_format)
+        if jobs:
+            self._render(list(jobs.values()))
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+        for name, (key, cached) in targets.items():
+            target = os.path.join(self.output_dir, name)
+            if manifest.get(name) != key or not os.path.exists(target):
+                shutil.copyfile(cached, target)
+                manifest[name] = key
+                written.append(target)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        return written, len(jobs), len(targets) - len(jobs)
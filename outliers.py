@@ -0,0 +1,80 @@
+import numpy as np
+
+# Vectorized outlier filtering for DATACLEANING.PY
+# Statistics for every column are computed together on one float matrix and
+# turned into per-column [lower, upper] bounds, which are combined into a
+# single row mask. The result no longer depends on the order the columns are
+# checked in and the frame is only filtered once. Missing values are never
+# treated as outliers.
+#
+# The bounds only need a handful of statistics per column (see RULE_STATS), so
+# the streaming cleaner can compute the same bounds from its sketches.
+
+# Statistics each rule needs
+RULE_STATS = {
+    'zscore': ('mean', 'std'),
+    'iqr': ('q1', 'q3'),
+    'mad': ('median', 'mad'),
+}
+
+DEFAULT_THRESHOLDS = {
+    'zscore': 3.0,
+    'iqr': 1.5,
+    'mad': 3.5,
+}
+
+
+def array_stats(values, rule):
+    stats = {}
+    needed = RULE_STATS[rule]
+    if 'mean' in needed:
+        stats['mean'] = np.nanmean(values, axis=0)
+        stats['std'] = np.nanstd(values, axis=0, ddof=1)
+    if 'q1' in needed:
+        stats['q1'], stats['q3'] = np.nanpercentile(values, [25, 75], axis=0)
+    if 'median' in needed:
+        stats['median'] = np.nanmedian(values, axis=0)
+        stats['mad'] = np.nanmedian(np.abs(values - stats['median']), axis=0)
+    return stats
+
+
+def rule_bounds(rule, stats, threshold=None):
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[rule]
+
+    if rule == 'zscore':
+        spread = threshold * np.asarray(stats['std'], dtype=np.float64)
+        center = np.asarray(stats['mean'], dtype=np.float64)
+        return center - spread, center + spread
+    if rule == 'iqr':
+        q1 = np.asarray(stats['q1'], dtype=np.float64)
+        q3 = np.asarray(stats['q3'], dtype=np.float64)
+        spread = threshold * (q3 - q1)
+        return q1 - spread, q3 + spread
+    if rule == 'mad':
+        # Modified z-score (Iglewicz & Hoaglin); a column with zero MAD is left alone
+        center = np.asarray(stats['median'], dtype=np.float64)
+        mad = np.asarray(stats['mad'], dtype=np.float64)
+        spread = np.where(mad == 0, np.inf, threshold * mad / 0.6745)
+        return center - spread, center + spread
+    raise ValueError(f"Unknown outlier rule: {rule}")
+
+
+def mask_within(values, lower, upper):
+    with np.errstate(invalid='ignore'):
+        keep = (values >= lower) & (values <= upper)
+    keep |= np.isnan(values)
+    return keep.all(axis=1)
+
+
+def outlier_mask(df, columns, rule='zscore', threshold=None):
+    values = df[list(columns)].to_numpy(dtype=np.float64)
+    lower, upper = rule_bounds(rule, array_stats(values, rule), threshold)
+    return mask_within(values, lower, upper)
+
+
+def remove_outliers(df, columns, rule='zscore', threshold=None):
+    columns = [col for col in columns if col in df.columns]
+    if not columns or df.empty:
+        return df
+    return df[outlier_mask(df, columns, rule, threshold)]
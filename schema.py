@@ -0,0 +1,111 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from chart_payloads import round_significant
+
+# Compact in-memory schema for the survey tables.
+# datasets.load_csv passes every parsed CSV through compact_dtypes() before it
+# is cached, so the district tables come back as:
+#   - whole-number columns (counts, serial numbers, years) as int16 / int32
+#     when their range fits, int64 otherwise
+#   - decimal columns (percentages, per-100,000 rates, scores) as float32 when
+#     every value survives the round trip at float32's 7 significant digits,
+#     float64 otherwise
+#   - state and district names as categoricals
+# Each column is converted on its own, so the frame holds one block per dtype
+# group rather than a single 2D float64 block, and column_view() can hand out
+# renamed column subsets that share that memory instead of copying it.
+#
+# `python schema.py` prints the memory of every dataset before and after.
+
+NAME_COLUMNS = ['State_Name', 'State_District_Name', 'District']
+FLOAT32_DIGITS = 7
+INTEGER_DTYPES = [np.int16, np.int32]
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def compact_integer(values):
+    if values.empty:
+        return values
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if low >= info.min and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def compact_float(values):
+    # float32 only when it prints back as the same number
+    original = values.to_numpy(dtype=np.float64)
+    narrowed = original.astype(np.float32)
+    restored = round_significant(narrowed.astype(np.float64), FLOAT32_DIGITS)
+    if np.array_equal(original, restored, equal_nan=True):
+        return values.astype(np.float32)
+    return values
+
+
+def widen(values):
+    # float64 copy of a numeric Series; float32 columns come back as exactly the
+    # numbers that were parsed (compact_float only narrows when that holds)
+    if values.dtype == np.float32:
+        return pd.Series(round_significant(values.to_numpy(dtype=np.float64), FLOAT32_DIGITS),
+                         index=values.index, name=values.name)
+    return values.astype(np.int64 if pd.api.types.is_integer_dtype(values) else np.float64)
+
+
+def compact_dtypes(df):
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in NAME_COLUMNS and not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = compact_integer(values)
+        elif pd.api.types.is_float_dtype(values):
+            values = compact_float(values)
+        columns[col] = values
+    compact = pd.DataFrame(columns, index=df.index, copy=False)
+    compact.attrs = dict(df.attrs)
+    return compact
+
+
+def column_view(df, columns):
+    # df's `columns` ({name: new name} or a list) as a new frame that shares the
+    # column data (copy-on-write) instead of copying it like df[[...]] does
+    if not isinstance(columns, dict):
+        columns = {col: col for col in columns}
+    return pd.DataFrame({new: df[col] for col, new in columns.items()}, index=df.index, copy=False)
+
+
+def memory_report(names=None):
+    # (dataset, MB as parsed, MB compacted) for the named datasets (default: all)
+    from datasets import DATASET_FILES, DATE_COLUMNS, read_source
+
+    rows = []
+    for name in names or DATASET_FILES:
+        df = read_source(DATASET_FILES[name], DATE_COLUMNS.get(name, ()), compact=False)
+        rows.append((name, memory_bytes(df) / 2**20, memory_bytes(compact_dtypes(df)) / 2**20))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show dataset memory before and after dtype compaction')
+    parser.add_argument('datasets', nargs='*', help='dataset names (default: all)')
+    args = parser.parse_args()
+
+    rows = memory_report(args.datasets)
+    print(f"{'dataset':<22}{'parsed MB':>12}{'compact MB':>12}{'saved':>8}")
+    for name, before, after in rows:
+        print(f"{name:<22}{before:>12.3f}{after:>12.3f}{1 - after / before:>8.0%}")
+    before, after = sum(row[1] for row in rows), sum(row[2] for row in rows)
+    print(f"{'total':<22}{before:>12.3f}{after:>12.3f}{1 - after / before:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
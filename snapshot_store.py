@@ -0,0 +1,268 @@
+import argparse
+import datetime
+import hashlib
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from build_cache import file_sha256
+from build_trace import TRACER
+from datasets import DATASET_FILES, PARTITION_COLUMNS, load_dataset
+from state_index import build_partitions
+
+# Versioned snapshots of the input datasets (one per survey round or delivery).
+#
+#   python snapshot_store.py commit 2019-21 --label "NFHS-5 delivery"
+#   python snapshot_store.py list
+#   python snapshot_store.py diff 2015-16 2019-21 --dataset disability_district \
+#       --column HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total
+#   python dashboard_generator.py --as-of 2015-16 --output dashboard-2015-16.html
+#
+# A snapshot stores every dataset as chunks: one per column and partition
+# (per state for the district tables, see datasets.PARTITION_COLUMNS; the
+# whole table otherwise). Chunks are content-addressed - named by the sha256
+# of their encoded bytes and zlib-compressed under objects/ - so a column or
+# a state that did not change between rounds is stored once and shared by
+# every version that contains it. A version is a small JSON manifest listing
+# its chunks, plus the sha256 of each source file so the build cache can reuse
+# fragments rendered from the same data.
+
+SNAPSHOT_DIR = 'snapshots'
+WHOLE_TABLE = '*'
+
+
+def _encode(values):
+    # (dtype tag, bytes) for one column chunk
+    if isinstance(values.dtype, pd.CategoricalDtype) or not (
+            pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+        dtype = 'category' if isinstance(values.dtype, pd.CategoricalDtype) else str(values.dtype)
+        items = [None if pd.isna(value) else str(value) for value in values.astype(object)]
+        return dtype, json.dumps(items, ensure_ascii=False).encode('utf-8')
+    if pd.api.types.is_datetime64_any_dtype(values):
+        array = values.to_numpy(dtype='datetime64[ns]')
+    else:
+        array = values.to_numpy()
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return str(values.dtype), buffer.getvalue()
+
+
+def _decode(data):
+    if data[:6] == b'\x93NUMPY':
+        return np.load(io.BytesIO(data), allow_pickle=False)
+    return np.array(json.loads(data.decode('utf-8')), dtype=object)
+
+
+def _content_id(entry):
+    chunks = [partition['chunks'][col] for partition in entry['partitions'] for col in entry['columns']]
+    return hashlib.sha256(''.join(chunks).encode('ascii')).hexdigest()
+
+
+class SnapshotStore:
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def _object_path(self, key):
+        return os.path.join(self.root, 'objects', key[:2], key)
+
+    def _manifest_path(self, version):
+        return os.path.join(self.root, 'versions', f'{version}.json')
+
+    def _put(self, data):
+        # Returns (key, bytes written); an existing chunk is not written again
+        key = hashlib.sha256(data).hexdigest()
+        path = self._object_path(key)
+        if os.path.exists(path):
+            return key, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_path, path)
+        return key, len(compressed)
+
+    def _get(self, key):
+        with open(self._object_path(key), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def versions(self):
+        # Manifests, oldest first
+        directory = os.path.join(self.root, 'versions')
+        if not os.path.isdir(directory):
+            return []
+        manifests = [self.manifest(name[:-5]) for name in os.listdir(directory) if name.endswith('.json')]
+        return sorted(manifests, key=lambda manifest: manifest['created'])
+
+    def manifest(self, version):
+        try:
+            with open(self._manifest_path(version), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except OSError:
+            known = ', '.join(manifest['version'] for manifest in self.versions()) or 'none'
+            raise KeyError(f'unknown snapshot version {version!r} (known: {known})') from None
+
+    def sources(self, version):
+        # dataset -> sha256 of the source file the snapshot was taken from
+        # (the content id for frames committed without one)
+        return {name: entry['source'] or _content_id(entry)
+                for name, entry in self.manifest(version)['datasets'].items()}
+
+    def _commit_frame(self, df, partition_column):
+        if partition_column:
+            df, index = build_partitions(df, partition_column)
+            ranges = sorted(index['ranges'].items(), key=lambda item: item[1][0])
+            stop = ranges[-1][1][1] if ranges else 0
+            if stop < len(df):
+                # Rows without a state trail the state ranges
+                ranges.append(('', [stop, len(df)]))
+        else:
+            ranges = [(WHOLE_TABLE, [0, len(df)])]
+
+        dtypes, partitions, new, reused, written = {}, [], 0, 0, 0
+        for partition, (start, stop) in ranges:
+            chunks = {}
+            for col in df.columns:
+                dtypes[col], data = _encode(df[col].iloc[start:stop])
+                chunks[col], size = self._put(data)
+                new, reused, written = new + (size > 0), reused + (size == 0), written + size
+            partitions.append({'key': partition, 'rows': stop - start, 'chunks': chunks})
+        entry = {'rows': len(df), 'columns': list(df.columns), 'dtypes': dtypes,
+                 'partition_column': partition_column, 'partitions': partitions}
+        return entry, {'new': new, 'reused': reused, 'bytes': written}
+
+    def commit(self, version, frames=None, sources=None, label=None):
+        # Snapshot {name: frame} (default: every dataset as loaded now) as `version`
+        if os.path.exists(self._manifest_path(version)):
+            raise ValueError(f'snapshot version {version!r} already exists')
+        if frames is None:
+            frames = {name: load_dataset(name) for name in DATASET_FILES}
+            sources = {name: file_sha256(DATASET_FILES[name]) for name in frames}
+        datasets, report = {}, {}
+        for name, df in frames.items():
+            with TRACER.span(f'snapshot:{name}', 'snapshot', rows=len(df)) as span:
+                datasets[name], report[name] = self._commit_frame(df, PARTITION_COLUMNS.get(name))
+                datasets[name]['source'] = (sources or {}).get(name)
+                span.update(report[name])
+        manifest = {'version': version, 'label': label, 'datasets': datasets,
+                    'created': datetime.datetime.now(datetime.timezone.utc).isoformat()}
+        path = self._manifest_path(version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        return report
+
+    def load(self, version, name):
+        # The dataset as it was in `version`, in the same shape load_dataset returns
+        entry = self.manifest(version)['datasets'].get(name)
+        if entry is None:
+            raise KeyError(f'dataset {name!r} is not in snapshot {version!r}')
+        with TRACER.span(f'load:{name}@{version}', 'load', dataset=name, rows=entry['rows']):
+            columns = {}
+            for col in entry['columns']:
+                parts = [_decode(self._get(partition['chunks'][col]))
+                         for partition in entry['partitions']]
+                values = np.concatenate(parts) if parts else np.array([], dtype=object)
+                dtype = entry['dtypes'][col]
+                if dtype.startswith('datetime64'):
+                    columns[col] = pd.Series(values, dtype='datetime64[ns]').astype(dtype)
+                else:
+                    columns[col] = pd.Series(values).astype(dtype)
+            df = pd.DataFrame(columns)
+            if entry['partition_column']:
+                df, index = build_partitions(df, entry['partition_column'])
+                df.attrs['partitions'] = index
+
+        # Same chunks -> same token, so caches are shared between versions holding identical data
+        df.attrs['dataset'] = name
+        df.attrs['version'] = _content_id(entry)
+        return df
+
+    def diff(self, old, new, name, column, keys=None):
+        # Per-row change in `column` between two versions, matched on `keys`
+        # (default: state and district names where the dataset has them)
+        before, after = self.load(old, name), self.load(new, name)
+        if keys is None:
+            keys = [col for col in ('State_Name', 'State_District_Name', 'District') if col in after.columns]
+        if not keys:
+            raise ValueError(f'{name}: no key columns to match rows on, pass keys')
+
+        def values(df):
+            frame = df[keys + [column]].copy()
+            for key in keys:
+                frame[key] = frame[key].astype(str)
+            return frame.groupby(keys, sort=False)[column].mean()
+
+        changes = pd.concat({old: values(before), new: values(after)}, axis=1)
+        changes['change'] = changes[new] - changes[old]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes['change_pct'] = changes['change'] / changes[old].abs() * 100
+        order = changes['change'].abs().sort_values(ascending=False, na_position='last').index
+        return changes.loc[order].reset_index()
+
+
+def diff_figure(changes, column, top=20):
+    # Horizontal bars of the largest absolute changes
+    import plotly.graph_objects as go
+
+    old, new = changes.columns[-4], changes.columns[-3]
+    top_changes = changes.dropna(subset=['change']).head(top).iloc[::-1]
+    labels = top_changes.iloc[:, :-4].astype(str).agg(', '.join, axis=1)
+    fig = go.Figure(go.Bar(
+        x=top_changes['change'], y=labels, orientation='h',
+        marker_color=np.where(top_changes['change'] >= 0, '#c0392b', '#27ae60'),
+        customdata=top_changes[[old, new]].to_numpy(),
+        hovertemplate='%{y}<br>' + f'{old}: ' + '%{customdata[0]:.2f}<br>' + f'{new}: '
+                      + '%{customdata[1]:.2f}<br>Change: %{x:+.2f}<extra></extra>'))
+    fig.update_layout(title=f'Largest changes in {column}: {old} → {new}', template='plotly_white',
+                      height=max(400, 22 * len(top_changes) + 120), xaxis_title='Change')
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Versioned, deduplicated snapshots of the input datasets')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commit = commands.add_parser('commit', help='snapshot the current datasets as a new version')
+    commit.add_argument('version')
+    commit.add_argument('--label', help='description, e.g. the survey round')
+    commands.add_parser('list', help='list the stored versions')
+    diff = commands.add_parser('diff', help='change in one indicator between two versions')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--dataset', default='disability_district')
+    diff.add_argument('--column',
+                      default='HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total')
+    diff.add_argument('--top', type=int, default=20, help='rows to print')
+    diff.add_argument('--csv', metavar='PATH', help='write every row of the diff as CSV')
+    diff.add_argument('--html', metavar='PATH', help='write a chart of the largest changes')
+    parser.add_argument('--root', default=SNAPSHOT_DIR, help='snapshot directory')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root)
+    if args.command == 'commit':
+        report = store.commit(args.version, label=args.label)
+        for name, counts in report.items():
+            print(f"   {name}: {counts['new']} new chunks ({counts['bytes'] / 1024:.1f} KB), "
+                  f"{counts['reused']} unchanged")
+        total = sum(counts['bytes'] for counts in report.values())
+        print(f"📦 Snapshot {args.version} stored in {args.root}/ ({total / 1024:.1f} KB new)")
+    elif args.command == 'list':
+        for manifest in store.versions():
+            rows = sum(entry['rows'] for entry in manifest['datasets'].values())
+            print(f"{manifest['version']:<20}{manifest['created'][:19]:<22}{rows:>10,} rows  {manifest['label'] or ''}")
+    else:
+        changes = store.diff(args.old, args.new, args.dataset, args.column)
+        print(changes.head(args.top).to_string(index=False, float_format=lambda value: f'{value:.2f}'))
+        if args.csv:
+            changes.to_csv(args.csv, index=False)
+        if args.html:
+            diff_figure(changes, args.column, args.top).write_html(args.html, include_plotlyjs='cdn')
+            print(f"📊 Diff chart: {args.html}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# State partitions for the district-level datasets.
+# datasets.load_csv sorts these frames by State_Name (stable, so districts keep
+# their file order within a state - the shipped files are already in this
+# order and come through unchanged) and records each state's [start, stop)
+# row range. The ranges are stored in the columnar cache's sidecar file, so
+# they are built once per source version, and attached to the loaded frame as
+# df.attrs['partitions'].
+#
+# pandas copies attrs onto derived frames, so the ranges are only trusted on
+# the frame they were built for: same row count, an untouched 0..n-1
+# RangeIndex and range boundaries that still hold the right state. Anything
+# else falls back to a full scan.
+
+
+def build_partitions(df, column):
+    # Returns (frame sorted by `column`, {value: [start, stop]}); rows with a
+    # missing value go last and are not in any partition.
+    values = df[column]
+    codes = values.cat.codes.to_numpy() if isinstance(values.dtype, pd.CategoricalDtype) else None
+    if codes is None:
+        codes = pd.factorize(values, sort=True)[0]
+    # Missing values are code -1; push them past every real code
+    sort_codes = np.where(codes < 0, np.iinfo(np.int64).max, codes.astype(np.int64))
+    if len(sort_codes) and not (np.diff(sort_codes) >= 0).all():
+        order = np.argsort(sort_codes, kind='stable')
+        df = df.take(order)
+        sort_codes = sort_codes[order]
+    df = df.reset_index(drop=True)
+
+    present, starts = np.unique(sort_codes, return_index=True)
+    stops = np.append(starts[1:], len(sort_codes))
+    ranges = {}
+    for code, start, stop in zip(present, starts, stops):
+        if code == np.iinfo(np.int64).max:
+            continue
+        ranges[str(df[column].iat[start])] = [int(start), int(stop)]
+    return df, {'column': column, 'rows': len(df), 'ranges': ranges}
+
+
+def partitions(df):
+    # The frame's partition index, or None when it does not describe this frame
+    index = df.attrs.get('partitions')
+    if not index or index.get('rows') != len(df):
+        return None
+    if not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1):
+        return None
+    # Spot-check both ends of every range (O(states)) against reordered copies
+    column = df[index['column']]
+    for state, (start, stop) in index['ranges'].items():
+        if str(column.iat[start]) != state or str(column.iat[stop - 1]) != state:
+            return None
+    return index
+
+
+def state_slice(df, states, column='State_Name'):
+    # Rows whose partition column is one of `states`: O(slice) on an indexed
+    # frame, a boolean mask otherwise
+    if isinstance(states, str):
+        states = [states]
+    index = partitions(df)
+    if index is None:
+        return df[df[column].isin(list(states))]
+    ranges = sorted(index['ranges'][state] for state in states if state in index['ranges'])
+    rows = np.concatenate([np.arange(start, stop) for start, stop in ranges]) if ranges else []
+    return df.iloc[rows]
+
+
+def join_state(district_df, state_df, columns, on='State_Name'):
+    # Broadcast state-level `columns` onto the district rows; unmatched states
+    # get NaN. On an indexed frame each state's values are repeated over its
+    # row range instead of hashing every district row.
+    lookup = state_df.assign(**{on: state_df[on].astype(str)}).drop_duplicates(on).set_index(on)[columns]
+    index = partitions(district_df)
+    if index is None:
+        joined = lookup.reindex(district_df[on].astype(str).to_numpy())
+    else:
+        ranges = sorted(index['ranges'].items(), key=lambda item: item[1][0])
+        lengths = [stop - start for _, (start, stop) in ranges]
+        # Ranges are contiguous from row 0; rows without a state trail them
+        joined = lookup.reindex(np.repeat([state for state, _ in ranges], lengths))
+        joined = joined.reset_index(drop=True).reindex(range(len(district_df)))
+    joined.index = district_df.index
+    return district_df.join(joined, rsuffix='_state')
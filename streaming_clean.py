@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from outliers import RULE_STATS, rule_bounds, mask_within
+
+# Chunked cleaning for files that don't fit comfortably in memory.
+# The CSV is read twice with `chunksize`:
+#   pass 1 - de-duplicate through a set of row hashes, drop incomplete rows and
+#            feed every numeric column into a ValueSketch (median fill values,
+#            outlier statistics, which columns end up as float)
+#   pass 2 - repeat the de-duplication, fill, apply the outlier bounds and append
+#            each cleaned chunk to the output file
+# Peak memory is one chunk plus the hash set and the sketches, and the output
+# is the same file the in-memory path in DATACLEANING.PY writes.
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class ValueSketch:
+    # Sorted value -> count histogram. It is exact while a column has at most
+    # `max_bins` distinct values (survey percentages and counts stay far below
+    # that); past it, neighbouring bins are merged into weighted centroids and
+    # the quantiles become approximate.
+
+    def __init__(self, max_bins=200_000):
+        self.max_bins = max_bins
+        self.values = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values, counts=None):
+        values = np.asarray(values, dtype=np.float64)
+        if counts is None:
+            values = values[~np.isnan(values)]
+            counts = np.ones(len(values), dtype=np.int64)
+        if len(values) == 0:
+            return
+        merged, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]),
+                                  minlength=len(merged)).astype(np.int64)
+        self.values = merged
+        if len(self.values) > self.max_bins:
+            self._compress()
+
+    def _compress(self):
+        groups = np.array_split(np.arange(len(self.values)), self.max_bins // 2)
+        weights = self.values * self.counts
+        self.values = np.array([weights[g].sum() / self.counts[g].sum() for g in groups])
+        self.counts = np.array([self.counts[g].sum() for g in groups], dtype=np.int64)
+
+    def quantile(self, q, values=None, counts=None):
+        # Linear interpolation between closest ranks, as pandas/numpy do
+        values = self.values if values is None else values
+        counts = self.counts if counts is None else counts
+        if counts.sum() == 0:
+            return np.nan
+        cumulative = np.cumsum(counts)
+        position = q * (cumulative[-1] - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, int(cumulative[-1]) - 1)
+        lower_value = values[np.searchsorted(cumulative, lower, side='right')]
+        upper_value = values[np.searchsorted(cumulative, upper, side='right')]
+        return lower_value + (position - lower) * (upper_value - lower_value)
+
+    def mean(self):
+        return np.sum(self.values * self.counts) / self.count if self.count else np.nan
+
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        deviation = self.values - self.mean()
+        return np.sqrt(np.sum(self.counts * deviation * deviation) / (self.count - 1))
+
+    def mad(self):
+        deviation = np.abs(self.values - self.quantile(0.5))
+        order = np.argsort(deviation, kind='stable')
+        return self.quantile(0.5, deviation[order], self.counts[order])
+
+    def stats(self, rule):
+        needed = RULE_STATS[rule]
+        stats = {}
+        if 'mean' in needed:
+            stats['mean'], stats['std'] = self.mean(), self.std()
+        if 'q1' in needed:
+            stats['q1'], stats['q3'] = self.quantile(0.25), self.quantile(0.75)
+        if 'median' in needed:
+            stats['median'], stats['mad'] = self.quantile(0.5), self.mad()
+        return stats
+
+
+def _normalize_chunk(chunk, date_columns):
+    # Same column handling as datasets.read_source, chunk by chunk
+    chunk.columns = chunk.columns.str.strip()
+    for col in date_columns:
+        chunk[col] = pd.to_datetime(chunk[col])
+    return chunk
+
+
+def _row_hashes(chunk):
+    # Numeric columns are hashed as float64 so a value hashes the same whether
+    # its chunk inferred the column as int or float
+    hashable = chunk.copy()
+    numeric = hashable.select_dtypes(include=[np.number]).columns
+    hashable[numeric] = hashable[numeric].astype(np.float64)
+    return pd.util.hash_pandas_object(hashable, index=False).to_numpy()
+
+
+def _unique_rows(chunk, seen):
+    hashes = _row_hashes(chunk)
+    keep = np.zeros(len(hashes), dtype=bool)
+    for i, row_hash in enumerate(hashes.tolist()):
+        if row_hash not in seen:
+            seen.add(row_hash)
+            keep[i] = True
+    return chunk[keep]
+
+
+def _read_chunks(path, chunksize, date_columns):
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield _normalize_chunk(chunk, date_columns)
+
+
+def clean_csv_streaming(path, output, subset, numeric_cols=None, fill='median',
+                        rule='zscore', threshold=None, date_columns=(),
+                        chunksize=DEFAULT_CHUNKSIZE):
+    # numeric_cols=None means every column that is numeric in all chunks.
+    # fill is 'median' or a constant. Returns (original rows, cleaned rows).
+
+    # ---- pass 1: statistics ----
+    original_rows = 0
+    seen = set()
+    sketches = {}
+    missing = {}
+    numeric = None
+    float_cols = set()
+    for chunk in _read_chunks(path, chunksize, date_columns):
+        original_rows += len(chunk)
+        chunk_numeric = set(chunk.select_dtypes(include=[np.number]).columns)
+        numeric = chunk_numeric if numeric is None else numeric & chunk_numeric
+        float_cols |= set(chunk.select_dtypes(include=[np.floating]).columns)
+
+        chunk = _unique_rows(chunk, seen).dropna(subset=subset)
+        for col in chunk_numeric:
+            sketches.setdefault(col, ValueSketch()).add(chunk[col].to_numpy(dtype=np.float64))
+            missing[col] = missing.get(col, 0) + int(chunk[col].isna().sum())
+
+    if numeric_cols is None:
+        numeric_cols = [col for col in sketches if col in (numeric or set())]
+    else:
+        numeric_cols = [col for col in numeric_cols if col in sketches]
+
+    fill_values = {}
+    for col in numeric_cols:
+        sketch = sketches[col]
+        fill_values[col] = sketch.quantile(0.5) if fill == 'median' else fill
+        if missing[col] and not pd.isna(fill_values[col]):
+            sketch.add([fill_values[col]], [missing[col]])
+
+    lower = upper = None
+    if numeric_cols and rule is not None:
+        stats = [sketches[col].stats(rule) for col in numeric_cols]
+        stats = {key: np.array([s[key] for s in stats]) for key in RULE_STATS[rule]}
+        lower, upper = rule_bounds(rule, stats, threshold)
+
+    # ---- pass 2: clean and append ----
+    cleaned_rows = 0
+    seen = set()
+    first = True
+    for chunk in _read_chunks(path, chunksize, date_columns):
+        chunk = _unique_rows(chunk, seen).dropna(subset=subset)
+        for col in float_cols & (numeric or set()):
+            chunk[col] = chunk[col].astype(np.float64)
+        if numeric_cols:
+            chunk[numeric_cols] = chunk[numeric_cols].fillna(fill_values)
+            if lower is not None and len(chunk):
+                chunk = chunk[mask_within(chunk[numeric_cols].to_numpy(dtype=np.float64), lower, upper)]
+        chunk.to_csv(output, mode='w' if first else 'a', header=first, index=False)
+        cleaned_rows += len(chunk)
+        first = False
+
+    return original_rows, cleaned_rows
@@ -0,0 +1,202 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from build_cache import CACHE_DIR
+from build_trace import TRACER
+from datasets import DATASET_FILES
+from schema import widen
+
+# Persistent store of mergeable summary statistics for the KPI cards.
+# For every dataset the store keeps, per ingested partition (the whole file
+# the first time, then each appended batch), the row count and per column
+# count / sum / sum of squares / min / max, plus their running total. These
+# merge exactly, so when a source CSV only grew since the last build just the
+# new bytes are parsed and folded in: O(new rows). Anything else - a rewritten
+# or truncated file, different columns - rebuilds that dataset's entry.
+#
+# A file counts as appended when it is at least as long as the stored offset
+# and the first and last CHECK_BYTES bytes before that offset are unchanged.
+# A last row without a newline is counted in the result but not stored: the
+# offset stays at the last complete line, so the row is read again next time
+# (whole, if more was written to it meanwhile).
+
+STORE_PATH = os.path.join(CACHE_DIR, 'summary_store.json')
+CHECK_BYTES = 4096
+
+
+class ColumnStats:
+    __slots__ = ('count', 'sum', 'sumsq', 'min', 'max')
+
+    def __init__(self, count=0, sum=0, sumsq=0.0, min=None, max=None):
+        self.count = count
+        self.sum = sum
+        self.sumsq = sumsq
+        self.min = min
+        self.max = max
+
+    @classmethod
+    def from_values(cls, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna()
+        if values.empty:
+            return cls()
+        # Integer columns keep exact integer totals; compact columns sum at full width
+        as_python = int if pd.api.types.is_integer_dtype(values) else float
+        values = widen(values)
+        floats = values.to_numpy(dtype=np.float64)
+        return cls(len(values), as_python(values.sum()), float(np.dot(floats, floats)),
+                   as_python(values.min()), as_python(values.max()))
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        if not self.count:
+            return ColumnStats(other.count, other.sum, other.sumsq, other.min, other.max)
+        return ColumnStats(self.count + other.count, self.sum + other.sum, self.sumsq + other.sumsq,
+                           min(self.min, other.min), max(self.max, other.max))
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else float('nan')
+
+    @property
+    def std(self):
+        # Sample standard deviation (ddof=1, like pandas)
+        if self.count < 2:
+            return float('nan')
+        variance = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def to_json(self):
+        return [self.count, self.sum, self.sumsq, self.min, self.max]
+
+    @classmethod
+    def from_json(cls, values):
+        return cls(*values)
+
+
+class DatasetStats:
+    def __init__(self, rows=0, columns=None):
+        self.rows = rows
+        self.columns = columns or {}
+
+    def __getitem__(self, column):
+        return self.columns.get(column, ColumnStats())
+
+    def __len__(self):
+        return self.rows
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        return cls(len(df), {col: ColumnStats.from_values(df[col]) for col in columns if col in df.columns})
+
+    def merge(self, other):
+        names = list(self.columns) + [col for col in other.columns if col not in self.columns]
+        return DatasetStats(self.rows + other.rows,
+                            {col: self[col].merge(other[col]) for col in names})
+
+    def to_json(self):
+        return {'rows': self.rows, 'columns': {col: stats.to_json() for col, stats in self.columns.items()}}
+
+    @classmethod
+    def from_json(cls, value):
+        return cls(value['rows'], {col: ColumnStats.from_json(stats) for col, stats in value['columns'].items()})
+
+
+def _window_sha(path, start, stop):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(stop - start)).hexdigest()
+
+
+class SummaryStore:
+    # Subclasses store other mergeable summaries with the same append detection
+    summary_class = DatasetStats
+    span_prefix = 'summary_store'
+    keep_partitions = True
+
+    def __init__(self, path=STORE_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.entries = {}
+        self.dirty = False
+        if enabled:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def _checks(self, path, offset):
+        return {'head': _window_sha(path, 0, min(CHECK_BYTES, offset)),
+                'tail': _window_sha(path, max(0, offset - CHECK_BYTES), offset)}
+
+    def _is_append(self, entry, path, columns):
+        if not entry or not set(columns) <= set(entry['stat_columns']):
+            return False
+        if os.path.getsize(path) < entry['offset']:
+            return False
+        return self._checks(path, entry['offset']) == entry['checks']
+
+    def _read_from(self, path, offset, header):
+        # (complete lines from `offset` on, a trailing line with no newline yet,
+        # offset after the last complete line). The trailing line is counted
+        # but not stored, so the next build reads it again once it is finished.
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        frame = pd.read_csv(io.BytesIO(data[:end]), header=None, names=header) if end else None
+        tail = data[end:]
+        partial = pd.read_csv(io.BytesIO(tail), header=None, names=header) if tail.strip() else None
+        return frame, partial, offset + end
+
+    def _rebuild(self, name, path, columns):
+        with open(path, 'rb') as f:
+            header_line = f.readline()
+        header = [col.strip() for col in pd.read_csv(io.BytesIO(header_line)).columns]
+        entry = {'header': header, 'stat_columns': sorted(columns), 'offset': len(header_line),
+                 'partitions': [], 'total': self.summary_class().to_json()}
+        self.entries[name] = entry
+        return entry
+
+    def stats(self, name, columns):
+        # Totals for `columns` of dataset `name`, folding in any appended rows
+        path = DATASET_FILES[name]
+        entry = self.entries.get(name)
+        with TRACER.span(f'{self.span_prefix}:{name}', 'summary') as span:
+            if self._is_append(entry, path, columns):
+                span['mode'] = 'append'
+            else:
+                span['mode'] = 'rebuild'
+                # Keep tracking the columns other summaries asked for
+                entry = self._rebuild(name, path, set(columns) | set(entry['stat_columns'] if entry else ()))
+
+            frame, partial, offset = self._read_from(path, entry['offset'], entry['header'])
+            if frame is not None and len(frame):
+                batch = self.summary_class.from_frame(frame, entry['stat_columns'])
+                if self.keep_partitions:
+                    entry['partitions'].append({'start': entry['offset'], 'stop': offset, 'stats': batch.to_json()})
+                entry['total'] = self.summary_class.from_json(entry['total']).merge(batch).to_json()
+                span['rows'] = batch.rows
+            if offset != entry['offset'] or span['mode'] == 'rebuild':
+                entry['offset'] = offset
+                entry['checks'] = self._checks(path, offset)
+                self.dirty = True
+            total = self.summary_class.from_json(entry['total'])
+            if partial is not None and len(partial):
+                span['partial_rows'] = len(partial)
+                total = total.merge(self.summary_class.from_frame(partial, entry['stat_columns']))
+        return total
+
+    def save(self):
+        if not self.enabled or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        self.dirty = False
@@ -0,0 +1,39 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The dashboard modules live at the repository root
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from datasets import DATASET_FILES  # noqa: E402
+
+
+@pytest.fixture
+def repo_root():
+    return REPO_ROOT
+
+
+@pytest.fixture
+def shipped_copy(tmp_path):
+    # copy(*datasets) -> a directory holding copies of those shipped CSVs under
+    # their DATASET_FILES names, for code that reads them from the working directory
+    def copy(*names, directory=tmp_path):
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            shutil.copy(REPO_ROOT / DATASET_FILES[name], directory / DATASET_FILES[name])
+        return directory
+    return copy
+
+
+@pytest.fixture
+def districts():
+    # A small district table out of state order, with a district whose state is missing
+    return pd.DataFrame({
+        'State_Name': ['Goa', 'Assam', 'Goa', None, 'Assam', 'Bihar'],
+        'State_District_Name': ['North Goa', 'Barpeta', 'South Goa', 'Unknown', 'Cachar', 'Patna'],
+        'Rate': [5.0, 1.0, 6.0, 9.0, 2.0, 3.0],
+    })
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from aggregations import AggregationEngine
+
+
+def frame():
+    df = pd.DataFrame({'Channel': ['TV', 'Radio', 'TV'], 'Impressions': [1, 2, 3]})
+    df.attrs.update(dataset='health_campaign', version='v1')
+    return df
+
+
+def test_matches_groupby():
+    result = AggregationEngine().aggregate(frame(), ['Channel'], {'Impressions': 'sum'}, size='Count')
+    assert result.sort_values('Channel').to_dict('list') == {
+        'Channel': ['Radio', 'TV'], 'Impressions': [2, 4], 'Count': [1, 2]}
+
+
+def test_records_requests_when_asked():
+    engine = AggregationEngine()
+    engine.aggregate(frame(), ['Channel'])
+    assert engine.requests is None
+    engine.requests = []
+    engine.aggregate(frame(), ['Channel'], {'Impressions': 'mean'}, size='Count')
+    assert engine.requests == [('health_campaign', ('Channel',), (('Impressions', 'mean'),), 'Count')]
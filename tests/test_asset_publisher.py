@@ -0,0 +1,31 @@
+import os
+
+from asset_publisher import ASSET_DIR, AssetPublisher
+
+
+def publish(output_dir, body):
+    publisher = AssetPublisher(str(output_dir))
+    asset = publisher.add('app', body, '.js')
+    publisher.add_entry('index.html', f'<script src="{asset}"></script>', [asset])
+    publisher.finish()
+    return asset
+
+
+def test_first_build_leaves_unknown_files_alone(tmp_path):
+    os.makedirs(tmp_path / ASSET_DIR)
+    (tmp_path / ASSET_DIR / 'logo.png').write_bytes(b'png')
+    publish(tmp_path, 'one')
+    assert (tmp_path / ASSET_DIR / 'logo.png').exists()
+
+
+def test_only_retired_assets_are_removed_one_build_later(tmp_path):
+    os.makedirs(tmp_path / ASSET_DIR)
+    (tmp_path / ASSET_DIR / 'logo.png').write_bytes(b'png')
+    first = publish(tmp_path, 'one')
+    second = publish(tmp_path, 'two')
+    # Kept for pages still open on the first build
+    assert (tmp_path / first).exists()
+    third = publish(tmp_path, 'three')
+    assert not (tmp_path / first).exists()
+    assert (tmp_path / second).exists() and (tmp_path / third).exists()
+    assert (tmp_path / ASSET_DIR / 'logo.png').exists()
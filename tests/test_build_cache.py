@@ -0,0 +1,73 @@
+import os
+
+from build_cache import BuildCache
+
+
+def opened(tmp_path, sources, code_version='v1', enabled=True):
+    # A cache as dashboard_generator opens it: manifest loaded, sources fingerprinted
+    cache = BuildCache(str(tmp_path / 'cache'), code_version=code_version, enabled=enabled)
+    cache.fingerprint_sources(sources)
+    return cache
+
+
+def test_entries_go_stale_only_when_one_of_their_sources_changes(tmp_path):
+    (tmp_path / 'a.csv').write_text('x\n1\n')
+    (tmp_path / 'b.csv').write_text('y\n2\n')
+    sources = {'a': str(tmp_path / 'a.csv'), 'b': str(tmp_path / 'b.csv')}
+    cache = opened(tmp_path, sources)
+    assert cache.changed == ['a', 'b']
+    cache.put('chart_a', ['a'], {'html': 'A'})
+    cache.put('chart_ab', ['a', 'b'], {'html': 'AB'})
+    cache.save()
+
+    cache = opened(tmp_path, sources)
+    assert cache.changed == []
+    assert not cache.is_stale('chart_a', ['a']) and not cache.is_stale('chart_ab', ['a', 'b'])
+    assert cache.get('chart_a') == {'html': 'A'}
+
+    # A different size, so the change shows even within one mtime tick
+    (tmp_path / 'b.csv').write_text('y\n30\n')
+    cache = opened(tmp_path, sources)
+    assert cache.changed == ['b']
+    assert not cache.is_stale('chart_a', ['a'])
+    assert cache.is_stale('chart_ab', ['a', 'b'])
+
+
+def test_touching_a_file_without_changing_it_keeps_entries(tmp_path):
+    (tmp_path / 'a.csv').write_text('x\n1\n')
+    sources = {'a': str(tmp_path / 'a.csv')}
+    cache = opened(tmp_path, sources)
+    cache.put('chart_a', ['a'], {})
+    cache.save()
+
+    stat = os.stat(tmp_path / 'a.csv')
+    os.utime(tmp_path / 'a.csv', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache = opened(tmp_path, sources)
+    assert cache.changed == []
+    assert not cache.is_stale('chart_a', ['a'])
+
+
+def test_a_new_code_version_invalidates_every_entry(tmp_path):
+    (tmp_path / 'a.csv').write_text('x\n1\n')
+    sources = {'a': str(tmp_path / 'a.csv')}
+    cache = opened(tmp_path, sources)
+    cache.put('chart_a', ['a'], {})
+    cache.save()
+
+    cache = opened(tmp_path, sources, code_version='v2')
+    assert cache.is_stale('chart_a', ['a'])
+    # The source fingerprints carry over: the data itself did not change
+    assert cache.changed == []
+
+
+def test_missing_source_is_stale_and_disabled_cache_writes_nothing(tmp_path):
+    cache = opened(tmp_path, {'a': str(tmp_path / 'missing.csv')})
+    assert cache.changed == ['a'] and cache.sources == {'a': None}
+
+    (tmp_path / 'a.csv').write_text('x\n1\n')
+    cache = opened(tmp_path, {'a': str(tmp_path / 'a.csv')}, enabled=False)
+    cache.put('chart_a', ['a'], {})
+    cache.save()
+    assert cache.path('columnar') is None
+    assert cache.is_stale('chart_a', ['a'])
+    assert not (tmp_path / 'cache').exists()
@@ -0,0 +1,43 @@
+import argparse
+
+import pytest
+
+import build_trace
+from build_trace import Tracer, parse_budget, parse_budgets
+
+
+def test_spans_record_without_the_resource_module(monkeypatch, tmp_path):
+    # Windows has no resource module and no /proc
+    monkeypatch.setattr(build_trace, 'resource', None)
+    monkeypatch.setattr(build_trace, 'current_rss_mb', build_trace.peak_rss_mb)
+    assert build_trace.peak_rss_mb() is None
+    tracer = Tracer(enabled=True)
+    with tracer.span('load:values', 'load', rows=3):
+        pass
+    tracer.write(str(tmp_path / 'trace.json'))
+    assert tracer.events[0]['args']['rss_mb'] is None
+
+
+def test_peak_rss_is_scaled_per_platform(monkeypatch):
+    class Usage:
+        ru_maxrss = 2 ** 30
+
+    class FakeResource:
+        RUSAGE_SELF = 0
+
+        @staticmethod
+        def getrusage(who):
+            return Usage()
+
+    monkeypatch.setattr(build_trace, 'resource', FakeResource)
+    monkeypatch.setattr(build_trace.sys, 'platform', 'darwin')
+    assert build_trace.peak_rss_mb() == 1024
+    monkeypatch.setattr(build_trace.sys, 'platform', 'linux')
+    assert build_trace.peak_rss_mb() == 2 ** 20
+
+
+def test_budgets_parse_and_reject_malformed_values():
+    assert parse_budgets(['render=5', parse_budget('load:awareness=0.5')]) == {'render': 5.0, 'load:awareness': 0.5}
+    for value in ['render', '=5', 'render=fast', 'render=-1']:
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_budget(value)
@@ -0,0 +1,28 @@
+import base64
+
+import numpy as np
+
+from chart_payloads import compact_array
+
+
+def decode(typed):
+    return np.frombuffer(base64.b64decode(typed['bdata']), dtype=typed['dtype'])
+
+
+def test_small_integers_use_the_smallest_integer_type():
+    typed = compact_array([0, 5, 200])
+    assert typed['dtype'] == 'u1'
+    assert decode(typed).tolist() == [0, 5, 200]
+
+
+def test_integers_beyond_32_bits_stay_exact():
+    values = [1, 2 ** 32 + 1, 9_007_199_254_740_993 - 2]
+    typed = compact_array(np.array(values, dtype=np.int64))
+    assert typed['dtype'] == 'f8'
+    assert decode(typed).tolist() == values
+
+
+def test_fractions_are_rounded_to_float32():
+    typed = compact_array([0.1234567, 2.5])
+    assert typed['dtype'] == 'f4'
+    assert decode(typed).astype(np.float64).round(6).tolist() == [0.123457, 2.5]
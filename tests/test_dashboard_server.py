@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+import dashboard_server
+from dashboard_server import DashboardData, summary_response
+
+
+@pytest.fixture
+def data(repo_root, tmp_path, monkeypatch):
+    # DATASET_FILES are relative to the repository; caches go to tmp_path
+    monkeypatch.chdir(repo_root)
+    return DashboardData(reload_interval=60, cache_dir=str(tmp_path))
+
+
+def test_empty_slices_show_a_dash_not_nan(data):
+    summary = summary_response(data, {'state': ['Nowhere']})
+    assert summary['avg_hiv_awareness'] == '–'
+    assert summary['avg_disability_rate'] == '–'
+    assert 'nan' not in ''.join(str(value) for value in summary.values())
+
+
+def test_reload_reads_files_outside_the_lock(data, monkeypatch):
+    frames = data.frames
+    load_datasets = dashboard_server.load_datasets
+    held = []
+
+    def checked_load(names, **options):
+        held.append(data.lock.locked())
+        return load_datasets(names, **options)
+
+    monkeypatch.setattr(dashboard_server, 'load_datasets', checked_load)
+    data.refresh(force=True)
+    assert held == [False]
+    # Swapped for new mappings, so readers holding the old one are unaffected
+    assert data.frames is not frames
+    assert data.frames.keys() == frames.keys()
+
+
+def test_caches_go_under_cache_dir(data, tmp_path):
+    assert os.listdir(tmp_path / 'columnar')
+    assert DashboardData(reload_interval=60, cache_dir=None).columnar_dir is None
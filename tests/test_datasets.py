@@ -0,0 +1,26 @@
+import os
+
+from datasets import load_csv
+
+
+def write_source(tmp_path):
+    source = tmp_path / 'values.csv'
+    source.write_text('State_Name ,Value\nA,1\nB,2\n', encoding='utf-8')
+    return str(source)
+
+
+def test_columnar_cache_is_written_and_reused(tmp_path):
+    source, cache_dir = write_source(tmp_path), str(tmp_path / 'columnar')
+    first = load_csv(source, name='values', cache_dir=cache_dir)
+    assert sorted(os.listdir(cache_dir))[-1] == 'values.json'
+    second = load_csv(source, name='values', cache_dir=cache_dir)
+    assert second.attrs['version'] == first.attrs['version']
+    assert second['Value'].tolist() == [1, 2]
+
+
+def test_no_cache_dir_writes_nothing(tmp_path):
+    source = write_source(tmp_path)
+    df = load_csv(source, name='values', cache_dir=None)
+    assert list(df.columns) == ['State_Name', 'Value']
+    assert df.attrs['version']
+    assert sorted(os.listdir(tmp_path)) == ['values.csv']
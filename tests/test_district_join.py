@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+import district_join
+from district_join import DistrictKeys, build_fact_table
+
+
+def frames():
+    disability = pd.DataFrame({
+        'State_Name': ['Kerala', 'Kerala', 'Goa'],
+        'State_District_Name': ['Ernakulam', 'Kollam', 'North Goa'],
+        'HH_Prevalence_Of_Any_Type_Of_Disability_Per_100000_Population_Person_Total': [100.0, 200.0, 300.0],
+    })
+    hospitals = pd.DataFrame({'District': ['Ernakulam', 'Kolam'], 'Total Hospitals': [10, 20],
+                              'Public-Private Ratio (%)': [40.0, 60.0]})
+    return {'disability_district': disability, 'hospitals': hospitals}
+
+
+def test_keys_are_saved_and_fuzzy_matches_remembered(tmp_path):
+    path = str(tmp_path / 'keys.json')
+    fact = build_fact_table(frames(), DistrictKeys(path))
+    assert fact.set_index('district')['total_hospitals'].dropna().to_dict() == {'Ernakulam': 10, 'Kollam': 20}
+    saved = DistrictKeys(path)
+    assert saved.aliases['|kolam'] == saved.aliases['kerala|kollam']
+
+
+def test_no_keys_path_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(district_join, '_keys_path', None)
+    fact = build_fact_table(frames())
+    assert fact['total_hospitals'].count() == 2
+    assert os.listdir(tmp_path) == []
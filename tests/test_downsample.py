@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from downsample import bin_scatter
+
+
+def test_bin_scatter_counts_every_point():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'x': rng.normal(size=500), 'y': rng.normal(size=500)})
+    binned = bin_scatter(df, 'x', 'y', threshold=100)
+    assert len(binned) <= 100
+    assert binned['count'].sum() == 500
+
+
+def test_bin_scatter_with_constant_columns():
+    df = pd.DataFrame({'x': np.full(50, 3.0), 'y': np.arange(50.0)})
+    binned = bin_scatter(df, 'x', 'y', threshold=16)
+    assert binned['count'].sum() == 50
+    assert (binned['x'] == 3.0).all()
+
+    both = bin_scatter(pd.DataFrame({'x': np.ones(50), 'y': np.ones(50)}), 'x', 'y', threshold=16)
+    assert both.to_dict('records') == [{'x': 1.0, 'y': 1.0, 'count': 50}]
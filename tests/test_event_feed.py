@@ -0,0 +1,32 @@
+import pandas as pd
+
+import datasets
+from event_feed import FeedCounts, FeedStore
+
+
+def test_appended_row_without_newline_is_counted(tmp_path, monkeypatch):
+    source = tmp_path / 'events.csv'
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write('Date,Category\n2024-01-05,Camp\n2024-01-06,Webinar\n')
+    monkeypatch.setitem(datasets.DATASET_FILES, 'events', str(source))
+    path = str(tmp_path / 'feed_store.json')
+    store = FeedStore(path)
+    assert store.counts('events', ['Category']).rows == 2
+    store.save()
+
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('2024-01-07,Camp')
+    counts = FeedStore(path).counts('events', ['Category'])
+    assert counts.rows == 3
+    assert counts.counters['Category'][('Camp',)] == 2
+    assert counts.dates['2024-01-07'] == 1
+
+
+
+def test_value_counts_break_ties_in_first_seen_order():
+    # As loaded, Category is categorical (alphabetical categories); the pie's
+    # positional colors depend on ties keeping the file's order
+    df = pd.DataFrame({'Category': ['Webinar', 'Hackathon', 'Awareness', 'Webinar']}).astype('category')
+    counts = FeedCounts.from_frame(df, ['Category']).value_counts('Category')
+    assert counts.index.tolist() == ['Webinar', 'Hackathon', 'Awareness']
+    assert counts.tolist() == [2, 1, 1]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from gap_metrics import METRIC_LEVELS, gap_metrics, indicator_columns, topic_summary
+
+PREVALENCE = 'HH_Prevalence_Of_Seeing_Per_100000_Population_{sex}_{area}'
+AWARENESS = 'XX_Women_Who_Are_Aware_Of_HIV_{area}'
+
+
+@pytest.fixture
+def survey():
+    # One prevalence topic surveyed for every sex and one awareness topic
+    # (women only), three districts, in deliberately non-sorted column order
+    columns = {'State_Name': ['Goa', 'Assam', 'Bihar']}
+    for area, base in [('Urban', 30.0), ('Total', 20.0), ('Rural', 10.0)]:
+        for sex, offset in [('Female', 2.0), ('Person', 1.0), ('Male', 0.0)]:
+            columns[PREVALENCE.format(sex=sex, area=area)] = [base + offset, base + offset + 5, base + offset - 5]
+        columns[AWARENESS.format(area=area)] = [base, base * 2, np.nan]
+    return pd.DataFrame(columns, index=[10, 11, 12])
+
+
+def test_columns_are_metric_topic_sex_area_without_empty_combinations(survey):
+    metrics = gap_metrics(survey)
+    assert metrics.columns.names == METRIC_LEVELS
+    assert metrics.index.equals(survey.index)
+    counts = metrics.columns.get_level_values('metric').value_counts().to_dict()
+    # value / rank: 9 Seeing + 3 HIV (Female only); area gaps: 3 Seeing sexes + HIV Female;
+    # gender gaps: 3 Seeing areas, none for HIV (no Male columns)
+    assert counts == {'value': 12, 'rank': 12, 'urban_rural_gap': 4, 'urban_rural_ratio': 4,
+                      'urban_rural_gap_rank': 4, 'gender_gap': 3, 'gender_ratio': 3, 'gender_gap_rank': 3}
+    assert ('value', 'HIV', 'Male', 'Total') not in metrics.columns
+    assert ('urban_rural_gap', 'Seeing', 'Person', 'Urban-Rural') in metrics.columns
+    assert ('gender_gap', 'Seeing', 'Female-Male', 'Rural') in metrics.columns
+
+
+def test_metric_values(survey):
+    metrics = gap_metrics(survey)
+    assert metrics[('urban_rural_gap', 'Seeing', 'Male', 'Urban-Rural')].tolist() == [20.0, 20.0, 20.0]
+    assert metrics[('urban_rural_ratio', 'HIV', 'Female', 'Urban-Rural')].tolist()[:2] == [3.0, 3.0]
+    assert metrics[('gender_gap', 'Seeing', 'Female-Male', 'Total')].tolist() == [2.0, 2.0, 2.0]
+    assert metrics[('rank', 'Seeing', 'Person', 'Total')].tolist() == [2.0, 1.0, 3.0]
+    # The district without awareness data has NaN values and no rank
+    assert metrics[('rank', 'HIV', 'Female', 'Total')].isna().tolist() == [False, False, True]
+
+
+def test_indicator_lookup_and_topic_summary(survey):
+    columns = indicator_columns(survey.columns)
+    assert columns[('HIV', 'Female', 'Rural')] == AWARENESS.format(area='Rural')
+    assert columns[('Seeing', 'Male', 'Urban')] == PREVALENCE.format(sex='Male', area='Urban')
+    summary = topic_summary(gap_metrics(survey), 'urban_rural_gap')
+    assert list(summary.columns) == ['topic', 'sex', 'area', 'urban_rural_gap']
+    assert len(summary) == 4
+
+
+def test_results_are_memoized_on_the_dataset_version(survey):
+    survey.attrs.update(dataset='survey', version='v1')
+    assert gap_metrics(survey) is gap_metrics(survey.copy())
+    changed = survey.copy()
+    changed.attrs['version'] = 'v2'
+    assert gap_metrics(changed) is not gap_metrics(survey)
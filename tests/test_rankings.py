@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rankings import (QuantileSketch, TopK, column_medians, percentile_bands, top_k, top_k_by_group,
+                      top_k_columns, top_k_positions)
+
+QUANTILES = np.array([0.001, 0.01, 0.1, 0.5, 0.9, 0.99, 0.999, 0.9999])
+
+
+@pytest.fixture(scope='module')
+def heavy_tail():
+    return np.random.default_rng(0).lognormal(0, 2, 200_000)
+
+
+def assert_accurate(sketch, values):
+    estimates = sketch.quantile(QUANTILES)
+    ranks = np.searchsorted(np.sort(values), estimates) / len(values)
+    assert np.abs(ranks - QUANTILES).max() < 1e-3
+    relative = np.abs(estimates / np.quantile(values, QUANTILES) - 1)
+    assert relative[-3:].max() < 0.03
+
+
+def test_sketch_is_exact_until_the_buffer_fills(heavy_tail):
+    values = heavy_tail[:1000]
+    assert np.allclose(QuantileSketch().add(values).quantile(QUANTILES), np.quantile(values, QUANTILES))
+
+
+def test_sketch_tracks_heavy_tails_fed_in_chunks(heavy_tail):
+    sketch = QuantileSketch()
+    for chunk in np.array_split(heavy_tail, 200):
+        sketch.add(chunk)
+    assert_accurate(sketch, heavy_tail)
+    assert sketch.count == len(heavy_tail)
+
+
+def test_sketch_in_one_add_and_merged_from_parts(heavy_tail):
+    assert_accurate(QuantileSketch().add(heavy_tail), heavy_tail)
+    merged = QuantileSketch()
+    for part in np.array_split(heavy_tail, 8):
+        merged.merge(QuantileSketch().add(part))
+    assert_accurate(merged, heavy_tail)
+
+
+def random_frame(seed, rows=60):
+    # Few distinct values (many ties), NaNs in values and in the group key
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.integers(0, 6, rows).astype(np.float64) for col in 'abc'})
+    for col in 'abc':
+        df.loc[rng.random(rows) < 0.2, col] = np.nan
+    df['State_Name'] = rng.choice(['Goa', 'Bihar', 'Kerala', None], rows)
+    return df
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('largest', [True, False])
+def test_top_k_matches_nlargest_and_nsmallest(seed, largest):
+    df = random_frame(seed)
+    for k in [0, 1, 5, 30, 48, 60, 70]:
+        expected = df.nlargest(k, 'a') if largest else df.nsmallest(k, 'a')
+        positions = top_k_positions(df['a'], k, largest)
+        assert df.index[positions].tolist() == expected.index.tolist()
+        pd.testing.assert_frame_equal(top_k(df, k, 'a', largest), expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('largest', [True, False])
+def test_top_k_columns_match_nlargest_without_nan_rows(seed, largest):
+    df = random_frame(seed)
+    for k in [0, 1, 5, 60]:
+        ranked = top_k_columns(df, k, 'abc', largest)
+        for col in 'abc':
+            present = df[col].dropna()
+            expected = present.nlargest(k) if largest else present.nsmallest(k)
+            assert df.index[ranked[col]].tolist() == expected.index.tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_top_k_by_group_matches_groupby_nlargest(seed):
+    df = random_frame(seed)
+    expected = pd.concat([group.nlargest(3, 'b') for _, group in df.groupby('State_Name', sort=True)])
+    expected = expected[expected['b'].notna()]
+    result = top_k_by_group(df, 3, 'b')
+    assert result.index.tolist() == expected.index.tolist()
+    assert result['rank'].tolist() == expected.groupby('State_Name').cumcount().add(1).tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_percentile_bands_match_series_quantile(seed):
+    df = random_frame(seed)
+    quantiles = [0, 0.1, 0.25, 0.5, 0.9, 1]
+    bands = percentile_bands(df, 'c', 'State_Name', quantiles)
+    grouped = df.groupby('State_Name')['c']
+    assert bands['count'].tolist() == grouped.count().tolist()
+    for q in quantiles:
+        np.testing.assert_allclose(bands[f'p{q * 100:g}'], grouped.quantile(q).to_numpy())
+    overall = percentile_bands(df, 'c', quantiles=quantiles).iloc[0]
+    np.testing.assert_allclose([overall[f'p{q * 100:g}'] for q in quantiles], df['c'].quantile(quantiles))
+    pd.testing.assert_series_equal(column_medians(df, 'abc'), df[list('abc')].median())
+
+
+def test_streaming_top_k_matches_nlargest():
+    df = random_frame(0, rows=200)
+    top = TopK(10)
+    for start in range(0, len(df), 30):
+        chunk = df.iloc[start:start + 30]
+        top.add(chunk['a'], chunk.index)
+    expected = df['a'].dropna().nlargest(10)
+    assert top.items() == list(zip(expected.index, expected))
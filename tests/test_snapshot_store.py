@@ -0,0 +1,79 @@
+import hashlib
+import os
+import zlib
+
+import pandas as pd
+import pytest
+
+from snapshot_store import WHOLE_TABLE, SnapshotStore
+
+
+def objects(store):
+    return sorted(name for _, _, names in os.walk(os.path.join(store.root, 'objects')) for name in names)
+
+
+def chunks(store, version, name='disability_district'):
+    # partition -> {column: chunk key}
+    return {p['key']: p['chunks'] for p in store.manifest(version)['datasets'][name]['partitions']}
+
+
+def test_chunks_are_named_by_the_sha256_of_their_bytes(tmp_path, districts):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    store.commit('v1', {'disability_district': districts})
+    for key in objects(store):
+        path = os.path.join(store.root, 'objects', key[:2], key)
+        with open(path, 'rb') as f:
+            assert hashlib.sha256(zlib.decompress(f.read())).hexdigest() == key
+
+
+def test_one_chunk_per_column_and_partition(tmp_path, districts):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    store.commit('v1', {'disability_district': districts, 'webinars': districts})
+    entries = store.manifest('v1')['datasets']
+    # District tables split per state, rows without one trailing; the rest are one partition
+    assert [(p['key'], p['rows']) for p in entries['disability_district']['partitions']] == [
+        ('Assam', 2), ('Bihar', 1), ('Goa', 2), ('', 1)]
+    assert [(p['key'], p['rows']) for p in entries['webinars']['partitions']] == [(WHOLE_TABLE, 6)]
+    assert all(p['chunks'].keys() == set(districts.columns) for p in entries['disability_district']['partitions'])
+
+
+def test_unchanged_chunks_are_stored_once(tmp_path, districts):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    first = store.commit('v1', {'disability_district': districts})['disability_district']
+    stored = objects(store)
+    assert first['reused'] == 0 and first['new'] == len(stored)
+
+    # The same data again writes nothing
+    again = store.commit('v2', {'disability_district': districts})['disability_district']
+    assert again == {'new': 0, 'reused': first['new'] + first['reused'], 'bytes': 0}
+    assert objects(store) == stored
+
+    # One changed value: only Goa's Rate chunk is new
+    changed = districts.assign(Rate=districts['Rate'].where(districts['State_District_Name'] != 'North Goa', 7.5))
+    third = store.commit('v3', {'disability_district': changed})['disability_district']
+    assert third['new'] == 1
+    assert len(objects(store)) == len(stored) + 1
+    before, after = chunks(store, 'v1'), chunks(store, 'v3')
+    assert after['Goa']['Rate'] != before['Goa']['Rate']
+    assert after['Goa']['State_District_Name'] == before['Goa']['State_District_Name']
+    assert after['Assam'] == before['Assam']
+
+
+def test_load_round_trips_and_identical_data_shares_a_version(tmp_path, districts):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    store.commit('v1', {'disability_district': districts})
+    store.commit('v2', {'disability_district': districts})
+    first, second = store.load('v1', 'disability_district'), store.load('v2', 'disability_district')
+    expected = districts.sort_values('State_Name', kind='stable').reset_index(drop=True)
+    pd.testing.assert_frame_equal(first, expected, check_dtype=False)
+    assert first.attrs['version'] == second.attrs['version']
+    assert first.attrs['partitions']['ranges']['Goa'] == [3, 5]
+
+
+def test_versions_are_immutable_and_unknown_ones_are_named(tmp_path, districts):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    store.commit('v1', {'disability_district': districts})
+    with pytest.raises(ValueError):
+        store.commit('v1', {'disability_district': districts})
+    with pytest.raises(KeyError, match='known: v1'):
+        store.load('v9', 'disability_district')
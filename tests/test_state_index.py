@@ -0,0 +1,68 @@
+import pandas as pd
+
+from datasets import load_csv
+from state_index import build_partitions, join_state, partitions, state_slice
+
+
+def indexed(df):
+    df, index = build_partitions(df, 'State_Name')
+    df.attrs['partitions'] = index
+    return df
+
+
+def states():
+    return pd.DataFrame({'State_Name': ['Assam', 'Goa', 'Kerala'], 'Rate': [10.0, 20.0, 30.0]})
+
+
+def test_build_sorts_stably_and_records_ranges(districts):
+    df, index = build_partitions(districts, 'State_Name')
+    assert df['State_District_Name'].tolist() == ['Barpeta', 'Cachar', 'Patna', 'North Goa', 'South Goa',
+                                                  'Unknown']
+    assert index == {'column': 'State_Name', 'rows': 6,
+                     'ranges': {'Assam': [0, 2], 'Bihar': [2, 3], 'Goa': [3, 5]}}
+
+
+def test_partitions_are_persisted_with_the_columnar_cache(tmp_path, districts):
+    source = tmp_path / 'districts.csv'
+    districts.to_csv(source, index=False)
+    cache_dir = str(tmp_path / 'columnar')
+    first = load_csv(str(source), name='districts', cache_dir=cache_dir, partition_column='State_Name')
+    cached = load_csv(str(source), name='districts', cache_dir=cache_dir, partition_column='State_Name')
+    assert partitions(cached) == first.attrs['partitions']
+    assert partitions(cached)['ranges']['Goa'] == [3, 5]
+
+
+def test_slice_matches_a_mask(districts):
+    df = indexed(districts)
+    for wanted in (['Goa'], ['Bihar', 'Assam'], ['Kerala'], 'Assam'):
+        expected = df[df['State_Name'].isin([wanted] if isinstance(wanted, str) else wanted)]
+        pd.testing.assert_frame_equal(state_slice(df, wanted), expected)
+
+
+def test_stale_partitions_fall_back_to_a_scan(districts):
+    df = indexed(districts)
+    reordered = df.iloc[::-1].reset_index(drop=True)
+    filtered = df[df['Rate'] > 1.5]
+    reindexed = df.set_axis(range(10, 16))
+    for copy in (reordered, filtered, reindexed):
+        # pandas carried the attrs over, but they no longer describe the frame
+        assert copy.attrs['partitions']
+        assert partitions(copy) is None
+        pd.testing.assert_frame_equal(state_slice(copy, ['Goa']), copy[copy['State_Name'] == 'Goa'])
+
+
+def test_join_matches_a_merge_with_and_without_the_index(districts):
+    expected = (districts.merge(states(), on='State_Name', how='left', suffixes=('', '_state'))
+                .set_index('State_District_Name')['Rate_state'].sort_index())
+    for df in (districts, indexed(districts)):
+        joined = join_state(df, states(), ['Rate'])
+        assert joined.index.equals(df.index)
+        pd.testing.assert_series_equal(joined.set_index('State_District_Name')['Rate_state'].sort_index(),
+                                       expected)
+
+
+def test_join_on_a_stale_index_uses_the_rows_it_has(districts):
+    df = indexed(districts).iloc[::-1].reset_index(drop=True)
+    joined = join_state(df, states(), ['Rate'])
+    assert joined.loc[joined['State_Name'] == 'Goa', 'Rate_state'].tolist() == [20.0, 20.0]
+    assert joined.loc[joined['State_Name'] == 'Bihar', 'Rate_state'].isna().all()
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+CLEANED = {
+    'health_campaign': 'Health_Campaign_Dataset_50_cleaned.csv',
+    'disability_district': 'HH_Disability_District_cleaned.csv',
+    'disability_state': 'HH_Disability_State_cleaned.csv',
+    'awareness': 'XX_Awareness_cleaned.csv',
+}
+# A duplicate and rows with missing values, so de-duplication and both fill
+# rules (median, 0) run. Appended rows keep the district file in state order.
+EXTRA_ROWS = {
+    'Health_Campaign_Dataset_50.csv': [
+        'Mental Health Week,2025-01-14,Television,2404,715,40+,Male,Rural,31,4.7',
+        'Heart Health 2025,2025-02-09,Websites,,410,18-30,Male,Suburban,,4.8',
+        'Heart Health 2025,2025-02-10,,2300,400,18-30,Male,Suburban,30,4.6',
+    ],
+    'HH_Disability_District.csv': [
+        'Uttarakhand,Uttarkashi,1705.93,1801.4,1085.08,1993.1,2108.36,1298.1,1420.6,1502.63,842.99',
+        'Uttarakhand,Tehri,1705.93,,1085.08,1993.1,2108.36,1298.1,1420.6,1502.63,842.99',
+    ],
+}
+
+
+def clean(directory, repo_root, *options):
+    subprocess.run([sys.executable, str(repo_root / 'DATACLEANING.PY'), *options], cwd=directory,
+                   stdout=subprocess.DEVNULL, check=True)
+    return {name: (directory / path).read_bytes() for name, path in CLEANED.items()}
+
+
+@pytest.mark.parametrize('chunksize', [7, 100_000])
+def test_streaming_writes_the_same_files_as_in_memory(tmp_path, repo_root, shipped_copy, chunksize):
+    runs = []
+    for mode in ('memory', 'stream'):
+        directory = shipped_copy(*CLEANED, directory=tmp_path / mode)
+        for path, rows in EXTRA_ROWS.items():
+            with open(directory / path, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(rows) + '\n')
+        options = ['--stream', '--chunksize', str(chunksize)] if mode == 'stream' else []
+        runs.append(clean(directory, repo_root, *options))
+    memory, stream = runs
+    for name in CLEANED:
+        assert stream[name] == memory[name], name
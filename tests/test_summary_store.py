@@ -0,0 +1,37 @@
+import datasets
+from summary_store import SummaryStore
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_last_row_without_newline_is_counted(tmp_path, monkeypatch):
+    source = tmp_path / 'values.csv'
+    write(source, 'State,Value\nA,1\nB,2\nC,3')
+    monkeypatch.setitem(datasets.DATASET_FILES, 'values', str(source))
+    store = SummaryStore(str(tmp_path / 'store.json'))
+
+    stats = store.stats('values', ['Value'])
+    assert stats.rows == 3
+    assert stats['Value'].sum == 6
+    # The unfinished row is not stored: the offset stays before it
+    assert store.entries['values']['offset'] == len('State,Value\nA,1\nB,2\n')
+
+
+def test_unfinished_row_is_read_again_once_complete(tmp_path, monkeypatch):
+    source = tmp_path / 'values.csv'
+    write(source, 'State,Value\nA,1\nB,2\nC,3')
+    monkeypatch.setitem(datasets.DATASET_FILES, 'values', str(source))
+    path = str(tmp_path / 'store.json')
+    store = SummaryStore(path)
+    store.stats('values', ['Value'])
+    store.save()
+
+    # The writer finishes the row (3 -> 30) and appends another
+    with open(source, 'a', encoding='utf-8') as f:
+        f.write('0\nD,4\n')
+    stats = SummaryStore(path).stats('values', ['Value'])
+    assert stats.rows == 4
+    assert stats['Value'].sum == 37